@@ -0,0 +1,129 @@
+"""
+Benchmark of the latency of CLI commands with and without the daemon, against a local stub of the API.
+
+Run from the root of the repository with `python -m tests.bench_daemon`. The config of the CLI is pointed at the stub
+for the duration of the benchmark and restored afterwards. The daemon is started with its own socket directory, such
+that a daemon the user is running is left alone.
+"""
+
+import argparse
+import configparser
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from tests.stub_api import PROJECT, StubAPI
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(ROOT_DIR, "ubiops_cli", ".config")
+
+COMMANDS = [
+    ["--version"],
+    ["projects", "list"],
+    ["deployments", "list"],
+    ["deployments", "get", "dep"],
+    ["deployments", "get", "dep", "-fmt", "json"],
+]
+
+
+def run_cli(args, env):
+    """
+    Run a CLI command in a new process
+
+    :param list[str] args: the arguments of the CLI
+    :param dict env: the environment of the process
+    :return float: the wall time of the command in seconds
+    """
+
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "ubiops_cli.main"] + args,
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def time_commands(env, runs):
+    """
+    Time each of the benchmarked commands
+
+    :param dict env: the environment of the CLI processes
+    :param int runs: the number of times to run each command
+    :return dict[str, float]: the median wall time in seconds per command
+    """
+
+    timings = {}
+    for args in COMMANDS:
+        # Warm up the page cache and the response cache of the CLI
+        run_cli(args, env)
+        timings[" ".join(args)] = statistics.median(run_cli(args, env) for _ in range(runs))
+    return timings
+
+
+def write_config(host):
+    """
+    Point the config of the CLI at the stub API
+
+    :param str host: the URL of the stub API
+    """
+
+    config = configparser.ConfigParser()
+    config["auth"] = {"api": host, "service_token": "Token benchmark"}
+    config["default"] = {"project": PROJECT}
+    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        config.write(f)
+
+
+def run_benchmarks(runs):
+    """
+    Time the commands without and with the daemon and print the results
+
+    :param int runs: the number of times to run each command
+    """
+
+    runtime_dir = tempfile.mkdtemp()
+    backup = f"{CONFIG_FILE}.bench"
+    has_config = os.path.exists(CONFIG_FILE)
+    if has_config:
+        shutil.copy2(CONFIG_FILE, backup)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+    env["XDG_RUNTIME_DIR"] = runtime_dir
+
+    try:
+        with StubAPI() as api:
+            write_config(api.host)
+            without_daemon = time_commands(env, runs)
+
+            run_cli(["daemon", "start"], env)
+            try:
+                with_daemon = time_commands(env, runs)
+            finally:
+                run_cli(["daemon", "stop"], env)
+    finally:
+        if has_config:
+            os.replace(backup, CONFIG_FILE)
+        else:
+            os.remove(CONFIG_FILE)
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+    print(f"Median wall time of {runs} runs per command:")
+    print(f"{'command':<40} {'without daemon':>16} {'with daemon':>14} {'speedup':>9}")
+    for command, without in without_daemon.items():
+        with_ = with_daemon[command]
+        print(f"{command:<40} {without * 1000:>13.1f} ms {with_ * 1000:>11.1f} ms {without / with_:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="the number of times to run each command")
+    run_benchmarks(parser.parse_args().runs)
@@ -0,0 +1,204 @@
+"""A minimal stub of the UbiOps API, served from a background thread, to run the CLI against in tests and benchmarks."""
+
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_VERSION = "v2.1"
+PROJECT = "proj"
+TIMESTAMP = "2020-01-01T00:00:00Z"
+
+DEPLOYMENT = {
+    "id": "d1",
+    "project": PROJECT,
+    "name": "dep",
+    "description": "",
+    "input_type": "plain",
+    "output_type": "plain",
+    "labels": {},
+    "creation_date": TIMESTAMP,
+    "last_updated": TIMESTAMP,
+    "default_version": "v1",
+    "supports_request_format": True,
+    "input_fields": [],
+    "output_fields": [],
+}
+
+PROJECTS = [{"id": "p1", "name": PROJECT, "organization_name": "org", "creation_date": TIMESTAMP}]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def send_json(self, status_code, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def get_path(self):
+        """
+        Get the path of the request relative to the project, or None if the request is outside the project
+        """
+
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        prefix = f"/{API_VERSION}/projects/{PROJECT}"
+        if path == prefix or path.startswith(f"{prefix}/"):
+            return path[len(prefix) :]
+        return None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append(("GET", self.path))
+        path = urllib.parse.urlsplit(self.path).path
+        if path.startswith("/storage/"):
+            return self.send_file(urllib.parse.unquote(path[len("/storage/") :]))
+        if path == f"/{API_VERSION}/status":
+            return self.send_json(200, {"status": "ok"})
+        if path == f"/{API_VERSION}/projects":
+            return self.send_json(200, PROJECTS)
+
+        routes = {
+            "": PROJECTS[0],
+            "/deployments": [dict(DEPLOYMENT, default_version=None)],
+            "/deployments/dep": DEPLOYMENT,
+            "/deployments/dep/versions": [],
+        }
+        path = self.get_path()
+        if path in routes:
+            return self.send_json(200, routes[path])
+        return self.send_json(404, {"error": f"Not found: {self.path}"})
+
+    def send_file(self, name):
+        """
+        Send a file of the storage, or the range of it that was requested
+        """
+
+        storage = self.server.storage
+        if name not in storage.files:
+            return self.send_json(404, {"error": "File not found"})
+
+        data = storage.files[name]
+        range_header = self.headers.get("Range")
+        storage.ranges.append(range_header)
+        if range_header is None or storage.ignore_ranges:
+            return self.send_data(200, data)
+
+        start, _, end = range_header.partition("=")[2].partition("-")
+        start, end = int(start), min(int(end), len(data) - 1)
+        if start >= len(data):
+            return self.send_json(416, {"error": "Range not satisfiable"})
+        if start in storage.failing_offsets:
+            storage.failing_offsets.remove(start)
+            return self.send_json(500, {"error": "Internal error"})
+        total_size = "*" if storage.hide_size else len(data)
+        return self.send_data(206, data[start : end + 1], {"Content-Range": f"bytes {start}-{end}/{total_size}"})
+
+    def send_data(self, status_code, data, headers=None):
+        self.send_response(status_code)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.server.requests.append(("POST", self.path))
+        self.read_body()
+        return self.send_json(201, {})
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        self.server.requests.append(("PATCH", self.path))
+        self.read_body()
+        return self.send_json(200, {})
+
+
+class StubStorage:
+    """
+    The files of the storage provider, served at /storage/<name>
+    """
+
+    def __init__(self):
+        # The content of the files by name
+        self.files = {}
+
+        # Whether to send the whole file when a range is requested, like storage that doesn't support range requests
+        self.ignore_ranges = False
+
+        # Whether to leave the size of the file out of responses to range requests
+        self.hide_size = False
+
+        # Offsets of ranges that fail once when they are requested
+        self.failing_offsets = set()
+
+        # The Range header of every request of a file, None for requests of the whole file
+        self.ranges = []
+
+
+class StubAPI:
+    """
+    The stub API, listening on a free port of localhost while used as context manager
+    """
+
+    handler_class = StubHandler
+
+    def __init__(self):
+        self.server = None
+        self.thread = None
+
+    @property
+    def host(self):
+        """
+        The URL of the API, as configured in the CLI
+        """
+
+        return f"http://127.0.0.1:{self.server.server_address[1]}/{API_VERSION}"
+
+    @property
+    def storage(self):
+        """
+        The storage provider of the files in buckets
+        """
+
+        return self.server.storage
+
+    def get_file_url(self, name):
+        """
+        Get the URL of a file in the storage, like a signed URL
+
+        :param str name: the name of the file
+        """
+
+        return f"http://127.0.0.1:{self.server.server_address[1]}/storage/{urllib.parse.quote(name)}"
+
+    @property
+    def requests(self):
+        """
+        The (method, path) of the requests the API received
+        """
+
+        return self.server.requests
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.storage = StubStorage()
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
@@ -0,0 +1,143 @@
+"""Tests of downloading single files from buckets, in segments when they're large, from a local stub of the storage."""
+
+import os
+import random
+import tempfile
+import types
+import unittest
+import unittest.mock
+
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.src.helpers.file_helpers import DOWNLOAD_JOURNAL_SUFFIX, download_file_segmented, plan_segments
+
+from tests.stub_api import PROJECT, StubAPI
+
+SEGMENT_SIZE = 1000
+
+
+class TestPlanSegments(unittest.TestCase):
+    def test_plan_segments(self):
+        self.assertEqual(plan_segments(size=0, segment_size=10), [])
+        self.assertEqual(plan_segments(size=1, segment_size=10), [(1, 0, 1)])
+        self.assertEqual(plan_segments(size=10, segment_size=10), [(1, 0, 10)])
+        self.assertEqual(plan_segments(size=11, segment_size=10), [(1, 0, 10), (2, 10, 1)])
+        self.assertEqual(plan_segments(size=30, segment_size=10), [(1, 0, 10), (2, 10, 10), (3, 20, 10)])
+
+
+class TestDownloadFileSegmented(unittest.TestCase):
+    def setUp(self):
+        self.api = StubAPI().__enter__()
+        self.addCleanup(self.api.__exit__)
+
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.output_path = os.path.join(self.directory, "file.bin")
+
+        self.client = unittest.mock.Mock()
+        self.client.files_download.side_effect = lambda **kwargs: types.SimpleNamespace(
+            url=self.api.get_file_url(kwargs["file"])
+        )
+        self.client.files_get.side_effect = lambda **kwargs: types.SimpleNamespace(
+            file=kwargs["file"], size=len(self.api.storage.files[kwargs["file"]]), time_created="2024-01-01T00:00:00Z"
+        )
+
+    def add_file(self, size, name="file.bin"):
+        rng = random.Random(size)
+        data = rng.getrandbits(8 * size).to_bytes(size, "little") if size else b""
+        self.api.storage.files[name] = data
+        return data
+
+    def download(self, name="file.bin", resume=False):
+        received = []
+        download_file_segmented(
+            client=self.client,
+            project_name=PROJECT,
+            bucket_name="default",
+            file_name=name,
+            output_path=self.output_path,
+            segment_size=SEGMENT_SIZE,
+            concurrency=2,
+            resume=resume,
+            callback=received.append,
+        )
+        return sum(received)
+
+    def assert_downloaded(self, data):
+        with open(self.output_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.listdir(self.directory), ["file.bin"])
+
+    def test_single_segment(self):
+        for size in (0, 1, SEGMENT_SIZE):
+            with self.subTest(size=size):
+                data = self.add_file(size)
+                self.api.storage.ranges.clear()
+
+                self.assertEqual(self.download(), size)
+                self.assert_downloaded(data)
+
+                # The file is downloaded with a single request, without requesting its details
+                self.client.files_get.assert_not_called()
+                expected_ranges = [f"bytes=0-{SEGMENT_SIZE - 1}"] + ([None] if size == 0 else [])
+                self.assertEqual(self.api.storage.ranges, expected_ranges)
+
+    def test_segments(self):
+        data = self.add_file(3 * SEGMENT_SIZE + 10)
+
+        self.assertEqual(self.download(), len(data))
+        self.assert_downloaded(data)
+        self.assertEqual(
+            sorted(self.api.storage.ranges),
+            ["bytes=0-999", "bytes=1000-1999", "bytes=2000-2999", "bytes=3000-3009"],
+        )
+
+    def test_ranges_not_supported(self):
+        data = self.add_file(3 * SEGMENT_SIZE)
+        self.api.storage.ignore_ranges = True
+
+        self.download()
+        self.assert_downloaded(data)
+        self.assertEqual(len(self.api.storage.ranges), 1)
+
+    def test_size_unknown(self):
+        data = self.add_file(3 * SEGMENT_SIZE)
+        self.api.storage.hide_size = True
+
+        self.download()
+        self.assert_downloaded(data)
+        self.client.files_get.assert_called_once()
+        self.assertEqual(len(self.api.storage.ranges), 3)
+
+    def test_resume(self):
+        data = self.add_file(5 * SEGMENT_SIZE + 1)
+        self.api.storage.failing_offsets.add(3 * SEGMENT_SIZE)
+
+        with self.assertRaises(UbiOpsException):
+            self.download()
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertTrue(os.path.exists(f"{self.output_path}{DOWNLOAD_JOURNAL_SUFFIX}"))
+
+        self.api.storage.ranges.clear()
+        self.assertEqual(self.download(resume=True), len(data))
+        self.assert_downloaded(data)
+
+        # Only the failed segment is downloaded again
+        self.assertEqual(self.api.storage.ranges, ["bytes=3000-3999"])
+
+    def test_resume_changed_file(self):
+        self.add_file(3 * SEGMENT_SIZE)
+        self.api.storage.failing_offsets.add(2 * SEGMENT_SIZE)
+        with self.assertRaises(UbiOpsException):
+            self.download()
+
+        # The file was replaced by a file of another size, so the earlier download is discarded
+        data = self.add_file(4 * SEGMENT_SIZE)
+        self.api.storage.ranges.clear()
+        self.download(resume=True)
+        self.assert_downloaded(data)
+        self.assertEqual(len(self.api.storage.ranges), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Tests of listing the local files to upload or synchronize."""
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from ubiops_cli.src.helpers.file_helpers import list_local_files
+
+IGNORE_FILE = """\
+venv/
+*.pyc
+data/*
+!data/keep.csv
+/build
+"""
+
+
+class TestListLocalFiles(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        for name in [
+            "main.py",
+            "main.pyc",
+            "src/build/model.py",
+            "build/output.bin",
+            "venv/lib/site-packages/numpy/__init__.py",
+            "data/keep.csv",
+            "data/drop.csv",
+        ]:
+            path = os.path.join(self.directory, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(name)
+        with open(os.path.join(self.directory, ".ubiops-ignore"), "w", encoding="utf-8") as f:
+            f.write(IGNORE_FILE)
+
+    def list_files(self, ignore_filename=".ubiops-ignore"):
+        walked = []
+        real_walk = os.walk
+
+        def walk(*args, **kwargs):
+            for root, dirs, files in real_walk(*args, **kwargs):
+                walked.append(os.path.relpath(root, self.directory).replace(os.sep, "/"))
+                yield root, dirs, files
+
+        with unittest.mock.patch("os.walk", walk):
+            files = list_local_files(directory=self.directory, ignore_filename=ignore_filename)
+        return [relative_path for _, relative_path, _ in files], sorted(walked)
+
+    def test_ignore_file(self):
+        files, walked = self.list_files()
+        self.assertEqual(files, [".ubiops-ignore", "data/keep.csv", "main.py", "src/build/model.py"])
+
+        # Ignored directories aren't walked, unless they may contain files that are re-included
+        self.assertEqual(walked, [".", "data", "src", "src/build"])
+
+    def test_without_ignore_file(self):
+        files, _ = self.list_files(ignore_filename=None)
+        self.assertEqual(len(files), 8)
+        self.assertIn("venv/lib/site-packages/numpy/__init__.py", files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Tests of the on-disk cache of API responses."""
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+import requests
+import ubiops
+
+from ubiops_cli.client import RESTClient
+from ubiops_cli.response_cache import ResponseCache
+
+HOST = "https://api.example.com/v2.1"
+DEPLOYMENTS = "/projects/proj/deployments"
+DEPLOYMENT = "/projects/proj/deployments/dep"
+
+
+def make_response(status_code=200, content=b"{}", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content  # pylint: disable=protected-access
+    response.headers.update(headers or {})
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.database = os.path.join(directory.name, "responses.sqlite")
+        self.cache = ResponseCache(database=self.database, host=HOST, token="token", max_age=60)
+
+    def test_store_and_get(self):
+        self.assertIsNone(self.cache.get(DEPLOYMENT, None))
+
+        self.cache.store(DEPLOYMENT, None, make_response(content=b'{"name": "dep"}', headers={"ETag": '"v1"'}))
+        cached, fresh = self.cache.get(DEPLOYMENT, None)
+        self.assertTrue(fresh)
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.content, b'{"name": "dep"}')
+        self.assertEqual(cached.headers["ETag"], '"v1"')
+
+    def test_keyed_by_query_and_token(self):
+        self.cache.store(DEPLOYMENTS, {"labels": "a"}, make_response(content=b"[1]"))
+        self.assertIsNone(self.cache.get(DEPLOYMENTS, None))
+        self.assertIsNone(self.cache.get(DEPLOYMENTS, {"labels": "b"}))
+        self.assertEqual(self.cache.get(DEPLOYMENTS, [("labels", "a")])[0].content, b"[1]")
+
+        other_user = ResponseCache(database=self.database, host=HOST, token="other", max_age=60)
+        self.assertIsNone(other_user.get(DEPLOYMENTS, {"labels": "a"}))
+
+    def test_revalidate(self):
+        self.cache.store(
+            DEPLOYMENT,
+            None,
+            make_response(headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2020 00:00:00 GMT"}),
+        )
+
+        with unittest.mock.patch("time.time", return_value=time.time() + 120):
+            cached, fresh = self.cache.get(DEPLOYMENT, None)
+            self.assertFalse(fresh)
+            self.assertEqual(
+                ResponseCache.get_validators(cached),
+                {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2020 00:00:00 GMT"},
+            )
+
+            # The API confirmed the response didn't change
+            self.cache.refresh(DEPLOYMENT, None)
+            self.assertTrue(self.cache.get(DEPLOYMENT, None)[1])
+
+    def test_invalidate(self):
+        paths = [
+            "/projects/proj",
+            DEPLOYMENTS,
+            DEPLOYMENT,
+            f"{DEPLOYMENT}/versions",
+            f"{DEPLOYMENT}/versions/v1",
+            "/projects/proj/deployments/dep2",
+            "/projects/proj/pipelines",
+        ]
+        for path in paths:
+            self.cache.store(path, None, make_response())
+
+        self.cache.invalidate("PATCH", f"{DEPLOYMENT}/")
+
+        # The resource, its sub-resources and the resources it belongs to are removed, other resources are kept
+        cached = [path for path in paths if self.cache.get(path, None) is not None]
+        self.assertEqual(cached, ["/projects/proj/deployments/dep2", "/projects/proj/pipelines"])
+
+    def test_is_cacheable(self):
+        self.assertTrue(ResponseCache.is_cacheable("/projects/{project_name}/deployments"))
+        for path in [
+            None,
+            "/projects/{project_name}/buckets/{bucket_name}/files",
+            "/projects/{project_name}/buckets/{bucket_name}/files/{file}",
+            "/projects/{project_name}/buckets/{bucket_name}/files/{file}/download",
+            "/projects/{project_name}/deployments/{deployment_name}/requests/{request_id}",
+        ]:
+            with self.subTest(path=path):
+                self.assertFalse(ResponseCache.is_cacheable(path))
+
+
+class TestRESTClientCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+
+        self.client = RESTClient(ubiops.Configuration(host=HOST), pool_size=1, max_retries=0)
+        self.addCleanup(self.client.close)
+        self.client.response_cache = ResponseCache(
+            database=os.path.join(directory.name, "responses.sqlite"), host=HOST, token="token", max_age=0
+        )
+        self.client.mutation_listeners.append(self.client.response_cache.invalidate)
+        self.client.local.path_template = "/projects/{project_name}/deployments/{deployment_name}"
+
+        self.sent = []
+        self.responses = []
+        send = unittest.mock.patch.object(RESTClient, "_send", side_effect=self.send, autospec=True)
+        send.start()
+        self.addCleanup(send.stop)
+
+    def send(self, _, params, **__):
+        self.sent.append((params["method"], dict(params["headers"])))
+        return self.responses.pop(0)
+
+    def get(self):
+        return self.client.request("GET", HOST, DEPLOYMENT)
+
+    def test_revalidates_with_conditional_request(self):
+        self.responses = [make_response(content=b"v1", headers={"ETag": '"v1"'}), make_response(status_code=304)]
+
+        self.assertEqual(self.get().content, b"v1")
+        self.assertEqual(self.get().content, b"v1")
+        self.assertNotIn("If-None-Match", self.sent[0][1])
+        self.assertEqual(self.sent[1][1]["If-None-Match"], '"v1"')
+
+    def test_uses_fresh_response(self):
+        self.client.response_cache.max_age = 60
+        self.responses = [make_response(content=b"v1")]
+
+        self.get()
+        self.assertEqual(self.get().content, b"v1")
+        self.assertEqual(len(self.sent), 1)
+
+    def test_mutation_invalidates(self):
+        self.client.response_cache.max_age = 60
+        self.responses = [make_response(content=b"v1"), make_response(), make_response(content=b"v2")]
+
+        self.get()
+        self.client.request("PATCH", HOST, DEPLOYMENT, body={})
+        self.assertEqual(self.get().content, b"v2")
+
+    def test_bypass_and_uncacheable_paths(self):
+        self.client.response_cache.max_age = 60
+        self.responses = [make_response(content=b"v1"), make_response(content=b"v2"), make_response(content=b"v3")]
+
+        self.get()
+        with self.client.bypass_cache():
+            self.assertEqual(self.get().content, b"v2")
+
+        self.client.local.path_template = "/projects/{project_name}/buckets/{bucket_name}/files/{file}"
+        self.assertEqual(self.client.request("GET", HOST, "/projects/proj/buckets/b/files/f").content, b"v3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests that the CLI starts without importing heavy modules that the invoked command doesn't need."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the CLI in a fresh interpreter and prints which of the given modules were imported
+SCRIPT = """
+import json
+import sys
+
+from ubiops_cli.main import main
+
+modules = json.loads(sys.argv[2])
+sys.argv = ["ubiops"] + json.loads(sys.argv[1])
+try:
+    main()
+    exit_code = 0
+except SystemExit as e:
+    exit_code = e.code
+sys.stdout.write("\\n" + json.dumps([name for name in modules if name in sys.modules]))
+sys.exit(exit_code)
+"""
+
+HEAVY_MODULES = ["ubiops", "yaml", "tabulate"]
+
+
+def run_cli(args, modules):
+    """
+    Run the CLI in a subprocess
+
+    :param list[str] args: the arguments of the CLI
+    :param list[str] modules: the names of the modules to check
+    :return tuple[int, list[str]]: the exit code and the names of the given modules that were imported
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT, json.dumps(args), json.dumps(modules)],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+        universal_newlines=True,
+    )
+    return process.returncode, json.loads(process.stdout.splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+    def test_version_imports_no_heavy_modules(self):
+        returncode, imported = run_cli(["--version"], HEAVY_MODULES)
+        self.assertEqual(returncode, 0)
+        self.assertEqual(imported, [])
+
+    def test_help_imports_no_heavy_modules(self):
+        returncode, imported = run_cli(["--help"], HEAVY_MODULES)
+        self.assertEqual(returncode, 0)
+        self.assertEqual(imported, [])
+
+    def test_modules_are_detected(self):
+        # Sanity check of the test itself: modules that are imported are reported
+        _, imported = run_cli(["deployments", "--help"], ["click"])
+        self.assertEqual(imported, ["click"])
+
+
+if __name__ == "__main__":
+    unittest.main()
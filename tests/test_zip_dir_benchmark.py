@@ -0,0 +1,130 @@
+"""
+Benchmark of zipping a deployment package with large ignored directories, with and without pruning them from the walk.
+
+Run `python -m tests.test_zip_dir_benchmark` from the root of the repository to print timings, the test cases only
+check that pruning doesn't change the archive.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+from ubiops_cli.utils import zip_dir
+
+IGNORE_FILE = """\
+venv/
+node_modules/
+__pycache__/
+*.pyc
+data/*
+!data/keep.csv
+"""
+
+
+def make_tree(directory, ignored_count):
+    """
+    Create a deployment package with a few packaged files and many ignored ones, like a virtual environment
+
+    :param str directory: the directory to create the package in
+    :param int ignored_count: the number of ignored files to create
+    """
+
+    files = {
+        ".ubiops-ignore": IGNORE_FILE,
+        "deployment.py": "class Deployment:\n    pass\n",
+        "requirements.txt": "numpy\n",
+        "src/model.py": "WEIGHTS = [1, 2, 3]\n",
+        "src/model.pyc": "",
+        "src/__pycache__/model.cpython-39.pyc": "",
+        "data/keep.csv": "a,b\n1,2\n",
+        "data/drop.csv": "a,b\n3,4\n",
+    }
+    for i in range(ignored_count):
+        root = "venv/lib/site-packages" if i % 4 else "node_modules"
+        files[f"{root}/package{i // 1000}/module{i % 1000 // 100}/file{i}.py"] = ""
+
+    for name, content in files.items():
+        path = os.path.join(directory, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def zip_package(directory, output_path, prune):
+    """
+    Zip the deployment package
+
+    :param str directory: the directory of the package
+    :param str output_path: the path of the archive
+    :param bool prune: whether to skip ignored directories, otherwise every file inside them is matched
+    :return tuple[float, str]: the wall time in seconds and the content hash of the archive
+    """
+
+    start = time.perf_counter()
+    if prune:
+        _, _, content_hash = zip_dir(directory=directory, output_path=output_path, force=True, jobs=1)
+    else:
+        with unittest.mock.patch(
+            "ubiops_cli.gitignorefile.gitignorefile._IgnoreRules.ignores_tree_relative", return_value=False
+        ):
+            _, _, content_hash = zip_dir(directory=directory, output_path=output_path, force=True, jobs=1)
+    return time.perf_counter() - start, content_hash
+
+
+def run_benchmarks(ignored_count=200000):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        package_dir = os.path.join(tmp_dir, "package")
+        make_tree(package_dir, ignored_count)
+
+        results = {}
+        for prune in (False, True):
+            output_path = os.path.join(tmp_dir, f"{'pruned' if prune else 'walked'}.zip")
+            seconds, content_hash = zip_package(package_dir, output_path, prune)
+            with open(output_path, "rb") as f:
+                results[prune] = (seconds, content_hash, f.read())
+
+    print(f"zip_dir of a package with {ignored_count:,} ignored files")
+    print(f"{'walk ignored directories':<26} {results[False][0] * 1000:>10.1f} ms")
+    print(f"{'prune ignored directories':<26} {results[True][0] * 1000:>10.1f} ms")
+    print(f"identical archives: {results[False][1:] == results[True][1:]}")
+
+
+class TestZipDirBenchmark(unittest.TestCase):
+    def test_pruning_keeps_archive(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "package")
+            make_tree(package_dir, ignored_count=2000)
+
+            archives = []
+            for prune in (False, True):
+                output_path = os.path.join(tmp_dir, f"{prune}.zip")
+                _, content_hash = zip_package(package_dir, output_path, prune)
+                with open(output_path, "rb") as f:
+                    archives.append((f.read(), content_hash))
+
+        self.assertEqual(archives[0], archives[1])
+
+    def test_prunes_ignored_directories(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "package")
+            make_tree(package_dir, ignored_count=10)
+
+            walked = []
+            real_walk = os.walk
+
+            def walk(*args, **kwargs):
+                for root, dirs, files in real_walk(*args, **kwargs):
+                    walked.append(os.path.relpath(root, package_dir).replace(os.sep, "/"))
+                    yield root, dirs, files
+
+            with unittest.mock.patch("os.walk", walk):
+                zip_package(package_dir, os.path.join(tmp_dir, "package.zip"), prune=True)
+
+        # The data directory contains a re-included file, so it's still walked
+        self.assertEqual(sorted(walked), [".", "data", "src"])
+
+
+if __name__ == "__main__":
+    run_benchmarks()
@@ -0,0 +1,146 @@
+"""Tests of writing zip archives with parts compressed in parallel."""
+
+import os
+import random
+import tempfile
+import unittest
+import unittest.mock
+import zipfile
+import zlib
+
+from ubiops_cli import zip_writer
+
+
+def random_data(rng, size):
+    return rng.getrandbits(8 * size).to_bytes(size, "little") if size else b""
+
+
+class TestCrc32Combine(unittest.TestCase):
+    def test_matches_crc32_of_concatenation(self):
+        rng = random.Random(0)
+        for size1, size2 in [(0, 0), (0, 10), (10, 0), (1, 1), (1000, 3), (7, 65536), (12345, zip_writer.CHUNK_SIZE)]:
+            with self.subTest(size1=size1, size2=size2):
+                data1, data2 = random_data(rng, size1), random_data(rng, size2)
+                self.assertEqual(
+                    zip_writer.crc32_combine(zlib.crc32(data1), zlib.crc32(data2), len(data2)),
+                    zlib.crc32(data1 + data2),
+                )
+
+    def test_combines_chunks(self):
+        data = random_data(random.Random(1), 5 * 1000 + 17)
+        crc = 0
+        for offset in range(0, len(data), 1000):
+            chunk = data[offset : offset + 1000]
+            crc = zip_writer.crc32_combine(crc, zlib.crc32(chunk), len(chunk))
+        self.assertEqual(crc, zlib.crc32(data))
+
+
+class TestWriteZip(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+        self.rng = random.Random(2)
+
+    def make_file(self, name, size, compressible=False):
+        path = os.path.join(self.directory.name, "files", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if compressible:
+            data = (b"0123456789abcdef" * (size // 16 + 1))[:size]
+        else:
+            data = random_data(self.rng, size)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path, name, data
+
+    def write_zip(self, files, name="archive.zip", **kwargs):
+        output_path = os.path.join(self.directory.name, name)
+        content_hash = zip_writer.write_zip(output_path, [(path, arcname) for path, arcname, _ in files], **kwargs)
+        return output_path, content_hash
+
+    def assert_valid_archive(self, output_path, files):
+        with zipfile.ZipFile(output_path) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(sorted(archive.namelist()), sorted(arcname for _, arcname, _ in files))
+            for _, arcname, data in files:
+                self.assertEqual(archive.read(arcname), data)
+
+    def test_sizes_around_chunk_size(self):
+        chunk_size = zip_writer.CHUNK_SIZE
+        sizes = [0, 1, 1000, chunk_size - 1, chunk_size, chunk_size + 1, 2 * chunk_size + 3]
+        for compressible in (False, True):
+            directory = "text" if compressible else "random"
+            files = [self.make_file(f"{directory}/{size}.bin", size=size, compressible=compressible) for size in sizes]
+            for jobs in (1, 4):
+                with self.subTest(compressible=compressible, jobs=jobs):
+                    output_path, _ = self.write_zip(files, jobs=jobs)
+                    self.assert_valid_archive(output_path, files)
+
+    def test_empty_files(self):
+        files = [self.make_file(name="empty.txt", size=0), self.make_file(name="dir/empty", size=0)]
+        output_path, _ = self.write_zip(files)
+        self.assert_valid_archive(output_path, files)
+        with zipfile.ZipFile(output_path) as archive:
+            for info in archive.infolist():
+                self.assertEqual(info.file_size, 0)
+                self.assertEqual(info.CRC, 0)
+
+    def test_no_files(self):
+        output_path, _ = self.write_zip([])
+        self.assert_valid_archive(output_path, [])
+
+    def test_stores_incompressible_files(self):
+        files = [self.make_file(name="random.bin", size=10000), self.make_file("text.txt", 10000, compressible=True)]
+        output_path, _ = self.write_zip(files)
+        self.assert_valid_archive(output_path, files)
+        with zipfile.ZipFile(output_path) as archive:
+            self.assertEqual(archive.getinfo("random.bin").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.getinfo("text.txt").compress_type, zipfile.ZIP_DEFLATED)
+
+    def test_zip64_entries(self):
+        # Lower the zip64 limit instead of writing a file of 2 GiB, both the sizes and offsets then exceed it
+        files = [
+            self.make_file(name="small.txt", size=100, compressible=True),
+            self.make_file(name="large.bin", size=zip_writer.CHUNK_SIZE + 5000),
+            self.make_file(name="large.txt", size=50000, compressible=True),
+        ]
+        with unittest.mock.patch.object(zip_writer, "ZIP64_LIMIT", 1000):
+            output_path, _ = self.write_zip(files)
+
+        self.assert_valid_archive(output_path, files)
+        with zipfile.ZipFile(output_path) as archive:
+            for info in archive.infolist():
+                with self.subTest(name=info.filename):
+                    # The zip64 extra field has header ID 1
+                    has_zip64_extra = info.extra[:2] == b"\x01\x00"
+                    self.assertEqual(has_zip64_extra, info.file_size >= 1000 or info.header_offset >= 1000)
+
+    def test_reproducible_with_different_jobs(self):
+        files = [
+            self.make_file(name="b/model.bin", size=zip_writer.CHUNK_SIZE * 2 + 1),
+            self.make_file(name="a.txt", size=30000, compressible=True),
+            self.make_file(name="c/empty", size=0),
+            self.make_file(name="ünïcode.txt", size=10, compressible=True),
+        ]
+
+        archives = []
+        for jobs in (1, 2, 8):
+            output_path, content_hash = self.write_zip(files, name=f"archive-{jobs}.zip", jobs=jobs, reproducible=True)
+            with open(output_path, "rb") as f:
+                archives.append((f.read(), content_hash))
+
+            # Touching the files doesn't change a reproducible archive
+            for path, _, _ in files:
+                os.utime(path, (0, 1234567890 + jobs))
+
+        self.assertEqual(len(set(archives)), 1)
+        self.assert_valid_archive(os.path.join(self.directory.name, "archive-1.zip"), files)
+
+    def test_content_hash_ignores_compression(self):
+        files = [self.make_file(name="a.txt", size=30000, compressible=True)]
+        _, fast_hash = self.write_zip(files, name="fast.zip", level=zlib.Z_BEST_SPEED)
+        _, best_hash = self.write_zip(files, name="best.zip", level=zlib.Z_BEST_COMPRESSION)
+        self.assertEqual(fast_hash, best_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
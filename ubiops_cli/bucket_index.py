@@ -0,0 +1,285 @@
+import sqlite3
+import time
+
+from contextlib import contextmanager
+
+
+def get_prefix_range(prefix):
+    """
+    Get the range of names that start with a prefix, such that they can be selected with an index
+
+    :param str prefix: the prefix
+    :return tuple[str, str|None]: the first name of the range, and the first name after the range, None if the range
+        is unbounded
+    """
+
+    if not prefix:
+        return "", None
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class BucketIndex:
+    """
+    On-disk inventory of the files in buckets, stored in an SQLite database that is shared by all CLI processes, such
+    that questions about large buckets can be answered without listing their files. It holds:
+
+    - per bucket, the name, size and creation time of its files, together with the refresh that last saw them, such
+      that files that were deleted from the bucket can be removed from the inventory;
+    - per directory in a bucket, i.e., per prefix ending with a '/', the number, total size and creation time of the
+      newest of the files in it and its subdirectories;
+    - per bucket, the prefixes whose files were all indexed, such that a partial inventory isn't mistaken for the
+      whole bucket.
+
+    Refreshes of the same bucket must not run at the same time, see :meth:`start_refresh`.
+    """
+
+    def __init__(self, database):
+        """
+        :param str database: path to the SQLite database
+        """
+
+        self.database = database
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS inventories (id INTEGER PRIMARY KEY, host TEXT, project TEXT, bucket TEXT, "
+                "refresh INTEGER DEFAULT 0, indexed_at REAL, UNIQUE (host, project, bucket))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects (inventory INTEGER, file TEXT, size INTEGER, time_created REAL, "
+                "refresh INTEGER, PRIMARY KEY (inventory, file)) WITHOUT ROWID"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS objects_size ON objects (inventory, size)")
+            connection.execute("CREATE INDEX IF NOT EXISTS objects_time_created ON objects (inventory, time_created)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS directories (inventory INTEGER, directory TEXT, depth INTEGER, "
+                "files INTEGER, size INTEGER, newest REAL, PRIMARY KEY (inventory, directory)) WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS indexed_prefixes (inventory INTEGER, prefix TEXT, indexed_at REAL, "
+                "PRIMARY KEY (inventory, prefix)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        """
+        Open a connection to the database, and commit the changes when done. Connections aren't shared between threads.
+
+        :param bool immediate: whether to lock the database for writing at once, such that nothing changes between the
+            reads and writes of the transaction
+        """
+
+        connection = sqlite3.connect(self.database, timeout=30)
+        try:
+            with connection:
+                if immediate:
+                    connection.execute("BEGIN IMMEDIATE")
+                yield connection
+        finally:
+            connection.close()
+
+    def get_inventory(self, host, project_name, bucket_name):
+        """
+        Get the inventory of a bucket
+
+        :param str host: the API host
+        :param str project_name: the name of the project
+        :param str bucket_name: the name of the bucket
+        :return tuple[int, float]|None: the ID of the inventory and the time it was last refreshed, None if no refresh
+            of the bucket finished yet
+        """
+
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT id, indexed_at FROM inventories WHERE host = ? AND project = ? AND bucket = ? "
+                "AND indexed_at IS NOT NULL",
+                (host, project_name, bucket_name),
+            ).fetchone()
+
+    def is_indexed(self, inventory, prefix):
+        """
+        Whether all files with a prefix were indexed, i.e., a refresh of the prefix or a shorter prefix finished
+
+        :param int inventory: the ID of the inventory
+        :param str prefix: the prefix, empty for all files in the bucket
+        """
+
+        with self._connect() as connection:
+            return (
+                connection.execute(
+                    "SELECT 1 FROM indexed_prefixes WHERE inventory = ? AND substr(?, 1, length(prefix)) = prefix",
+                    (inventory, prefix),
+                ).fetchone()
+                is not None
+            )
+
+    def start_refresh(self, host, project_name, bucket_name):
+        """
+        Start refreshing the inventory of a bucket. The caller must make sure no other refresh of the bucket runs until
+        this refresh finished, as each refresh removes the files that it didn't see.
+
+        :param str host: the API host
+        :param str project_name: the name of the project
+        :param str bucket_name: the name of the bucket
+        :return tuple[int, int]: the ID of the inventory and the number of the refresh
+        """
+
+        with self._connect(immediate=True) as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO inventories (host, project, bucket) VALUES (?, ?, ?)",
+                (host, project_name, bucket_name),
+            )
+            connection.execute(
+                "UPDATE inventories SET refresh = refresh + 1 WHERE host = ? AND project = ? AND bucket = ?",
+                (host, project_name, bucket_name),
+            )
+            return connection.execute(
+                "SELECT id, refresh FROM inventories WHERE host = ? AND project = ? AND bucket = ?",
+                (host, project_name, bucket_name),
+            ).fetchone()
+
+    def store_files(self, inventory, refresh, files):
+        """
+        Store files that were listed by a refresh
+
+        :param int inventory: the ID of the inventory
+        :param int refresh: the number of the refresh
+        :param list[tuple[str, int, float]] files: per file, its name, size and creation time as POSIX timestamp
+        """
+
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)",
+                [(inventory, *file, refresh) for file in files],
+            )
+
+    def finish_refresh(self, inventory, refresh, prefix):
+        """
+        Finish a refresh of the files with a prefix, after all of them were listed: remove the files that weren't seen
+        by the refresh, as they no longer exist, and update the directories that contain the files.
+
+        :param int inventory: the ID of the inventory
+        :param int refresh: the number of the refresh
+        :param str prefix: the prefix of the refreshed files
+        """
+
+        start, end = get_prefix_range(prefix)
+        in_range = "inventory = ? AND file >= ?" + ("" if end is None else " AND file < ?")
+        range_params = (inventory, start) if end is None else (inventory, start, end)
+
+        with self._connect(immediate=True) as connection:
+            connection.execute(f"DELETE FROM objects WHERE {in_range} AND refresh != ?", (*range_params, refresh))
+
+            # Directories whose name starts with the prefix only contain refreshed files, and are counted from scratch
+            directories = {}
+            for file, size, time_created in connection.execute(
+                f"SELECT file, size, time_created FROM objects WHERE {in_range}", range_params
+            ):
+                position = file.find("/", max(len(prefix) - 1, 0))
+                while position >= 0:
+                    directory = directories.setdefault(file[: position + 1], [0, 0, time_created])
+                    directory[0] += 1
+                    directory[1] += size
+                    directory[2] = max(directory[2], time_created)
+                    position = file.find("/", position + 1)
+
+            connection.execute(
+                "DELETE FROM directories WHERE inventory = ? AND directory >= ?"
+                + ("" if end is None else " AND directory < ?"),
+                range_params,
+            )
+            connection.executemany(
+                "INSERT INTO directories VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (inventory, directory, directory.count("/"), *totals)
+                    for directory, totals in directories.items()
+                    if len(directory) >= len(prefix)
+                ],
+            )
+
+            # The bucket root and the directories the prefix is in also contain files that weren't refreshed
+            ancestors = [""] + [prefix[: i + 1] for i, char in enumerate(prefix[:-1]) if char == "/"]
+            for ancestor in ancestors:
+                ancestor_start, ancestor_end = get_prefix_range(ancestor)
+                files, size, newest = connection.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0), MAX(time_created) FROM objects "
+                    "WHERE inventory = ? AND file >= ?" + ("" if ancestor_end is None else " AND file < ?"),
+                    (inventory, ancestor_start) if ancestor_end is None else (inventory, ancestor_start, ancestor_end),
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?, ?)",
+                    (inventory, ancestor, ancestor.count("/"), files, size, newest),
+                )
+
+            # The prefix covers the prefixes that start with it
+            indexed_at = time.time()
+            connection.execute(
+                "DELETE FROM indexed_prefixes WHERE inventory = ? AND prefix >= ?"
+                + ("" if end is None else " AND prefix < ?"),
+                range_params,
+            )
+            connection.execute("INSERT INTO indexed_prefixes VALUES (?, ?, ?)", (inventory, prefix, indexed_at))
+            connection.execute("UPDATE inventories SET indexed_at = ? WHERE id = ?", (indexed_at, inventory))
+
+    def get_directories(self, inventory, directory, depth):
+        """
+        Get the usage of a directory and its subdirectories
+
+        :param int inventory: the ID of the inventory
+        :param str directory: the directory, empty for the bucket root or ending with a '/'
+        :param int depth: the number of levels of subdirectories to include
+        :return list[tuple[str, int, int, float|None]]: per directory, sorted by name, its name, the number and total
+            size of the files in it, and the creation time of the newest file
+        """
+
+        start, end = get_prefix_range(directory)
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT directory, files, size, newest FROM directories WHERE inventory = ? AND directory >= ? "
+                + ("" if end is None else "AND directory < ? ")
+                + "AND depth <= ? ORDER BY directory",
+                (
+                    (inventory, start, directory.count("/") + depth)
+                    if end is None
+                    else (inventory, start, end, directory.count("/") + depth)
+                ),
+            ).fetchall()
+
+    def find_files(self, inventory, prefix=None, glob=None, min_size=None, newer_than=None, newest=None):
+        """
+        Find files in the inventory
+
+        :param int inventory: the ID of the inventory
+        :param str|None prefix: only find the files whose name starts with this prefix
+        :param str|None glob: only find the files whose name matches this glob pattern, like 'outputs/*.json'
+        :param int|None min_size: only find the files of at least this size
+        :param float|None newer_than: only find the files created after this POSIX timestamp
+        :param int|None newest: only find this number of the newest files, sorted from new to old; otherwise all
+            files are found, sorted by name
+        :return generator[tuple[str, int, float]]: per file, its name, size and creation time as POSIX timestamp
+        """
+
+        conditions, params = ["inventory = ?"], [inventory]
+        if prefix:
+            start, end = get_prefix_range(prefix)
+            conditions.append("file >= ? AND file < ?")
+            params.extend([start, end])
+        if glob is not None:
+            conditions.append("file GLOB ?")
+            params.append(glob)
+        if min_size is not None:
+            conditions.append("size >= ?")
+            params.append(min_size)
+        if newer_than is not None:
+            conditions.append("time_created > ?")
+            params.append(newer_than)
+
+        query = f"SELECT file, size, time_created FROM objects WHERE {' AND '.join(conditions)}"
+        if newest is not None:
+            query = f"{query} ORDER BY time_created DESC LIMIT ?"
+            params.append(newest)
+        else:
+            query = f"{query} ORDER BY file"
+
+        with self._connect() as connection:
+            yield from connection.execute(query, params)
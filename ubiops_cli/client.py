@@ -0,0 +1,435 @@
+import email.utils
+import random
+import re
+import threading
+import time
+import urllib.parse
+
+from contextlib import contextmanager, nullcontext
+
+import requests
+import requests_toolbelt
+import tqdm
+
+from requests_toolbelt.adapters.socket_options import TCPKeepAliveAdapter
+
+import ubiops as api
+
+from ubiops.exceptions import ApiConnectionError, ApiException, ApiRequestError, ApiTimeoutError, ApiValueError
+from ubiops.rest import RESTClientObject
+
+from ubiops_cli import tracing
+from ubiops_cli.concurrency import AdaptiveLimiter
+
+# Methods of which requests can safely be sent again, as sending them multiple times has the same effect as once
+RETRY_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+# Response statuses of transient errors, e.g., when the API is restarting or overloaded
+RETRY_STATUSES = [502, 503, 504]
+
+
+class RESTClient(RESTClientObject):
+    """
+    REST client that sends all requests through one session with a keep-alive connection pool, instead of opening a new
+    session (and TLS connection) for every request like the client library does
+    """
+
+    def __init__(self, configuration, pool_size, max_retries=5, backoff_factor=0.5, max_backoff=60):
+        """
+        :param ubiops.Configuration configuration: the configuration of the client library
+        :param int pool_size: the maximum number of connections to keep alive per host
+        :param int max_retries: the maximum number of times to retry a request that failed with a transient error
+        :param float backoff_factor: the base number of seconds to wait before retrying, doubled for every retry
+        :param float max_backoff: the maximum number of seconds to wait before retrying
+        """
+
+        super().__init__(configuration)
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        # Limits the number of requests sent at the same time, and lowers the limit when requests are rate limited
+        self.limiter = AdaptiveLimiter(maximum=pool_size)
+
+        self.session = requests.Session()
+
+        # Allow for long running requests (>600s GCP, >350s AWS) using the TCPKeepAliveAdapter
+        adapter = TCPKeepAliveAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Functions to call after a request that modifies data succeeded, e.g., to invalidate cached responses
+        self.mutation_listeners = []
+
+        # Cache of responses to GET requests, None if responses are not cached
+        self.response_cache = None
+
+        # State of the current thread, like the path template of the client library method that makes the request
+        self.local = threading.local()
+
+    def close(self):
+        """
+        Close all connections in the pool
+        """
+
+        self.session.close()
+
+    @contextmanager
+    def bypass_cache(self):
+        """
+        Don't use cached responses for the requests made by the current thread, e.g., when polling the status of a
+        resource
+        """
+
+        previous = getattr(self.local, "bypass_cache", False)
+        self.local.bypass_cache = True
+        try:
+            yield
+        finally:
+            self.local.bypass_cache = previous
+
+    # pylint: disable=too-many-arguments,too-many-branches
+    def request(
+        self,
+        method,
+        host,
+        resource_path,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        stream=False,
+        _request_timeout=None,
+        progress_bar=False,
+    ):
+        """
+        Perform request
+
+        :param str method: http request method
+        :param str host: base url
+        :param str resource_path: path to method endpoint
+        :param query_params: query parameters in the url
+        :param dict headers: http request headers
+        :param body: request json body, for `application/json`
+        :param post_params: request post parameters, `application/x-www-form-urlencoded` and `multipart/form-data`
+        :param bool stream: whether to use streaming or not
+        :param _request_timeout: timeout setting for this request
+        :param bool progress_bar: whether to show a progress bar for uploading files
+        """
+
+        method = method.upper()
+        assert method in ["GET", "HEAD", "DELETE", "POST", "PUT", "PATCH", "OPTIONS"]
+
+        if post_params and body:
+            raise ApiValueError("body parameter cannot be used with post_params parameter")
+
+        post_params = post_params or {}
+        headers = headers or {}
+
+        if "Content-Type" not in headers:
+            headers["Content-Type"] = "application/json"
+
+        params = {
+            "method": method,
+            "url": host + resource_path,
+            "stream": stream,
+            "timeout": _request_timeout,
+            "headers": headers,
+            "cert": self.cert,
+            "verify": self.verify,
+        }
+
+        start = time.perf_counter()
+
+        use_cache = (
+            self.response_cache is not None
+            and method == "GET"
+            and not stream
+            and not getattr(self.local, "bypass_cache", False)
+            and self.response_cache.is_cacheable(getattr(self.local, "path_template", None))
+        )
+        cached = self.response_cache.get(resource_path, query_params) if use_cache else None
+        if cached is not None:
+            cached, fresh = cached
+            if fresh:
+                self._trace(method=method, resource_path=resource_path, start=start, retries=0, cache="hit")
+                return cached
+
+            # Ask the API to only send the response if it changed
+            headers.update(self.response_cache.get_validators(cached))
+
+        # Requests with files can't be sent again, as the files are closed after sending them
+        can_retry = not post_params
+        attempt = 0
+        try:
+            while True:
+                with self.limiter:
+                    try:
+                        response = self._send(
+                            params=params,
+                            query_params=query_params,
+                            body=body,
+                            post_params=post_params,
+                            progress_bar=progress_bar,
+                        )
+                    except (ApiConnectionError, ApiTimeoutError):
+                        if not (can_retry and method in RETRY_METHODS and attempt < self.max_retries):
+                            raise
+                        response = None
+
+                if response is not None and response.status_code == 429:
+                    # Rate limited requests were not processed, so they can always be retried
+                    self.limiter.on_throttled()
+                    if not (can_retry and self.auto_retry_rate_limiting):
+                        break
+
+                elif response is not None:
+                    if response.status_code < 500:
+                        self.limiter.on_success()
+                    if not (
+                        can_retry
+                        and method in RETRY_METHODS
+                        and response.status_code in RETRY_STATUSES
+                        and attempt < self.max_retries
+                    ):
+                        break
+
+                delay = self._get_retry_delay(response=response, attempt=attempt)
+                if response is not None:
+                    response.close()
+
+                attempt += 1
+                time.sleep(delay)
+
+        except ApiException as e:
+            self._trace(method=method, resource_path=resource_path, start=start, retries=attempt, error=e.reason)
+            raise
+
+        self._trace(
+            method=method,
+            resource_path=resource_path,
+            start=start,
+            retries=attempt,
+            response=response,
+            stream=stream,
+            cache="revalidated" if cached is not None and response.status_code == 304 else None,
+        )
+
+        if cached is not None and response.status_code == 304:
+            self.response_cache.refresh(resource_path, query_params)
+            return cached
+
+        if use_cache and response.status_code == 200:
+            self.response_cache.store(resource_path, query_params, response)
+
+        if not 200 <= response.status_code <= 299:
+            raise ApiRequestError(requests_resp=response)
+
+        if method not in ["GET", "HEAD", "OPTIONS"]:
+            for listener in self.mutation_listeners:
+                listener(method, resource_path)
+
+        return response
+
+    def _send(self, params, query_params, body, post_params, progress_bar):
+        """
+        Send a request once
+
+        :param dict params: the parameters of the request
+        :param query_params: query parameters in the url
+        :param body: request json body, for `application/json`
+        :param post_params: request post parameters, `application/x-www-form-urlencoded` and `multipart/form-data`
+        :param bool progress_bar: whether to show a progress bar for uploading files
+        """
+
+        method = params["method"]
+        headers = params["headers"]
+        params = dict(params)
+
+        try:
+            if method in ["POST", "PUT", "PATCH", "OPTIONS", "DELETE"]:
+                if query_params:
+                    params["url"] += "?" + urllib.parse.urlencode(query_params)
+
+                if re.search("json", headers["Content-Type"], re.IGNORECASE):
+                    response = self.session.request(**params, json=body)
+
+                elif headers["Content-Type"] in ["multipart/form-data", "application/x-www-form-urlencoded"]:
+                    response = self._request_multipart(
+                        params=params, post_params=post_params, progress_bar=progress_bar
+                    )
+
+                elif isinstance(body, (str, bytes)):
+                    response = self.session.request(**params, data=body)
+
+                else:
+                    raise ApiException(
+                        status=0,
+                        reason="Cannot prepare a request message for provided arguments. Please check that your"
+                        " arguments match declared content type.",
+                    )
+
+            else:
+                response = self.session.request(**params, params=query_params)
+
+        except requests.exceptions.ConnectionError as e:
+            raise ApiConnectionError(status=0, reason=f"{type(e).__name__}\n{e}")
+
+        except requests.exceptions.Timeout as e:
+            raise ApiTimeoutError(status=0, reason=f"{type(e).__name__}\n{e}")
+
+        except requests.exceptions.RequestException as e:
+            raise ApiRequestError(status=0, reason=f"{type(e).__name__}\n{e}")
+
+        return response
+
+    def _trace(self, method, resource_path, start, retries, response=None, stream=False, error=None, cache=None):
+        """
+        Record the request in the active trace, if requests are traced
+
+        :param str method: the request method
+        :param str resource_path: the path of the request
+        :param float start: the performance counter value at which the request started
+        :param int retries: the number of times the request was retried
+        :param requests.Response|None response: the final response, None if no response was received
+        :param bool stream: whether the response is streamed, i.e., its body is not read yet
+        :param str|None error: the error that occurred, if no response was received
+        :param str|None cache: 'hit' if the response was served from the response cache, 'revalidated' if the API
+            confirmed the cached response didn't change
+        """
+
+        tracer = tracing.get_tracer()
+        if tracer is None:
+            return
+
+        # Use the path template of the client library method, such that calls to the same endpoint can be grouped
+        path = getattr(self.local, "path_template", None) or resource_path
+
+        if cache == "hit":
+            tracer.record(method=method, path=path, start=start, status=200, cache=cache)
+            return
+
+        if response is None:
+            tracer.record(method=method, path=path, start=start, retries=retries, error=str(error))
+            return
+
+        request_body = response.request.body
+        if request_body is None:
+            bytes_out = 0
+        elif isinstance(request_body, (str, bytes)):
+            bytes_out = len(request_body)
+        else:
+            bytes_out = getattr(request_body, "len", 0)
+
+        if stream:
+            bytes_in = int(response.headers.get("Content-Length", 0))
+        else:
+            bytes_in = len(response.content)
+
+        tracer.record(
+            method=method,
+            path=path,
+            start=start,
+            status=response.status_code,
+            ttfb=response.elapsed.total_seconds(),
+            bytes_out=bytes_out,
+            bytes_in=bytes_in,
+            retries=retries,
+            cache=cache,
+        )
+
+    def _get_retry_delay(self, response, attempt):
+        """
+        Get the number of seconds to wait before retrying a request. The `Retry-After` or rate limit reset header of
+        the response is respected if given, otherwise exponential backoff with full jitter is used.
+
+        :param requests.Response|None response: the response of the failed request, None if no response was received
+        :param int attempt: the number of retries done so far
+        """
+
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    try:
+                        retry_date = email.utils.parsedate_to_datetime(retry_after)
+                        return max(0.0, retry_date.timestamp() - time.time())
+                    except (TypeError, ValueError):
+                        pass
+
+            if response.status_code == 429 and response.headers.get("x-ratelimit-reset"):
+                # Add 1 extra second to be sure in case reset time was rounded down
+                return int(response.headers["x-ratelimit-reset"]) + 1
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+
+    def _request_multipart(self, params, post_params, progress_bar):
+        """
+        Send a multipart form request, e.g., to upload a file
+
+        :param dict params: the parameters of the request
+        :param post_params: the form fields to send
+        :param bool progress_bar: whether to show a progress bar for uploading files
+        """
+
+        encoder = requests_toolbelt.MultipartEncoder(fields=dict(post_params))
+
+        if progress_bar:
+            cm = tqdm.tqdm(
+                unit="B", unit_scale=True, unit_divisor=1024, miniters=1, desc="Uploading", total=encoder.len
+            )
+        else:
+            cm = nullcontext()
+
+        with cm as bar:
+            if bar:
+                encoder = requests_toolbelt.MultipartEncoderMonitor(
+                    encoder, lambda monitor: bar.update(monitor.bytes_read - bar.n)
+                )
+
+            try:
+                params["headers"]["Content-Type"] = encoder.content_type
+                return self.session.request(**params, data=encoder)
+            finally:
+                self.close_files(post_params)
+
+
+class ApiClient(api.ApiClient):
+    """
+    API client of the client library using the pooled REST client
+    """
+
+    def __init__(self, configuration, pool_size, max_retries=5):
+        """
+        :param ubiops.Configuration configuration: the configuration of the client library
+        :param int pool_size: the maximum number of connections to keep alive per host
+        :param int max_retries: the maximum number of times to retry a request that failed with a transient error
+        """
+
+        super().__init__(configuration)
+        self.rest_client = RESTClient(configuration, pool_size=pool_size, max_retries=max_retries)
+
+    def call_api(self, resource_path, *args, **kwargs):
+        """
+        Make a request to the API, see :meth:`ubiops.ApiClient.call_api`. The path template of the request is
+        remembered, such that traced requests can be grouped by endpoint.
+
+        :param str resource_path: the path template of the endpoint, like '/projects/{project_name}/deployments'
+        """
+
+        self.rest_client.local.path_template = resource_path
+        try:
+            return super().call_api(resource_path, *args, **kwargs)
+        finally:
+            self.rest_client.local.path_template = None
+
+    def close(self):
+        """
+        Close the thread pool and the connection pool
+        """
+
+        super().close()
+        self.rest_client.close()
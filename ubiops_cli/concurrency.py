@@ -0,0 +1,125 @@
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """
+    Limits the number of operations running at the same time, and adapts the limit to the load of the API in AIMD
+    (additive increase, multiplicative decrease) style. Each operation that succeeded raises the limit by a fraction,
+    such that the limit grows by one every time a full window of operations succeeded. An operation that was rate
+    limited halves the limit, at most once per cool-down period, such that a burst of rate-limited responses to
+    operations that were started at the same time only counts once.
+
+    Use the limiter as a context manager around an operation, and report its outcome:
+
+    ```
+    with limiter:
+        response = send()
+        if response.status_code == 429:
+            limiter.on_throttled()
+        else:
+            limiter.on_success()
+    ```
+    """
+
+    def __init__(self, maximum, minimum=1, initial=None, cooldown=1.0):
+        """
+        :param int maximum: the maximum number of operations to run at the same time
+        :param int minimum: the minimum number of operations to allow at the same time
+        :param int|None initial: the initial limit, defaults to the maximum
+        :param float cooldown: the minimum number of seconds between two decreases of the limit
+        """
+
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.cooldown = cooldown
+
+        self._limit = float(initial if initial is not None else maximum)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """
+        The current number of operations that may run at the same time
+        """
+
+        with self._condition:
+            return int(self._limit)
+
+    def acquire(self):
+        """
+        Wait until the operation may start
+        """
+
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        """
+        Mark the operation as finished
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        """
+        Additively increase the limit after an operation succeeded
+        """
+
+        with self._condition:
+            if self._limit < self.maximum:
+                self._limit = min(self.maximum, self._limit + 1 / int(self._limit))
+                self._condition.notify_all()
+
+    def on_throttled(self):
+        """
+        Multiplicatively decrease the limit after an operation was rate limited
+        """
+
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._limit = max(self.minimum, self._limit / 2)
+                self._last_decrease = now
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *_):
+        self.release()
+
+
+class RateLimiter:
+    """
+    Limits the rate at which operations start, shared by all threads. Operations are spread evenly: each operation
+    waits until the previous one started at least `1 / rate` seconds ago.
+    """
+
+    def __init__(self, rate):
+        """
+        :param float rate: the maximum number of operations per second
+        """
+
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until the next operation may start
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+
+        if start > now:
+            time.sleep(start - now)
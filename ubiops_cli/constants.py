@@ -17,7 +17,10 @@ WARNING_STATUSES = [
     "confirmation_pending",
 ]
 ERROR_STATUSES = ["failed", "cancelled_pending", "cancelled"]
+PIPELINE_REQUIRED_FIELDS = ["input_type"]
 DEFAULT_IGNORE_FILE = ".ubiops-ignore"
 IMPLICIT_ENVIRONMENT_FILES = ["ubiops.yaml", "requirements.txt", "install_packages.R", "environment.yaml"]
 
+UNAUTHORIZED_MESSAGE = "Unauthorized. Please, use 'ubiops signin' first."
+
 UPDATE_TIME = 30  # seconds to wait between update and new file upload
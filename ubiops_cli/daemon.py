@@ -0,0 +1,506 @@
+import json
+import os
+import queue
+import signal
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.version import VERSION
+
+# Maximum size of a message header, requests with a larger argv or environment are read in multiple chunks
+CHUNK_SIZE = 65536
+
+# The number of seconds a client may take to send its command after connecting
+RECEIVE_TIMEOUT = 10
+
+# The exit code of a command that was interrupted with Ctrl-C
+INTERRUPTED_EXIT_CODE = 130
+
+
+def is_supported():
+    """
+    Whether the daemon is supported on this platform. It requires Unix domain sockets that can pass file descriptors
+    and tell the user of the process on the other end.
+    """
+
+    return (
+        hasattr(socket, "AF_UNIX")
+        and hasattr(socket, "send_fds")
+        and (hasattr(socket, "SO_PEERCRED") or hasattr(socket, "LOCAL_PEERCRED"))
+    )
+
+
+def get_socket_dir():
+    """
+    Get the directory of the socket of the daemon: the runtime directory of the user if the platform has one, or a
+    directory in the temporary directory otherwise, to keep the path within the length limit of Unix domain sockets
+    """
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isabs(runtime_dir):
+        return os.path.join(runtime_dir, "ubiops-cli")
+    return os.path.join(tempfile.gettempdir(), f"ubiops-cli-{os.getuid()}")
+
+
+def get_socket_path():
+    """
+    Get the path of the socket of the daemon
+    """
+
+    return os.path.join(get_socket_dir(), "daemon.sock")
+
+
+def is_private_dir(directory):
+    """
+    Whether a directory is owned by the current user and only accessible by them. Symbolic links are not followed, such
+    that another user can't redirect the socket to a directory they control.
+
+    :param str directory: path to the directory
+    """
+
+    try:
+        status = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(status.st_mode) and status.st_uid == os.getuid() and stat.S_IMODE(status.st_mode) == 0o700
+
+
+def get_peer_uid(sock):
+    """
+    Get the user ID of the process on the other end of a connected Unix domain socket
+
+    :param socket.socket sock: the connected socket
+    :return int|None: the user ID, or None if it can't be determined
+    """
+
+    try:
+        if hasattr(socket, "SO_PEERCRED"):
+            # Linux: struct ucred with the process, user and group ID
+            credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            return struct.unpack("3i", credentials)[1]
+        if hasattr(socket, "LOCAL_PEERCRED"):
+            # BSD and macOS: struct xucred, starting with its version and the user ID, followed by up to 16 groups
+            credentials = sock.getsockopt(getattr(socket, "SOL_LOCAL", 0), socket.LOCAL_PEERCRED, 76)
+            return struct.unpack_from("2I", credentials)[1]
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def send_message(sock, message, fds=None):
+    """
+    Send a JSON message over the socket, optionally together with file descriptors
+
+    :param socket.socket sock: the connected socket
+    :param dict message: the message to send
+    :param list[int]|None fds: the file descriptors to pass to the other process
+    """
+
+    data = json.dumps(message).encode("utf-8") + b"\n"
+    if fds:
+        sent = socket.send_fds(sock, [data[:CHUNK_SIZE]], fds)
+        data = data[sent:]
+    sock.sendall(data)
+
+
+def receive_message(sock, num_fds=0):
+    """
+    Receive a JSON message from the socket, optionally together with file descriptors
+
+    :param socket.socket sock: the connected socket
+    :param int num_fds: the maximum number of file descriptors to receive
+    :return tuple[dict|None, list[int]]: the message, or None if the connection was closed, and the received file
+        descriptors
+    """
+
+    if num_fds:
+        data, fds, _, _ = socket.recv_fds(sock, CHUNK_SIZE, num_fds)
+    else:
+        data, fds = sock.recv(CHUNK_SIZE), []
+
+    while data and not data.endswith(b"\n"):
+        chunk = sock.recv(CHUNK_SIZE)
+        if not chunk:
+            break
+        data += chunk
+
+    if not data.endswith(b"\n"):
+        return None, fds
+    return json.loads(data), fds
+
+
+def connect(timeout=None):
+    """
+    Connect to the running daemon
+
+    :param float|None timeout: the timeout of socket operations in seconds, None to wait indefinitely
+    :return socket.socket|None: the connected socket, or None if no daemon is running
+    """
+
+    if not is_supported():
+        return None
+
+    # Never send the environment and standard streams to a socket that another user may have placed
+    if not is_private_dir(get_socket_dir()):
+        return None
+
+    socket_path = get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    if get_peer_uid(sock) != os.getuid():
+        sock.close()
+        return None
+    return sock
+
+
+def forward(args):
+    """
+    Run the command in the daemon if it is running. The standard input, output and error of this process are passed to
+    the daemon, such that the command reads from and writes to them directly. Pressing Ctrl-C interrupts the command in
+    the daemon.
+
+    :param list[str] args: the command line arguments
+    :return int|None: the exit code of the command, or None if the command should run in this process
+    """
+
+    sock = connect()
+    if sock is None:
+        return None
+
+    command_id = uuid.uuid4().hex
+    with sock:
+        try:
+            send_message(
+                sock=sock,
+                message={
+                    "id": command_id,
+                    "args": args,
+                    "cwd": os.getcwd(),
+                    "env": dict(os.environ),
+                    "version": VERSION,
+                },
+                fds=[sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()],
+            )
+        except (OSError, ValueError):
+            # The daemon didn't receive the command, so it's safe to run it in this process
+            return None
+
+        while True:
+            try:
+                response, _ = receive_message(sock)
+            except KeyboardInterrupt:
+                # Interrupt the command in the daemon, and wait until it stopped
+                send_action("interrupt", command_id=command_id)
+                continue
+            except (OSError, ValueError):
+                response = None
+            break
+
+    if response is None:
+        # Don't run the command again, the daemon may have already (partially) executed it
+        sys.stderr.write("Error: the connection with the UbiOps CLI daemon was lost\n")
+        return 1
+
+    # The daemon declines commands it can't run, e.g., because it runs a different version of the CLI or is busy
+    return response.get("exit_code")
+
+
+def send_action(action, command_id=None):
+    """
+    Send an action, like 'status', 'stop' or 'interrupt', to the running daemon
+
+    :param str action: the action to perform
+    :param str|None command_id: the ID of the command to interrupt
+    :return dict|None: the response of the daemon, or None if no daemon is running
+    """
+
+    sock = connect(timeout=10)
+    if sock is None:
+        return None
+
+    with sock:
+        try:
+            send_message(sock, {"action": action, "id": command_id})
+            response, _ = receive_message(sock)
+        except (OSError, ValueError):
+            return None
+    return response
+
+
+def start(timeout=30):
+    """
+    Start the daemon in a new background process and wait until it accepts commands
+
+    :param float timeout: the maximum time to wait for the daemon to start in seconds
+    :return dict|None: the status of the started daemon, or None if it didn't start in time
+    """
+
+    socket_dir = get_socket_dir()
+    if os.path.lexists(socket_dir) and not is_private_dir(socket_dir):
+        raise UbiOpsException(f"The directory {socket_dir} must be owned by you and only accessible by you (mode 700)")
+
+    with open(os.devnull, "r+b") as devnull:
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-c", "from ubiops_cli.daemon import serve; serve()"],
+            stdin=devnull,
+            stdout=devnull,
+            stderr=devnull,
+            start_new_session=True,
+        )
+
+    end = time.time() + timeout
+    while time.time() < end:
+        response = send_action("status")
+        if response is not None:
+            return response
+        time.sleep(0.1)
+    return None
+
+
+class _DaemonState:
+    """
+    State of the daemon that is shared between the thread accepting connections and the main thread running commands
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        # The commands to run in the main thread, as tuples of the connection, message and file descriptors, or None to
+        # stop the daemon
+        self.commands = queue.Queue()
+
+        # The ID of the command that's running, None when the daemon is idle
+        self.running = None
+
+        # Whether the main thread is executing a command, i.e., an interrupt would stop the command
+        self.in_command = False
+
+
+def serve():
+    """
+    Run the daemon: accept commands on the socket and execute them in this process, sharing one API client. Commands run
+    one at a time in the main thread. Commands sent while another command is running are declined, such that the client
+    runs them in its own process instead of waiting.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops_cli.main import LAZY_COMMANDS, cli, main
+    from ubiops_cli.utils import SessionClientContext
+
+    # Import all commands up front, such that no command pays the import time
+    for _, name, _, _ in LAZY_COMMANDS:
+        cli.get_command(None, name)
+
+    socket_dir = get_socket_dir()
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not is_private_dir(socket_dir):
+        raise UbiOpsException(f"The directory {socket_dir} must be owned by you and only accessible by you (mode 700)")
+
+    socket_path = get_socket_path()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(128)
+
+    state = _DaemonState()
+    client_context = SessionClientContext()
+
+    def interrupt(*_):
+        # Only interrupt commands, a late interrupt of a command that already finished is ignored
+        if state.in_command:
+            raise KeyboardInterrupt
+
+    signal.signal(signal.SIGINT, interrupt)
+    threading.Thread(target=_accept_connections, args=(server, state), daemon=True).start()
+
+    try:
+        while True:
+            command = state.commands.get()
+            if command is None:
+                break
+
+            conn, message, fds = command
+            with conn:
+                try:
+                    exit_code = _run_command(
+                        message=message, fds=fds, state=state, client_context=client_context, main=main
+                    )
+                    send_message(conn, {"exit_code": exit_code})
+                except OSError:
+                    # The client went away, continue with the next one
+                    pass
+                finally:
+                    for fd in fds:
+                        os.close(fd)
+                    with state.lock:
+                        state.running = None
+    finally:
+        server.close()
+        client_context.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def _accept_connections(server, state):
+    """
+    Accept connections to the daemon and handle them, until the daemon is stopped
+
+    :param socket.socket server: the listening socket
+    :param _DaemonState state: the state of the daemon
+    """
+
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            # The socket was closed
+            return
+
+        if not _handle_connection(conn, state=state):
+            state.commands.put(None)
+            return
+
+
+def _handle_connection(conn, state):
+    """
+    Handle one connection to the daemon. Commands are passed to the main thread together with the connection, which
+    then sends the exit code.
+
+    :param socket.socket conn: the accepted connection
+    :param _DaemonState state: the state of the daemon
+    :return bool: whether the daemon should keep running
+    """
+
+    if get_peer_uid(conn) != os.getuid():
+        conn.close()
+        return True
+
+    fds = []
+    try:
+        # Don't let a client that doesn't send anything block other clients
+        conn.settimeout(RECEIVE_TIMEOUT)
+        message, fds = receive_message(conn, num_fds=3)
+        conn.settimeout(None)
+
+        if message is None:
+            pass
+
+        elif message.get("action") == "stop":
+            send_message(conn, {"pid": os.getpid()})
+            return False
+
+        elif message.get("action") == "status":
+            send_message(conn, {"pid": os.getpid(), "version": VERSION, "busy": state.running is not None})
+
+        elif message.get("action") == "interrupt":
+            with state.lock:
+                interrupted = message.get("id") is not None and state.running == message["id"]
+                if interrupted:
+                    signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+            send_message(conn, {"interrupted": interrupted})
+
+        elif message.get("version") != VERSION or len(fds) != 3:
+            send_message(conn, {"exit_code": None})
+
+        else:
+            with state.lock:
+                busy = state.running is not None
+                if not busy:
+                    state.running = message.get("id") or uuid.uuid4().hex
+
+            if busy:
+                send_message(conn, {"exit_code": None})
+            else:
+                # The main thread owns the connection and file descriptors from now on
+                state.commands.put((conn, message, fds))
+                return True
+
+    except (OSError, ValueError):
+        # The client went away or sent an invalid message, continue with the next one
+        pass
+
+    for fd in fds:
+        os.close(fd)
+    conn.close()
+    return True
+
+
+def _run_command(message, fds, state, client_context, main):
+    """
+    Run a command with the working directory, environment and standard streams of the client process
+
+    :param dict message: the command sent by the client
+    :param list[int] fds: the standard input, output and error of the client process
+    :param _DaemonState state: the state of the daemon
+    :param ubiops_cli.utils.SessionClientContext client_context: the API client shared by all commands
+    :param callable main: the main function of the CLI
+    :return int: the exit code of the command
+    """
+
+    original_cwd = os.getcwd()
+    original_env = dict(os.environ)
+    original_fds = [os.dup(fd) for fd in range(3)]
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for fd, client_fd in enumerate(fds):
+        os.dup2(client_fd, fd)
+
+    # Use new stream objects, such that no buffered data of a previous command is used
+    sys.stdin = os.fdopen(0, "r", closefd=False)
+    sys.stdout = os.fdopen(1, "w", closefd=False)
+    sys.stderr = os.fdopen(2, "w", closefd=False)
+
+    try:
+        os.chdir(message["cwd"])
+        os.environ.clear()
+        os.environ.update(message["env"])
+
+        try:
+            state.in_command = True
+            try:
+                main(args=message["args"], obj=client_context, prog_name="ubiops")
+                exit_code = 0
+            finally:
+                # Interrupts that arrive from now on are ignored
+                state.in_command = False
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except KeyboardInterrupt:
+            exit_code = INTERRUPTED_EXIT_CODE
+        except Exception:  # pylint: disable=broad-except
+            exit_code = 1
+
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        for fd, original_fd in enumerate(original_fds):
+            os.dup2(original_fd, fd)
+            os.close(original_fd)
+
+        os.chdir(original_cwd)
+        os.environ.clear()
+        os.environ.update(original_env)
+
+    return exit_code
@@ -0,0 +1,265 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+
+from contextlib import contextmanager
+
+from ubiops_cli.file_index import hash_file
+
+
+class DownloadCache:
+    """
+    On-disk cache of downloaded files, shared by all CLI processes. The content of each file is stored once in the
+    cache directory, named after its SHA-256 hash, and an SQLite database maps versions of files in buckets to their
+    content. A version of a file is identified by the API host, project, bucket, file name, and the creation time and
+    size of the file in the bucket.
+
+    Cached files are hard linked to the output path when possible, and copied otherwise. A cached file that was
+    modified through one of its links is detected by its changed size or modification time, and discarded. When the
+    cache grows beyond its maximum size, the least recently used files are removed.
+    """
+
+    def __init__(self, directory, max_size):
+        """
+        :param str directory: the cache directory
+        :param int max_size: the maximum total size of the cached files in bytes
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+        self.blobs_dir = os.path.join(directory, "blobs")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, sha256 TEXT)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                "last_used REAL)"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection to the database, and commit the changes when done. Connections aren't shared between threads.
+        """
+
+        connection = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def get_key(host, project_name, bucket_name, file):
+        """
+        Get the key of a version of a file in a bucket
+
+        :param str host: the API host
+        :param str project_name: the name of the project
+        :param str bucket_name: the name of the bucket
+        :param ubiops.FileItem file: the file in the bucket
+        """
+
+        return hashlib.sha256(
+            f"{host}\n{project_name}\n{bucket_name}\n{file.file}\n{file.time_created.isoformat()}\n{file.size}".encode()
+        ).hexdigest()
+
+    def _blob_path(self, sha256):
+        """
+        Get the path of a cached file
+
+        :param str sha256: the hash of the content of the file
+        """
+
+        return os.path.join(self.blobs_dir, sha256[:2], sha256)
+
+    @staticmethod
+    def _add_stat(connection, name, value=1):
+        """
+        Increase a statistic of the cache
+
+        :param sqlite3.Connection connection: the connection to the database
+        :param str name: the name of the statistic
+        :param int value: the value to add
+        """
+
+        connection.execute(
+            "INSERT INTO stats VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, value),
+        )
+
+    def fetch(self, key, output_path):
+        """
+        Store the cached content of a file at the output path
+
+        :param str key: the key of the file
+        :param str output_path: the path to store the file at
+        :return bool: whether the file was cached
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT blobs.sha256, size, mtime_ns FROM entries JOIN blobs ON entries.sha256 = blobs.sha256 "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if row is not None:
+            sha256, size, mtime_ns = row
+            blob_path = self._blob_path(sha256)
+            try:
+                stat = os.stat(blob_path)
+                if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                    # The cached file was modified through one of its links, or by another process
+                    self._remove_blobs([(sha256, size)])
+                    row = None
+                else:
+                    self._place(blob_path, output_path)
+            except FileNotFoundError:
+                # The cached file was removed by another process
+                row = None
+
+        with self._connect() as connection:
+            if row is None:
+                self._add_stat(connection, "misses")
+                return False
+
+            connection.execute("UPDATE blobs SET last_used = ? WHERE sha256 = ?", (time.time(), row[0]))
+            self._add_stat(connection, "hits")
+            self._add_stat(connection, "hit_bytes", row[1])
+        return True
+
+    def store(self, key, file_path):
+        """
+        Add a downloaded file to the cache, and remove the least recently used files when the cache grows beyond its
+        maximum size. Files larger than the maximum size aren't cached.
+
+        :param str key: the key of the file
+        :param str file_path: the path of the downloaded file
+        """
+
+        size = os.path.getsize(file_path)
+        if size > self.max_size:
+            return
+
+        sha256 = hash_file(file_path)
+        blob_path = self._blob_path(sha256)
+        with self._connect() as connection:
+            row = connection.execute("SELECT size, mtime_ns FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+
+        # Files with the same content are stored once, unless the cached file was modified
+        try:
+            stat = os.stat(blob_path)
+            unchanged = row is not None and (stat.st_size, stat.st_mtime_ns) == row
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._place(file_path, blob_path)
+            stat = os.stat(blob_path)
+
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?)",
+                (sha256, stat.st_size, stat.st_mtime_ns, time.time()),
+            )
+            connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?)", (key, sha256))
+
+        self.prune(max_size=self.max_size)
+
+    @staticmethod
+    def _place(source, destination):
+        """
+        Hard link a file to a destination, or copy it if that's not possible, e.g., when the destination is on another
+        file system. An existing destination is replaced atomically.
+
+        :param str source: the path of the file
+        :param str destination: the path to link or copy the file to
+        """
+
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            return
+
+        partial_path = f"{destination}.{uuid.uuid4().hex}.part"
+        try:
+            try:
+                os.link(source, partial_path)
+            except OSError:
+                shutil.copyfile(source, partial_path)
+            os.replace(partial_path, destination)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def _get_evictions(self, max_size):
+        """
+        Get the least recently used files to remove to reduce the size of the cache to a maximum size
+
+        :param int max_size: the maximum size of the cache in bytes
+        :return list[tuple[str, int]]: the hash and size of the files to remove
+        """
+
+        with self._connect() as connection:
+            rows = connection.execute("SELECT sha256, size FROM blobs ORDER BY last_used DESC").fetchall()
+
+        evictions, total_size = [], 0
+        for sha256, size in rows:
+            total_size += size
+            if total_size > max_size:
+                evictions.append((sha256, size))
+        return evictions
+
+    def _remove_blobs(self, blobs):
+        """
+        Remove files from the cache
+
+        :param list[tuple[str, int]] blobs: the hash and size of the files to remove
+        """
+
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM entries WHERE sha256 = ?", [(sha256,) for sha256, _ in blobs])
+            connection.executemany("DELETE FROM blobs WHERE sha256 = ?", [(sha256,) for sha256, _ in blobs])
+        for sha256, _ in blobs:
+            try:
+                os.remove(self._blob_path(sha256))
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_size):
+        """
+        Remove the least recently used files until the size of the cache doesn't exceed the maximum size
+
+        :param int max_size: the maximum size of the cache in bytes
+        :return tuple[int, int]: the number of removed files and their total size in bytes
+        """
+
+        evictions = self._get_evictions(max_size)
+        self._remove_blobs(evictions)
+        return len(evictions), sum(size for _, size in evictions)
+
+    def get_stats(self):
+        """
+        Get statistics of the cache: the number of cached files and their total size, the number of downloads that used
+        the cache and that didn't, the number of bytes that didn't need to be downloaded, and the number of bytes that
+        are removed when the cache is pruned to its maximum size.
+
+        :return dict[str, int]: the statistics
+        """
+
+        with self._connect() as connection:
+            files, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            counters = dict(connection.execute("SELECT name, value FROM stats"))
+
+        return {
+            "files": files,
+            "size": size,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "hit_bytes": counters.get("hit_bytes", 0),
+            "reclaimable": sum(size for _, size in self._get_evictions(self.max_size)),
+        }
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import sqlite3
+
+# Size of the blocks in which files are read to compute their hash
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path):
+    """
+    Compute the SHA-256 hash of the content of a file
+
+    :param str file_path: the path of the file
+    """
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class FileIndex:
+    """
+    On-disk index used to synchronize directories with buckets, stored in an SQLite database that is shared by all CLI
+    processes. It holds:
+
+    - the content hash of local files, together with the size and modification time they had when they were hashed,
+      such that files only need to be hashed again when they changed;
+    - per synchronized pair of directory and bucket prefix, the state of each file when it was last transferred: its
+      content hash, its size and the time the remote file was created, such that unchanged files are skipped.
+    """
+
+    def __init__(self, database):
+        """
+        :param str database: path to the SQLite database
+        """
+
+        self.connection = sqlite3.connect(database, timeout=30)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS synced ("
+                "pair TEXT, path TEXT, size INTEGER, time_created REAL, sha256 TEXT, PRIMARY KEY (pair, path))"
+            )
+
+    def get_hashes(self, directory):
+        """
+        Get the indexed hashes of the files in a directory and its subdirectories
+
+        :param str directory: absolute path of the directory
+        :return dict[str, tuple[int, int, str]]: per file path, its size and modification time when it was hashed, and
+            its hash
+        """
+
+        # All paths inside the directory sort between '<directory>/' and '<directory>0', as '0' follows '/'
+        start = os.path.join(directory, "")
+        end = start[:-1] + chr(ord(start[-1]) + 1)
+        rows = self.connection.execute(
+            "SELECT path, size, mtime_ns, sha256 FROM files WHERE path >= ? AND path < ?", (start, end)
+        )
+        return {path: (size, mtime_ns, sha256) for path, size, mtime_ns, sha256 in rows}
+
+    def store_hashes(self, hashes):
+        """
+        Store the hashes of files
+
+        :param list[tuple[str, int, int, str]] hashes: per file, its path, size, modification time and hash
+        """
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", hashes)
+
+    def get_synced(self, pair):
+        """
+        Get the state of the files of a synchronized pair when they were last transferred
+
+        :param str pair: the key of the pair of directory and bucket prefix
+        :return dict[str, tuple[int, float|None, str]]: per relative file path, its size, the creation time of the
+            remote file as POSIX timestamp, None if not known yet, and its hash
+        """
+
+        rows = self.connection.execute("SELECT path, size, time_created, sha256 FROM synced WHERE pair = ?", (pair,))
+        return {path: (size, time_created, sha256) for path, size, time_created, sha256 in rows}
+
+    def store_synced(self, pair, files):
+        """
+        Store the state of transferred files of a synchronized pair
+
+        :param str pair: the key of the pair of directory and bucket prefix
+        :param list[tuple[str, int, float|None, str]] files: per file, its relative path, size, creation time of the
+            remote file and hash
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO synced VALUES (?, ?, ?, ?, ?)", [(pair, *file) for file in files]
+            )
+
+    def remove_synced(self, pair, paths):
+        """
+        Remove the state of files of a synchronized pair, after they were deleted
+
+        :param str pair: the key of the pair of directory and bucket prefix
+        :param list[str] paths: the relative paths of the files
+        """
+
+        with self.connection:
+            self.connection.executemany("DELETE FROM synced WHERE pair = ? AND path = ?", [(pair, p) for p in paths])
+
+    def close(self):
+        """
+        Close the database
+        """
+
+        self.connection.close()
@@ -7,16 +7,22 @@ import re
 DEFAULT_IGNORE_NAMES = [".gitignore", ".git/info/exclude"]
 
 
-def parse(path, base_path=None):
+def parse(path, base_path=None, compiled=False):
     """Parses single `.gitignore` file.
 
     Args:
         path (str): Path to `.gitignore` file.
         base_path (str): Base path for applying ignore rules.
+        compiled (bool, optional): Match all rules at once with combined regular expressions, which is faster for files
+            with many rules.
 
     Returns:
         Callable[[str], bool]: Callable which returns `True` if specified path is ignored.
             You can also pass `is_dir: bool` optional parameter if you know whether the specified path is a directory.
+            The callable also has an `ignores_tree(path)` method which returns `True` if the specified directory and
+            everything inside it is ignored, so a directory walk doesn't need to enter it. Both have a `*_relative()`
+            variant which takes a path relative to the base path with `/` separators, so a directory walk doesn't need
+            to split absolute paths.
     """
 
     if base_path is None:
@@ -30,7 +36,7 @@ def parse(path, base_path=None):
             if rule:
                 rules.append(rule)
 
-    return _IgnoreRules(rules, base_path).match
+    return _CompiledIgnoreRules(rules, base_path) if compiled else _IgnoreRules(rules, base_path)
 
 
 def ignore(ignore_names=DEFAULT_IGNORE_NAMES):
@@ -254,8 +260,11 @@ def _rule_from_pattern(pattern):
                 pattern = pattern[:i]
         i -= 1
 
-    regexp = _fnmatch_pathname_to_regexp(pattern, anchored, directory_only)
-    return _IgnoreRule(regexp, negation, directory_only)
+    # Anchored patterns can only match paths which start with their literal part.
+    literal_prefix = re.match(r"[^*?[\\]*", pattern).group() if anchored else None
+
+    prefix, body = _fnmatch_pathname_to_regexp(pattern, anchored, directory_only)
+    return _IgnoreRule(prefix, body, negation, directory_only, literal_prefix)
 
 
 class _IgnoreRules:
@@ -274,29 +283,123 @@ class _IgnoreRules:
             if is_dir is None:
                 is_dir = path.isdir()  # TODO Pass callable here.
 
-            if self.__can_return_immediately:
-                return any((r.match(rel_path, is_dir) for r in self.__rules))
+            return self.match_relative(rel_path, is_dir)
 
-            else:
-                matched = False
-                for rule in self.__rules:
-                    if rule.match(rel_path, is_dir):
-                        matched = not rule.negation
+        else:
+            return False
 
-                else:
-                    return matched
+    __call__ = match
+
+    def match_relative(self, rel_path, is_dir):
+        if self.__can_return_immediately:
+            return any((r.match(rel_path, is_dir) for r in self.__rules))
 
         else:
+            matched = False
+            for rule in self.__rules:
+                if rule.match(rel_path, is_dir):
+                    matched = not rule.negation
+
+            else:
+                return matched
+
+    def ignores_tree(self, path):
+        if isinstance(path, str):
+            path = _Path(path)
+
+        rel_path = path.relpath(self.__base_path)
+        return rel_path is not None and self.ignores_tree_relative(rel_path)
+
+    def ignores_tree_relative(self, rel_path):
+        if not self.match_relative(rel_path, True):
+            return False
+
+        if self.__can_return_immediately:
+            return True
+
+        # Every rule which matches the directory also matches everything inside it, so only a negation rule can
+        # re-include a path inside it. Be conservative and don't prune if any negation rule could match there.
+        rel_dir = f"{rel_path}/"
+        return not any((r.negation and r.may_match_inside(rel_dir) for r in self.__rules))
+
+
+class _CompiledIgnoreRules(_IgnoreRules):
+    # Matches all rules at once with a few regular expressions per type of target, as a directory matches rules which
+    # only match directories and a file doesn't.
+
+    def __init__(self, rules, base_path):
+        super().__init__(rules, base_path)
+
+        # Any match wins within rules of the same kind: rules with the same tail are merged, and unanchored rules share
+        # their prefix.
+        self.__ignores = [
+            _compile_alternatives(_merge_rules([r for r in rules if not r.negation], is_dir))
+            for is_dir in (False, True)
+        ]
+        self.__includes = [
+            _compile_alternatives(_merge_rules([r for r in rules if r.negation], is_dir)) for is_dir in (False, True)
+        ]
+
+        # Last match wins between rules of different kinds: alternatives are tried in order, so put the last rule first
+        # and see which one matched. Only needed for paths that match both kinds of rules.
+        self.__negations = [r.negation for r in reversed(rules)]
+        self.__ordered = [
+            _compile_alternatives([f"({r.prefix}{r.body}{r.tail(is_dir)})" for r in reversed(rules)])
+            for is_dir in (False, True)
+        ]
+
+    def match_relative(self, rel_path, is_dir):
+        is_dir = bool(is_dir)
+
+        ignore = self.__ignores[is_dir]
+        if ignore is None or ignore(rel_path) is None:
             return False
 
+        include = self.__includes[is_dir]
+        if include is None or include(rel_path) is None:
+            return True
+
+        return not self.__negations[self.__ordered[is_dir](rel_path).lastindex - 1]
+
+
+def _merge_rules(rules, is_dir):
+    alternatives = []
+    for tail in sorted({r.tail(is_dir) for r in rules}):
+        bodies = [r.body for r in rules if r.tail(is_dir) == tail and not r.prefix]
+        unanchored_bodies = [r.body for r in rules if r.tail(is_dir) == tail and r.prefix]
+        if unanchored_bodies:
+            bodies.append(f"{_UNANCHORED_PREFIX}(?:{'|'.join(unanchored_bodies)})")
+        alternatives.append(f"(?:{'|'.join(bodies)}){tail}")
+
+    return alternatives
+
+
+def _compile_alternatives(alternatives):
+    return re.compile("|".join(alternatives)).match if alternatives else None
+
 
 class _IgnoreRule:
-    def __init__(self, regexp, negation, directory_only):
-        self.__regexp = re.compile(regexp)
+    def __init__(self, prefix, body, negation, directory_only, literal_prefix=None):
+        self.__prefix = prefix
+        self.__body = body
+        self.__regexp = re.compile(f"{prefix}{body}{'(/.+)?$' if directory_only else _TAIL}")
         self.__negation = negation
         self.__directory_only = directory_only
+        self.__literal_prefix = literal_prefix
         self.__match = self.__regexp.match
 
+    @property
+    def prefix(self):
+        return self.__prefix
+
+    @property
+    def body(self):
+        return self.__body
+
+    def tail(self, is_dir):
+        # Without a group, so rules can be combined. A file only matches a rule for directories if it is inside one.
+        return "/.+$" if self.__directory_only and not is_dir else _TAIL
+
     @property
     def regexp(self):
         return self.__regexp
@@ -310,10 +413,15 @@ class _IgnoreRule:
 
         # If we need a directory, check there is something after slash and if there is not, target must be a directory.
         # If there is something after slash then it's a directory irrelevant to type of target.
-        # `self.directory_only` implies we have group number 1.
-        # N.B. Question mark inside a group without a name can shift indices. :(
+        # `self.directory_only` implies we have group number 1, as the body has no groups.
         return m and (not self.__directory_only or m.group(1) is not None or is_dir)
 
+    def may_match_inside(self, rel_dir):
+        # Unanchored patterns can match in any directory, anchored ones only where their literal part leads to.
+        if self.__literal_prefix is None:
+            return True
+        return self.__literal_prefix.startswith(rel_dir) or rel_dir.startswith(self.__literal_prefix)
+
 
 if os.altsep is not None:
     _all_seps_expr = f"[{re.escape(os.sep)}{re.escape(os.altsep)}]"
@@ -323,6 +431,10 @@ else:
     _path_split = lambda path: path.split(os.sep)
 
 
+_UNANCHORED_PREFIX = "(?:.+/)?"
+_TAIL = "(?:/.+)?$"
+
+
 def _fnmatch_pathname_to_regexp(pattern, anchored, directory_only):
     # Implements `fnmatch` style-behavior, as though with `FNM_PATHNAME` flagged;
     # the path separator will not match shell-style `*` and `.` wildcards.
@@ -330,16 +442,18 @@ def _fnmatch_pathname_to_regexp(pattern, anchored, directory_only):
     # Frustratingly, python's fnmatch doesn't provide the FNM_PATHNAME
     # option that `.gitignore`'s behavior depends on.
 
+    # Returns the prefix and the body of the regular expression. The body has no groups, so bodies can be combined.
+
     if not pattern:
         if directory_only:
-            return "[^/]+(/.+)?$"  # Empty name means no path fragment.
+            return "", "[^/]+"  # Empty name means no path fragment.
 
         else:
-            return ".*"
+            return "", ".*"
 
     i, n = 0, len(pattern)
 
-    res = ["(?:^|.+/)" if not anchored else ""]
+    res = []
     while i < n:
         c = pattern[i]
         i += 1
@@ -348,7 +462,7 @@ def _fnmatch_pathname_to_regexp(pattern, anchored, directory_only):
                 i += 1
                 if i < n and pattern[i] == "/":
                     i += 1
-                    res.append("(.+/)?")  # `/**/` matches `/`.
+                    res.append("(?:.+/)?")  # `/**/` matches `/`.
 
                 else:
                     res.append(".*")
@@ -382,10 +496,4 @@ def _fnmatch_pathname_to_regexp(pattern, anchored, directory_only):
         else:
             res.append(re.escape(c))
 
-    if directory_only:  # In this case we are interested if there is something after slash.
-        res.append("(/.+)?$")
-
-    else:
-        res.append("(?:/.+)?$")
-
-    return "".join(res)
+    return "" if anchored else _UNANCHORED_PREFIX, "".join(res)
@@ -0,0 +1,99 @@
+"""Micro-benchmarks of matching paths against large rule sets.
+
+Run `python -m tests.test_benchmark` to print timings, the test cases only check that all modes agree.
+"""
+
+import io
+import os
+import random
+import timeit
+import unittest
+import unittest.mock
+
+import gitignorefile
+
+
+BASE_PATH = "/home/michael/project"
+
+
+def make_rules(count, negations):
+    rng = random.Random(count)
+    rules = ["venv/", "node_modules/", ".git/", "__pycache__/", "*.py[cod]", "/build", "/dist/**", "**/logs/*.log"]
+    while len(rules) < count:
+        name = f"{rng.choice(['data', 'cache', 'tmp', 'out', 'assets'])}{rng.randrange(100)}"
+        rules.append(
+            rng.choice(
+                [
+                    f"*.{name}",
+                    f"{name}/",
+                    f"/{name}",
+                    f"src/{name}/*.bin",
+                    f"**/{name}/*.json",
+                    f"{name}?.txt",
+                    f"[a-f]{name}",
+                ]
+            )
+        )
+        if negations and rng.random() < 0.1:
+            rules.append(rng.choice([f"!/{name}/keep", f"!*.{name}.keep", f"!src/{name}/model.bin"]))
+    return rules
+
+
+def make_paths(count):
+    rng = random.Random(count)
+    directories = ["src", "src/models", "data3/raw", "venv/lib/site-packages", "tests/logs", "build", "dist/wheels"]
+    paths = []
+    for i in range(count):
+        directory = rng.choice(directories)
+        name = rng.choice([f"module{i}.py", f"module{i}.pyc", f"table{i}.data{i % 100}", f"app{i}.log", "keep"])
+        paths.append((f"{directory}/{name}", rng.random() < 0.1))
+    return paths
+
+
+def parse_rules(rules, compiled):
+    with unittest.mock.patch("builtins.open", lambda _: io.StringIO("\n".join(rules))):
+        return gitignorefile.parse(f"{BASE_PATH}/.gitignore", base_path=BASE_PATH, compiled=compiled)
+
+
+def run_benchmarks(rule_counts=(10, 100, 500), path_count=20000, number=3):
+    paths = make_paths(path_count)
+    abs_paths = [(f"{BASE_PATH}/{path}", is_dir) for path, is_dir in paths]
+
+    print(f"{'rules':>6} {'negations':>9} {'mode':>18} {'paths/s':>12}")
+    for rule_count in rule_counts:
+        for negations in (False, True):
+            rules = make_rules(rule_count, negations)
+            for compiled in (False, True):
+                matches = parse_rules(rules, compiled)
+                for relative in (False, True):
+                    if relative:
+                        call = lambda: [matches.match_relative(path, is_dir) for path, is_dir in paths]
+                    else:
+                        call = lambda: [matches(path, is_dir=is_dir) for path, is_dir in abs_paths]
+
+                    seconds = min(timeit.repeat(call, number=1, repeat=number))
+                    mode = f"{'compiled' if compiled else 'rules'}{', relative' if relative else ''}"
+                    print(f"{rule_count:>6} {str(negations):>9} {mode:>18} {path_count / seconds:>12,.0f}")
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_modes_agree(self):
+        paths = make_paths(500)
+        for rule_count in (10, 100, 500):
+            for negations in (False, True):
+                with self.subTest(rules=rule_count, negations=negations):
+                    rules = make_rules(rule_count, negations)
+                    matches = parse_rules(rules, compiled=False)
+                    compiled_matches = parse_rules(rules, compiled=True)
+                    for path, is_dir in paths:
+                        expected = bool(matches(f"{BASE_PATH}/{path}", is_dir=is_dir))
+                        self.assertEqual(bool(compiled_matches(f"{BASE_PATH}/{path}", is_dir=is_dir)), expected)
+                        self.assertEqual(bool(compiled_matches.match_relative(path, is_dir)), expected)
+                        directory = os.path.dirname(path)
+                        self.assertEqual(
+                            compiled_matches.ignores_tree_relative(directory), matches.ignores_tree_relative(directory)
+                        )
+
+
+if __name__ == "__main__":
+    run_benchmarks()
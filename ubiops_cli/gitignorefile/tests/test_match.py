@@ -9,6 +9,8 @@ import gitignorefile
 
 
 class TestMatch(unittest.TestCase):
+    compiled = False
+
     def test_simple(self):
         matches = self.__parse_gitignore_string(["__pycache__/", "*.py[cod]"], mock_base_path="/home/michael")
         for is_dir in (False, True):
@@ -491,6 +493,54 @@ class TestMatch(unittest.TestCase):
         self.assertFalse(matches("/home/robert/.test_venv", is_dir=False))
         self.assertTrue(matches("/home/robert/.test_venv", is_dir=True))
 
+    def test_ignores_tree(self):
+        matches = self.__parse_gitignore_string(["venv/", "*.log", "/data/*", "build"], mock_base_path="/home/michael")
+        self.assertTrue(matches.ignores_tree("/home/michael/venv"))
+        self.assertTrue(matches.ignores_tree("/home/michael/src/build"))
+        self.assertTrue(matches.ignores_tree("/home/michael/data/raw"))
+        self.assertFalse(matches.ignores_tree("/home/michael/data"))
+        self.assertFalse(matches.ignores_tree("/home/michael/src"))
+        self.assertFalse(matches.ignores_tree("/home/heather/venv"))
+
+    def test_ignores_tree_with_negation(self):
+        matches = self.__parse_gitignore_string(
+            ["/data/", "!/data/keep/*.csv", "venv/", "/models/*", "!/models/best", "cache/", "!*.keep"],
+            mock_base_path="/home/michael",
+        )
+        self.assertFalse(matches.ignores_tree("/home/michael/data"))
+        self.assertTrue(matches("/home/michael/data/skip/file.csv"))
+        self.assertFalse(matches("/home/michael/data/keep/file.csv"))
+        self.assertFalse(matches.ignores_tree("/home/michael/models/best"))
+        self.assertFalse(matches.ignores_tree("/home/michael/venv"))
+        self.assertFalse(matches("/home/michael/venv/lib/.keep"))
+
+        matches = self.__parse_gitignore_string(
+            ["/data/", "!/data/keep/*.csv", "venv/"], mock_base_path="/home/michael"
+        )
+        self.assertTrue(matches.ignores_tree("/home/michael/venv"))
+        self.assertFalse(matches.ignores_tree("/home/michael/data"))
+
+        matches = self.__parse_gitignore_string(["/models/*", "!/models/best"], mock_base_path="/home/michael")
+        self.assertTrue(matches.ignores_tree("/home/michael/models/old"))
+        self.assertFalse(matches.ignores_tree("/home/michael/models/best"))
+
+    def test_relative(self):
+        matches = self.__parse_gitignore_string(
+            ["__pycache__/", "*.py[cod]", "/build", "!/build/keep"], mock_base_path="/home/michael"
+        )
+        self.assertTrue(matches.match_relative("dir/main.pyc", is_dir=False))
+        self.assertFalse(matches.match_relative("dir/main.py", is_dir=False))
+        self.assertFalse(matches.match_relative("dir/__pycache__", is_dir=False))
+        self.assertTrue(matches.match_relative("dir/__pycache__", is_dir=True))
+        self.assertTrue(matches.match_relative("build/out.txt", is_dir=False))
+        self.assertFalse(matches.match_relative("build/keep", is_dir=False))
+        self.assertTrue(matches.ignores_tree_relative("dir/__pycache__"))
+        self.assertFalse(matches.ignores_tree_relative("build"))
+
     def __parse_gitignore_string(self, data, mock_base_path):
         with unittest.mock.patch("builtins.open", lambda _: io.StringIO("\n".join(data))):
-            return gitignorefile.parse(f"{mock_base_path}/.gitignore", base_path=mock_base_path)
+            return gitignorefile.parse(f"{mock_base_path}/.gitignore", base_path=mock_base_path, compiled=self.compiled)
+
+
+class TestCompiledMatch(TestMatch):
+    compiled = True
@@ -2,36 +2,11 @@ import json
 import sys
 
 import click
-import ubiops as api
-
-from ubiops_cli.src import (
-    auth,
-    buckets,
-    completions,
-    config,
-    deployment_revisions,
-    deployment_versions,
-    deployments,
-    environment_builds,
-    environment_revisions,
-    environment_variables,
-    environments,
-    exports,
-    files,
-    imports,
-    instance_type_groups,
-    instance_types,
-    instances,
-    pipelines,
-    pipeline_versions,
-    projects,
-    project_instances,
-    logs,
-    run_local,
-    request_schedules,
-    validation,
-)
+
+from ubiops_cli import daemon, tracing
+from ubiops_cli.constants import UNAUTHORIZED_MESSAGE
 from ubiops_cli.src.helpers.click_helpers import CustomGroup
+from ubiops_cli.utils import ClientContext, invalidate_auth_cache
 from ubiops_cli.version import VERSION
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
@@ -39,42 +14,94 @@ CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
 
 @click.group(cls=CustomGroup, context_settings=CONTEXT_SETTINGS)
 @click.version_option(VERSION, prog_name="UbiOps CLI")
-def cli():
+@click.option(
+    "--trace",
+    required=False,
+    default=None,
+    is_flag=False,
+    flag_value="-",
+    metavar="[<path>]",
+    help="Trace all API calls: write a JSON line per call to the given file (or stderr if no file is given), and print "
+    "a summary to stderr",
+)
+@click.option(
+    "--max_age",
+    "max_age",
+    required=False,
+    default=None,
+    type=click.FloatRange(min=0),
+    metavar="<seconds>",
+    help="Cache the responses of the API, and use cached responses up to this age without checking whether they "
+    "changed",
+)
+@click.pass_context
+def cli(ctx, trace, max_age):
     """UbiOps command line interface (CLI)"""
 
-    return
-
-
-cli.add_command(auth.signin)
-cli.add_command(auth.status)
-cli.add_command(auth.user)
-cli.add_command(auth.signout)
-cli.add_command(completions.commands)
-cli.add_command(config.commands)
-cli.add_command(projects.current_project)
-cli.add_command(projects.commands)
-cli.add_command(deployments.commands)
-cli.add_command(deployment_versions.commands)
-cli.add_command(deployment_revisions.commands)
-cli.add_command(environments.commands)
-cli.add_command(environment_revisions.commands)
-cli.add_command(environment_builds.commands)
-cli.add_command(instance_type_groups.commands)
-cli.add_command(instance_types.commands)
-cli.add_command(instances.commands)
-cli.add_command(project_instances.commands)
-cli.add_command(pipelines.commands)
-cli.add_command(pipeline_versions.commands)
-cli.add_command(buckets.commands)
-cli.add_command(files.commands)
-cli.add_command(environment_variables.commands)
-cli.add_command(logs.commands)
-cli.add_command(logs.audit_events)
-cli.add_command(request_schedules.commands)
-cli.add_command(exports.commands)
-cli.add_command(imports.commands)
-cli.add_command(validation.commands)
-cli.add_command(run_local.deployment_run_local)
+    # Share one API client between all commands and helpers of this invocation
+    if ctx.obj is None:
+        ctx.obj = ClientContext()
+        ctx.obj.cache_max_age = max_age
+        ctx.call_on_close(ctx.obj.close)
+
+    elif max_age is not None:
+        # Commands run by the daemon, shell or batch share a client context, the option only applies to this command
+        previous_max_age = ctx.obj.cache_max_age
+        ctx.obj.cache_max_age = max_age
+        ctx.call_on_close(lambda: setattr(ctx.obj, "cache_max_age", previous_max_age))
+
+    if trace is not None:
+        tracing.start(trace)
+        ctx.call_on_close(tracing.stop)
+
+
+# Commands are registered lazily, so only the modules (and client library) needed by the invoked command are imported
+# fmt: off
+LAZY_COMMANDS = [
+    ("ubiops_cli.src.auth:signin", "signin", None, "Sign in using your credentials"),
+    ("ubiops_cli.src.auth:status", "status", None, "Get login status"),
+    ("ubiops_cli.src.auth:user", "user", None, "The current user interacting with the CLI"),
+    ("ubiops_cli.src.auth:signout", "signout", None, "Sign out of the CLI"),
+    ("ubiops_cli.src.completions:commands", "complete", None, "Enable shell completion"),
+    ("ubiops_cli.src.config:commands", "config", None, "Manage your CLI configurations"),
+    ("ubiops_cli.src.projects:current_project", "current_project", ["cprj"], "Manage your current CLI project"),
+    ("ubiops_cli.src.projects:commands", "projects", ["prj"], "Manage your projects"),
+    ("ubiops_cli.src.deployments:commands", "deployments", ["dpl"], "Manage your deployments"),
+    ("ubiops_cli.src.deployment_versions:commands", "deployment_versions", ["versions"],
+     "Manage your deployment versions"),
+    ("ubiops_cli.src.deployment_revisions:commands", "version_revisions", ["revisions"],
+     "Manage your deployment version revisions"),
+    ("ubiops_cli.src.environments:commands", "environments", ["envs"], "Manage your environments"),
+    ("ubiops_cli.src.environment_revisions:commands", "environment_revisions", ["env_revisions"],
+     "Manage your environment revisions"),
+    ("ubiops_cli.src.environment_builds:commands", "environment_builds", ["env_builds"],
+     "Manage your environment builds"),
+    ("ubiops_cli.src.instance_type_groups:commands", "instance_type_groups", None, "Manage your instance type groups"),
+    ("ubiops_cli.src.instance_types:commands", "instance_types", None, "Manage your instance types"),
+    ("ubiops_cli.src.instances:commands", "instances", None, "Manage your instances for deployments"),
+    ("ubiops_cli.src.project_instances:commands", "project_instances", None, "Manage your instances"),
+    ("ubiops_cli.src.pipelines:commands", "pipelines", ["ppl"], "Manage your pipelines"),
+    ("ubiops_cli.src.pipeline_versions:commands", "pipeline_versions", ["pversions"], "Manage your pipeline versions"),
+    ("ubiops_cli.src.buckets:commands", "buckets", None, "Manage your buckets"),
+    ("ubiops_cli.src.files:commands", "files", None, "Manage your files"),
+    ("ubiops_cli.src.environment_variables:commands", "environment_variables", ["env"],
+     "Manage your environment variables"),
+    ("ubiops_cli.src.logs:commands", "logs", None, "View your logs"),
+    ("ubiops_cli.src.logs:audit_events", "audit_events", ["audit"], "View your audit events"),
+    ("ubiops_cli.src.request_schedules:commands", "schedules", None, "Manage your request schedules"),
+    ("ubiops_cli.src.exports:commands", "exports", None, "Manage your exports"),
+    ("ubiops_cli.src.imports:commands", "imports", None, "Manage your imports"),
+    ("ubiops_cli.src.validation:commands", "validate", None, "Validate a file"),
+    ("ubiops_cli.src.run_local:deployment_run_local", "run_local", None,
+     "Run a deployment locally in current environment"),
+    ("ubiops_cli.src.shell:commands", "shell", None, "Start an interactive shell"),
+    ("ubiops_cli.src.batch:commands", "batch", None, "Run a file of CLI commands"),
+    ("ubiops_cli.src.daemon:commands", "daemon", None, "Manage the CLI daemon"),
+]
+# fmt: on
+
+for import_path, name, aliases, short_help in LAZY_COMMANDS:
+    cli.add_lazy_command(import_path, name=name, aliases=aliases, short_help=short_help)
 
 
 def print_error(msg, status=None):
@@ -93,34 +120,64 @@ def print_error(msg, status=None):
 
 
 # pylint: disable=broad-except
-def main():
+def main(args=None, obj=None, prog_name=None):
     """
     Main function to start click and handle exceptions
+
+    :param list[str]|None args: the command line arguments, defaults to the arguments of the process
+    :param ClientContext|None obj: the client context to use, a new one is created for this invocation by default
+    :param str|None prog_name: the name of the program in help texts, defaults to the name of the executable
     """
 
+    if args is None and obj is None:
+        # Let the daemon run the command if it's running
+        args = sys.argv[1:]
+        if args[:1] != ["daemon"]:
+            exit_code = daemon.forward(args)
+            if exit_code is not None:
+                sys.exit(exit_code)
+
     try:
-        cli()
-    except api.exceptions.ApiException as e:
-        if hasattr(e, "get_body_message"):
-            print_error(e.get_body_message(), status=getattr(e, "status", None))
-
-        elif hasattr(e, "body") and e.body is not None:
-            try:
-                message = json.loads(e.body)
-                if "error" in message:
-                    print_error(msg=message["error"])
-                elif "error_message" in message:
-                    print_error(msg=message["error_message"])
-                else:
-                    print_error(msg=message)
-            except json.JSONDecodeError:
-                if hasattr(e, "status") and hasattr(e, "reason"):
-                    print_error(msg=e.reason, status=e.status)
-                else:
-                    print_error(msg="an unknown error occurred.")
+        cli(args=args, obj=obj, prog_name=prog_name)
+    except Exception as e:
+        # The client library is only imported when a command used it, in which case it's in the loaded modules
+        exceptions = sys.modules.get("ubiops.exceptions")
+        if exceptions is not None and isinstance(e, exceptions.ApiException):
+            handle_api_exception(e)
         else:
             print_error(msg=e)
-    except Exception as e:
+
+
+def handle_api_exception(e):
+    """
+    Print the error message of an exception raised by the client library
+
+    :param ubiops.exceptions.ApiException e: the exception to print
+    """
+
+    if getattr(e, "status", None) == 401:
+        # The token expired or was revoked, the cached health check can no longer be trusted
+        invalidate_auth_cache()
+        print_error(msg=UNAUTHORIZED_MESSAGE)
+
+    elif hasattr(e, "get_body_message"):
+        print_error(e.get_body_message(), status=getattr(e, "status", None))
+
+    elif hasattr(e, "body") and e.body is not None:
+        try:
+            message = json.loads(e.body)
+            if "error" in message:
+                print_error(msg=message["error"])
+            elif "error_message" in message:
+                print_error(msg=message["error_message"])
+            else:
+                print_error(msg=message)
+        except json.JSONDecodeError:
+            if hasattr(e, "status") and hasattr(e, "reason"):
+                print_error(msg=e.reason, status=e.status)
+            else:
+                print_error(msg="an unknown error occurred.")
+    else:
         print_error(msg=e)
 
 
@@ -0,0 +1,72 @@
+import sqlite3
+
+from contextlib import contextmanager
+
+
+class PackageState:
+    """
+    On-disk record of the packages that were uploaded as revisions of deployment versions and environments, stored in
+    an SQLite database that is shared by all CLI processes. Per deployment version or environment, it holds the
+    revision that was created by the last upload from this machine and the content hash of the uploaded package, such
+    that uploading an unchanged package again can be skipped.
+    """
+
+    def __init__(self, database):
+        """
+        :param str database: path to the SQLite database
+        """
+
+        self.database = database
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploads (host TEXT, project TEXT, target TEXT, revision TEXT, "
+                "content_hash TEXT, PRIMARY KEY (host, project, target))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection to the database, and commit the changes when done. Connections aren't shared between threads.
+        """
+
+        connection = sqlite3.connect(self.database, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_upload(self, host, project_name, target):
+        """
+        Get the last upload of a package
+
+        :param str host: the API host
+        :param str project_name: the name of the project
+        :param str target: the deployment version or environment, like 'deployments/<name>/versions/<version>'
+        :return tuple[str, str]|None: the ID of the created revision and the content hash of the package, None if no
+            package was uploaded from this machine
+        """
+
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT revision, content_hash FROM uploads WHERE host = ? AND project = ? AND target = ?",
+                (host, project_name, target),
+            ).fetchone()
+
+    def store_upload(self, host, project_name, target, revision, content_hash):
+        """
+        Store the upload of a package
+
+        :param str host: the API host
+        :param str project_name: the name of the project
+        :param str target: the deployment version or environment, like 'deployments/<name>/versions/<version>'
+        :param str revision: the ID of the created revision
+        :param str content_hash: the content hash of the package
+        """
+
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?)",
+                (host, project_name, target, revision, content_hash),
+            )
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import posixpath
+import sqlite3
+import time
+import urllib.parse
+
+from contextlib import contextmanager
+
+import requests
+
+from requests.structures import CaseInsensitiveDict
+
+# Response headers that are stored with a cached response
+STORED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+# Path templates of the endpoints whose responses may be cached: the details and lists of resources that only change
+# when they're modified. Downloads return a new signed URL every time, and the files in buckets, requests, builds,
+# instances, logs, metrics and usage change without the CLI modifying them, so their responses are never cached.
+CACHEABLE_PATHS = frozenset(
+    [
+        "/projects",
+        "/projects/{project_name}",
+        "/projects/{project_name}/buckets",
+        "/projects/{project_name}/buckets/{bucket_name}",
+        "/projects/{project_name}/deployments",
+        "/projects/{project_name}/deployments/{deployment_name}",
+        "/projects/{project_name}/deployments/{deployment_name}/environment-variables",
+        "/projects/{project_name}/deployments/{deployment_name}/environment-variables/{id}",
+        "/projects/{project_name}/deployments/{deployment_name}/versions",
+        "/projects/{project_name}/deployments/{deployment_name}/versions/{version}",
+        "/projects/{project_name}/deployments/{deployment_name}/versions/{version}/environment-variables",
+        "/projects/{project_name}/deployments/{deployment_name}/versions/{version}/environment-variables/{id}",
+        "/projects/{project_name}/deployments/{deployment_name}/versions/{version}/revisions",
+        "/projects/{project_name}/deployments/{deployment_name}/versions/{version}/revisions/{revision_id}",
+        "/projects/{project_name}/environment-variables",
+        "/projects/{project_name}/environment-variables/{id}",
+        "/projects/{project_name}/environments",
+        "/projects/{project_name}/environments/{environment_name}",
+        "/projects/{project_name}/environments/{environment_name}/revisions",
+        "/projects/{project_name}/environments/{environment_name}/revisions/{revision_id}",
+        "/projects/{project_name}/instance-type-groups",
+        "/projects/{project_name}/instance-type-groups/{instance_type_group_id}",
+        "/projects/{project_name}/instance-types",
+        "/projects/{project_name}/pipelines",
+        "/projects/{project_name}/pipelines/{pipeline_name}",
+        "/projects/{project_name}/pipelines/{pipeline_name}/versions",
+        "/projects/{project_name}/pipelines/{pipeline_name}/versions/{version}",
+        "/projects/{project_name}/schedules",
+        "/projects/{project_name}/schedules/{schedule_name}",
+    ]
+)
+
+
+class ResponseCache:
+    """
+    On-disk cache of responses to GET requests, stored in an SQLite database that is shared by all CLI processes.
+    Responses are keyed by API host, token, path and query. Responses younger than the maximum age are used without
+    contacting the API, older responses are revalidated with a conditional request using their `ETag` or
+    `Last-Modified` header.
+    """
+
+    def __init__(self, database, host, token, max_age=0):
+        """
+        :param str database: path to the SQLite database
+        :param str host: the API host
+        :param str token: the token used to authenticate, such that responses are never shared between users
+        :param float max_age: the number of seconds a response is used without revalidating it
+        """
+
+        self.database = database
+        self.host = host
+        self.max_age = max_age
+        self.token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, host TEXT, path TEXT, etag TEXT, last_modified TEXT, headers TEXT, body BLOB, "
+                "stored_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_path ON responses (host, path)")
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection to the database, and commit the changes when done. Connections aren't shared between threads.
+        """
+
+        connection = sqlite3.connect(self.database, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _key(self, path, query_params):
+        """
+        Get the key of a request
+
+        :param str path: the path of the request
+        :param query_params: the query parameters of the request
+        """
+
+        if isinstance(query_params, dict):
+            query_params = query_params.items()
+        query = urllib.parse.urlencode(sorted(query_params or [], key=str))
+        return hashlib.sha256(f"{self.host}\n{self.token_hash}\n{path}\n{query}".encode("utf-8")).hexdigest()
+
+    def get(self, path, query_params):
+        """
+        Get the cached response of a request
+
+        :param str path: the path of the request
+        :param query_params: the query parameters of the request
+        :return tuple[requests.Response, bool]|None: the cached response and whether it's fresh, i.e., can be used
+            without revalidating it, or None if the response is not cached
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT headers, body, stored_at FROM responses WHERE key = ?", (self._key(path, query_params),)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        headers, body, stored_at = row
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = body  # pylint: disable=protected-access
+        response.url = f"{self.host}{path}"
+        return response, time.time() - stored_at < self.max_age
+
+    @staticmethod
+    def is_cacheable(path_template):
+        """
+        Whether the responses of an endpoint may be cached
+
+        :param str|None path_template: the path template of the endpoint, like '/projects/{project_name}/deployments'
+        """
+
+        return path_template in CACHEABLE_PATHS
+
+    @staticmethod
+    def get_validators(response):
+        """
+        Get the headers to revalidate a cached response with a conditional request
+
+        :param requests.Response response: the cached response
+        """
+
+        headers = {}
+        if response.headers.get("ETag"):
+            headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        return headers
+
+    def store(self, path, query_params, response):
+        """
+        Store the response of a request
+
+        :param str path: the path of the request
+        :param query_params: the query parameters of the request
+        :param requests.Response response: the response to store
+        """
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(path, query_params),
+                    self.host,
+                    path,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    json.dumps(headers),
+                    response.content,
+                    time.time(),
+                ),
+            )
+
+    def refresh(self, path, query_params):
+        """
+        Mark a cached response as fresh again, after the API confirmed it didn't change
+
+        :param str path: the path of the request
+        :param query_params: the query parameters of the request
+        """
+
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), self._key(path, query_params))
+            )
+
+    def invalidate(self, _, path):
+        """
+        Remove the cached responses that may have changed by a request that modified a resource: the responses of the
+        resource and its sub-resources, and of all resources it belongs to, e.g., the list of resources.
+
+        :param str _: the method of the request
+        :param str path: the path of the modified resource
+        """
+
+        path = path.rstrip("/")
+        parents = []
+        parent = posixpath.dirname(path)
+        while parent not in ["", "/"]:
+            parents.append(parent)
+            parent = posixpath.dirname(parent)
+
+        prefix = path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM responses WHERE host = ? AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                (self.host, path, f"{prefix}/%"),
+            )
+            connection.executemany(
+                "DELETE FROM responses WHERE host = ? AND path = ?", [(self.host, parent) for parent in parents]
+            )
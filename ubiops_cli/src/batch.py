@@ -0,0 +1,224 @@
+import io
+import json
+import shlex
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import click
+
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.utils import ClientContext
+from ubiops_cli.src.helpers import options
+
+# A line with only this word waits until all previous commands finished, before running the next commands
+BARRIER = "wait"
+
+# Commands that can't run inside a batch, because they are interactive or manage the process itself
+UNSUPPORTED_COMMANDS = ["batch", "shell", "daemon", "signin"]
+
+
+class ThreadOutput(io.TextIOBase):
+    """
+    Text stream that sends what each thread writes to the buffer of that thread, if it has one, or otherwise to the
+    original stream. Used as standard output and error, such that the output of commands running in parallel threads
+    can be captured per command.
+    """
+
+    def __init__(self, stream):
+        """
+        :param io.TextIOBase stream: the original stream
+        """
+
+        super().__init__()
+        self.stream = stream
+        self._local = threading.local()
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    @property
+    def errors(self):
+        return "replace"
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def start_capture(self):
+        """
+        Capture everything the current thread writes from now on
+        """
+
+        self._local.buffer = io.StringIO()
+
+    def stop_capture(self):
+        """
+        Stop capturing the output of the current thread, and return the captured output
+        """
+
+        buffer = getattr(self._local, "buffer", None)
+        self._local.buffer = None
+        return buffer.getvalue() if buffer is not None else ""
+
+    def write(self, s):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(s)
+        return self.stream.write(s)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+
+def parse_commands(lines):
+    """
+    Parse the lines of a batch file into groups of commands. Groups are separated by barrier lines, all commands of a
+    group finish before the commands of the next group start.
+
+    :param iterable[str] lines: the lines of the batch file
+    :return list[list[tuple[int, str, list[str]]]]: per group, the line number, line and arguments of each command
+    """
+
+    groups = [[]]
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if line == BARRIER:
+            if groups[-1]:
+                groups.append([])
+            continue
+
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise UbiOpsException(f"Invalid command on line {line_number}: {e}")
+
+        # Commands may be written with or without the 'ubiops' prefix
+        if args[:1] == ["ubiops"]:
+            args = args[1:]
+        if not args:
+            continue
+
+        if args[0] in UNSUPPORTED_COMMANDS:
+            raise UbiOpsException(f"The command '{args[0]}' on line {line_number} can't be used in a batch")
+
+        groups[-1].append((line_number, line, args))
+
+    return [group for group in groups if group]
+
+
+def run_command(line_number, line, args, client_context, stdout, stderr):
+    """
+    Run one command of the batch and capture its output
+
+    :param int line_number: the line number of the command in the batch file
+    :param str line: the command as written in the batch file
+    :param list[str] args: the arguments of the command
+    :param ClientContext client_context: the client shared by all commands
+    :param ThreadOutput stdout: the standard output stream
+    :param ThreadOutput stderr: the standard error stream
+    :return dict: the report of the command
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops_cli.main import main
+
+    stdout.start_capture()
+    stderr.start_capture()
+
+    start = time.time()
+    try:
+        main(args=args, obj=client_context, prog_name="ubiops")
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+
+    return {
+        "line": line_number,
+        "command": line,
+        "exit_code": exit_code,
+        "duration": round(time.time() - start, 3),
+        "stdout": stdout.stop_capture(),
+        "stderr": stderr.stop_capture(),
+    }
+
+
+@click.command(name="batch", short_help="Run a file of CLI commands")
+@options.BATCH_COMMANDS_FILE
+@options.BATCH_CONCURRENCY
+@options.BATCH_REPORT_OUTPUT
+@click.pass_context
+def commands(ctx, commands_file, concurrency, output_path):
+    """
+    Run a file of CLI commands concurrently in one process.
+
+    The file contains one command per line, with or without the `ubiops` prefix, like
+    `deployments requests get -d my-deployment <request_id>`. Empty lines and lines starting with `#` are skipped.
+    Commands run in parallel, on at most `<concurrency>` threads that share one connection to the API.
+
+    Add a line with only `wait` to wait until all previous commands finished before the next commands start.
+
+    \b
+    ```
+    deployments create my-deployment -f deployment.yaml
+    wait
+    env create MY_VAR --value my-value --deployment_name my-deployment
+    env create OTHER_VAR --value other-value --deployment_name my-deployment
+    ```
+
+    For each command, a JSON line is written to the report when the command finished, with its line number, exit code,
+    duration in seconds and output. The exit code of the batch is 1 if any command failed. Commands that ask for
+    confirmation should be given the `-y` option.
+    """
+
+    groups = parse_commands(commands_file)
+
+    client_context = ctx.find_object(ClientContext)
+    client_context.min_pool_size = concurrency
+
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    stdout, stderr = ThreadOutput(original_stdout), ThreadOutput(original_stderr)
+
+    report = open(output_path, "w", encoding="utf-8") if output_path else original_stdout
+    failed = False
+
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for group in groups:
+                futures = [
+                    executor.submit(
+                        run_command,
+                        line_number=line_number,
+                        line=line,
+                        args=args,
+                        client_context=client_context,
+                        stdout=stdout,
+                        stderr=stderr,
+                    )
+                    for line_number, line, args in group
+                ]
+
+                # Write the reports in the order the commands finished, and wait for the whole group (barrier)
+                for future in as_completed(futures):
+                    result = future.result()
+                    failed = failed or result["exit_code"] != 0
+                    report.write(json.dumps(result) + "\n")
+                    report.flush()
+
+    finally:
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+        if output_path:
+            report.close()
+
+    if failed:
+        sys.exit(1)
@@ -1,14 +1,28 @@
+import time
+
 import click
 import ubiops as api
 
 from ubiops_cli.utils import get_current_project, init_client, read_yaml, write_yaml
-from ubiops_cli.src.helpers.bucket_helpers import define_bucket, BUCKET_OUTPUT_FIELDS, BUCKET_FIELDS_RENAMED
-from ubiops_cli.src.helpers.formatting import print_list, print_item, format_yaml
+from ubiops_cli.src.helpers.bucket_helpers import (
+    define_bucket,
+    get_bucket_inventory,
+    index_bucket,
+    to_datetime,
+    to_file_item,
+    BUCKET_OUTPUT_FIELDS,
+    BUCKET_FIELDS_RENAMED,
+    DirectoryUsage,
+)
+from ubiops_cli.src.helpers.file_helpers import TransferProgress
+from ubiops_cli.src.helpers.formatting import print_list, print_item, print_stream, format_yaml
 from ubiops_cli.src.helpers.helpers import get_label_filter
 from ubiops_cli.src.helpers import options
 
 
 LIST_ITEMS = ["name", "provider", "labels"]
+FILE_LIST_ITEMS = ["file", "size", "time_created"]
+DU_ITEMS = ["directory", "files", "size", "newest"]
 
 
 @click.group(name="buckets", short_help="Manage your buckets")
@@ -29,7 +43,6 @@ def buckets_list(labels, format_):
 
     client = init_client()
     response = client.buckets_list(project_name=project_name, labels=label_filter)
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, sorting_col=0, fmt=format_)
 
@@ -69,7 +82,6 @@ def buckets_get(bucket_name, output_path, quiet, format_):
 
     client = init_client()
     bucket = client.buckets_get(project_name=project_name, bucket_name=bucket_name)
-    client.api_client.close()
 
     if output_path is not None:
         # Store only reusable settings
@@ -146,7 +158,6 @@ def buckets_create(yaml_file, format_, **kwargs):
 
     client = init_client()
     bucket_response = client.buckets_create(project_name=project_name, data=bucket)
-    client.api_client.close()
 
     print_item(
         bucket_response,
@@ -190,7 +201,6 @@ def buckets_update(yaml_file, quiet, **kwargs):
     bucket = api.BucketUpdate(**bucket_dict)
 
     client.buckets_update(project_name=project_name, bucket_name=bucket_dict["name"], data=bucket)
-    client.api_client.close()
 
     if not quiet:
         click.echo("Bucket was successfully updated")
@@ -210,7 +220,139 @@ def buckets_delete(bucket_name, assume_yes, quiet):
     ):
         client = init_client()
         client.buckets_delete(project_name=project_name, bucket_name=bucket_name)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Bucket was successfully deleted")
+
+
+@commands.command(name="index", short_help="Index the files in a bucket")
+@options.BUCKET_NAME_ARGUMENT
+@options.BUCKET_INDEX_PREFIX
+@options.BUCKET_INDEX_CONCURRENCY
+@options.QUIET
+def buckets_index(bucket_name, prefix, concurrency, quiet):
+    """
+    Build or refresh a local inventory of the files in a bucket, which is used by the `du`, `find` and `newest`
+    commands to answer questions about the bucket without listing its files.
+
+    The directories in the bucket are listed `<concurrency>` at the same time. Use `--prefix` to only refresh the
+    files whose name starts with `<prefix>`, e.g., a directory that changed, and keep the other files of the
+    inventory. Queries of the whole bucket require all files to have been indexed, queries with a prefix only the
+    files with that prefix. Refreshes of the same bucket run one at a time. The inventory is stored in the cache
+    directory of the CLI.
+    """
+
+    project_name = get_current_project(error=True)
+
+    client = init_client(min_pool_size=concurrency)
+
+    start = time.time()
+    files, size = index_bucket(
+        client=client,
+        project_name=project_name,
+        bucket_name=bucket_name,
+        prefix=prefix,
+        concurrency=concurrency,
+        progress_bar=not quiet,
+    )
+
+    if not quiet:
+        click.echo(
+            f"Indexed {files} files ({TransferProgress.format_size(size)}) of bucket {bucket_name} in "
+            f"{time.time() - start:.1f}s"
+        )
+
+
+@commands.command(name="du", short_help="Show the disk usage of a bucket")
+@options.BUCKET_NAME_ARGUMENT
+@options.BUCKET_QUERY_PREFIX
+@options.BUCKET_DU_DEPTH
+@options.FILE_LIST_FORMATS
+def buckets_du(bucket_name, prefix, depth, format_):
+    """
+    Show the number and total size of the files in a bucket, per directory, from the inventory of the bucket that's
+    built by `ubiops buckets index`.
+
+    Directories are prefixes that end with a '/'. The usage of the bucket, or the `<prefix>` directory, is shown
+    with its subdirectories up to `<depth>` levels deep. Formatted as table, sizes are human-readable; otherwise,
+    they're in bytes.
+    """
+
+    project_name = get_current_project(error=True)
+
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    index, inventory = get_bucket_inventory(project_name=project_name, bucket_name=bucket_name, prefix=prefix)
+
+    items = [
+        DirectoryUsage(
+            directory=directory or "/",
+            files=files,
+            size=TransferProgress.format_size(size) if format_ == "table" else size,
+            newest=to_datetime(newest),
+        )
+        for directory, files, size, newest in index.get_directories(inventory=inventory, directory=prefix, depth=depth)
+    ]
+
+    if format_ == "table":
+        print_list(items=items, attrs=DU_ITEMS, fmt=format_)
+    else:
+        print_stream(items=items, attrs=DU_ITEMS, fmt=format_)
+
+
+# pylint: disable=too-many-arguments
+@commands.command(name="find", short_help="Find files in a bucket")
+@options.BUCKET_NAME_ARGUMENT
+@options.BUCKET_QUERY_PREFIX
+@options.FILE_GLOB
+@options.FILE_MIN_SIZE
+@options.FILE_NEWER_THAN
+@options.FILE_LIST_FORMATS
+def buckets_find(bucket_name, prefix, glob, min_size, newer_than, format_):
+    """
+    Find the files in a bucket whose name matches a glob pattern, of at least a size, or created after a date or
+    within an age, from the inventory of the bucket that's built by `ubiops buckets index`.
+
+    Formatted as ndjson, csv or json, the files are printed as they are found.
+    """
+
+    project_name = get_current_project(error=True)
+
+    index, inventory = get_bucket_inventory(project_name=project_name, bucket_name=bucket_name, prefix=prefix)
+    files = (
+        to_file_item(file)
+        for file in index.find_files(
+            inventory=inventory,
+            prefix=prefix,
+            glob=glob,
+            min_size=min_size,
+            newer_than=None if newer_than is None else newer_than.timestamp(),
+        )
+    )
+
+    if format_ == "table":
+        print_list(items=list(files), attrs=FILE_LIST_ITEMS, fmt=format_)
+    else:
+        print_stream(items=files, attrs=FILE_LIST_ITEMS, fmt=format_)
+
+
+@commands.command(name="newest", short_help="Show the newest files in a bucket")
+@options.BUCKET_NAME_ARGUMENT
+@options.BUCKET_QUERY_PREFIX
+@options.BUCKET_NEWEST_LIMIT
+@options.FILE_LIST_FORMATS
+def buckets_newest(bucket_name, prefix, limit, format_):
+    """
+    Show the most recently created files in a bucket, from new to old, from the inventory of the bucket that's built
+    by `ubiops buckets index`.
+    """
+
+    project_name = get_current_project(error=True)
+
+    index, inventory = get_bucket_inventory(project_name=project_name, bucket_name=bucket_name, prefix=prefix)
+    files = [to_file_item(file) for file in index.find_files(inventory=inventory, prefix=prefix, newest=limit)]
+
+    if format_ == "table":
+        print_list(items=files, attrs=FILE_LIST_ITEMS, fmt=format_)
+    else:
+        print_stream(items=files, attrs=FILE_LIST_ITEMS, fmt=format_)
@@ -0,0 +1,67 @@
+import click
+
+from ubiops_cli import daemon
+from ubiops_cli.exceptions import UbiOpsException
+
+
+@click.group(name="daemon", short_help="Manage the CLI daemon")
+def commands():
+    """
+    Manage the CLI daemon.
+
+    The daemon keeps the CLI loaded in a background process, together with an authenticated connection to the API.
+    While it's running, all `ubiops` commands are sent to the daemon over a local Unix socket, which saves the start-up
+    time of the CLI and the connection set-up for every command. This is useful when calling the CLI many times from
+    scripts. Commands run in the CLI process itself again once the daemon is stopped.
+
+    The daemon executes commands one at a time, commands started while it's busy run in their own process. It's only
+    available on platforms that support Unix sockets.
+    """
+
+    return
+
+
+@commands.command(name="start", short_help="Start the daemon")
+def daemon_start():
+    """
+    Start the daemon in the background.
+    """
+
+    if not daemon.is_supported():
+        raise UbiOpsException("The daemon is not supported on this platform")
+
+    response = daemon.send_action("status")
+    if response is not None:
+        click.echo(f"The daemon is already running (pid {response['pid']})")
+        return
+
+    response = daemon.start()
+    if response is None:
+        raise UbiOpsException("The daemon did not start in time")
+    click.echo(f"Started the daemon (pid {response['pid']})")
+
+
+@commands.command(name="stop", short_help="Stop the daemon")
+def daemon_stop():
+    """
+    Stop the daemon.
+    """
+
+    response = daemon.send_action("stop")
+    if response is None:
+        click.echo("The daemon is not running")
+        return
+    click.echo(f"Stopped the daemon (pid {response['pid']})")
+
+
+@commands.command(name="status", short_help="Get the status of the daemon")
+def daemon_status():
+    """
+    Get the status of the daemon.
+    """
+
+    response = daemon.send_action("status")
+    if response is None:
+        click.echo("The daemon is not running")
+        return
+    click.echo(f"The daemon is running (pid {response['pid']}, version {response['version']})")
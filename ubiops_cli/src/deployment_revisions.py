@@ -31,7 +31,6 @@ def revisions_list(deployment_name, version_name, format_):
 
     client = init_client()
     response = client.revisions_list(project_name=project_name, deployment_name=deployment_name, version=version_name)
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, sorting_col=0, fmt=format_)
 
@@ -52,7 +51,6 @@ def revisions_get(deployment_name, version_name, revision_id, format_):
     revision = client.revisions_get(
         project_name=project_name, deployment_name=deployment_name, version=version_name, revision_id=revision_id
     )
-    client.api_client.close()
 
     print_item(revision, row_attrs=LIST_ITEMS, fmt=format_)
 
@@ -84,7 +82,6 @@ def revisions_download(deployment_name, version_name, revision_id, output_path,
         prefix = f"{deployment_name}_{version_name}" if deployment_name and version_name else deployment_name
         filename = default_zip_name(prefix=prefix)
         output_path = write_blob(response.read(), output_path, filename)
-    client.api_client.close()
 
     if not quiet:
         click.echo(f"Zip stored in: {output_path}")
@@ -113,7 +110,6 @@ def revisions_upload(deployment_name, version_name, archive_path, progress_bar,
         file=archive_path,
         _progress_bar=False if not archive_path else progress_bar,
     )
-    client.api_client.close()
 
     print_item(revision, row_attrs=["revision", "build"], fmt=format_)
 
@@ -145,4 +141,3 @@ def revisions_wait(deployment_name, version_name, revision_id, timeout, stream_l
         quiet=quiet,
         stream_logs=stream_logs,
     )
-    client.api_client.close()
@@ -15,7 +15,7 @@ from ubiops_cli.src.helpers.formatting import print_list, print_item, format_yam
 from ubiops_cli.src.helpers.helpers import get_label_filter
 from ubiops_cli.src.helpers.wait_for import wait_for
 from ubiops_cli.src.helpers import options
-from ubiops_cli.utils import init_client, read_yaml, write_yaml, get_current_project, set_dict_default
+from ubiops_cli.utils import init_client, read_yaml, write_yaml, get_current_project, set_dict_default, get_deployment
 
 LIST_ITEMS = ["last_updated", "version", "status", "labels"]
 
@@ -45,11 +45,10 @@ def versions_list(deployment_name, labels, format_):
     project_name = get_current_project(error=True)
 
     client = init_client()
-    default = client.deployments_get(project_name=project_name, deployment_name=deployment_name).default_version
+    default = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name).default_version
     response = client.deployment_versions_list(
         project_name=project_name, deployment_name=deployment_name, labels=label_filter
     )
-    client.api_client.close()
 
     if format_ == "table":
         # Add [DEFAULT] to default version
@@ -111,11 +110,10 @@ def versions_get(deployment_name, version_name, output_path, quiet, format_):
 
     # Show version details
     client = init_client()
-    deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
+    deployment = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name)
     version = client.deployment_versions_get(
         project_name=project_name, deployment_name=deployment_name, version=version_name
     )
-    client.api_client.close()
 
     details = DEPLOYMENT_VERSION_DETAILS
     if deployment.supports_request_format:
@@ -250,7 +248,7 @@ def versions_create(deployment_name, version_name, yaml_file, format_, **kwargs)
     deployment_name = set_dict_default(deployment_name, yaml_content, "deployment_name")
     version_name = set_dict_default(version_name, yaml_content, "version_name")
 
-    deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
+    deployment = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name)
     kwargs = set_default_scaling_parameters(details=kwargs, supports_request_format=deployment.supports_request_format)
 
     version = api.DeploymentVersionCreate(
@@ -261,7 +259,6 @@ def versions_create(deployment_name, version_name, yaml_file, format_, **kwargs)
     )
 
     update_deployment_file(client, project_name, deployment_name, version_name, kwargs["deployment_file"])
-    client.api_client.close()
 
     details = DEPLOYMENT_VERSION_DETAILS
     if deployment.supports_request_format:
@@ -367,7 +364,7 @@ def versions_update(deployment_name, version_name, yaml_file, new_name, quiet, *
     kwargs = define_deployment_version(kwargs, yaml_content, extra_yaml_fields=["deployment_file"])
 
     client = init_client()
-    deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
+    deployment = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name)
     kwargs = set_default_scaling_parameters(
         details=kwargs, supports_request_format=deployment.supports_request_format, update=True
     )
@@ -379,7 +376,6 @@ def versions_update(deployment_name, version_name, yaml_file, new_name, quiet, *
         project_name=project_name, deployment_name=deployment_name, version=version_name, data=version
     )
     update_deployment_file(client, project_name, deployment_name, version_name, kwargs["deployment_file"])
-    client.api_client.close()
 
     if not quiet:
         click.echo("Deployment version was successfully updated")
@@ -403,7 +399,6 @@ def versions_delete(deployment_name, version_name, assume_yes, quiet):
         client.deployment_versions_delete(
             project_name=project_name, deployment_name=deployment_name, version=version_name
         )
-        client.api_client.close()
         if not quiet:
             click.echo("Deployment version was successfully deleted")
 
@@ -438,4 +433,3 @@ def versions_wait(deployment_name, version_name, revision_id, timeout, stream_lo
         quiet=quiet,
         stream_logs=stream_logs,
     )
-    client.api_client.close()
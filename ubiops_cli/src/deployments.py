@@ -25,7 +25,7 @@ from ubiops_cli.src.helpers.deployment_helpers import (
     DEPLOYMENT_FIELDS_RENAMED,
     DEPLOYMENT_VERSION_CREATE_FIELDS,
 )
-from ubiops_cli.src.helpers.helpers import get_label_filter
+from ubiops_cli.src.helpers.helpers import get_label_filter, is_package_uploaded, store_package_upload
 from ubiops_cli.src.helpers.formatting import (
     print_list,
     print_item,
@@ -48,6 +48,7 @@ from ubiops_cli.utils import (
     write_blob,
     default_zip_name,
     parse_json,
+    get_deployment,
 )
 
 
@@ -80,7 +81,6 @@ def deployments_list(labels, format_):
     if project_name:
         client = init_client()
         deployments = client.deployments_list(project_name=project_name, labels=label_filter)
-        client.api_client.close()
         print_list(items=deployments, attrs=LIST_ITEMS, sorting_col=1, fmt=format_)
 
 
@@ -103,7 +103,6 @@ def deployments_get(deployment_name, output_path, quiet, format_):
 
     client = init_client()
     deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
-    client.api_client.close()
 
     if output_path is not None:
         dictionary = format_yaml(
@@ -197,8 +196,6 @@ def deployments_create(deployment_name, yaml_file, overwrite, format_):
         deployment = api.DeploymentCreate(**{k: kwargs[k] for k in DEPLOYMENT_CREATE_FIELDS if k in kwargs})
         response = client.deployments_create(project_name=project_name, data=deployment)
 
-    client.api_client.close()
-
     print_item(
         item=response,
         row_attrs=LIST_ITEMS,
@@ -262,7 +259,6 @@ def deployments_update(deployment_name, new_name, default_version, yaml_file, qu
 
     client = init_client()
     client.deployments_update(project_name=project_name, deployment_name=deployment_name, data=deployment)
-    client.api_client.close()
 
     if not quiet:
         click.echo("Deployment was successfully updated")
@@ -284,7 +280,6 @@ def deployments_delete(deployment_name, assume_yes, quiet):
     ):
         client = init_client()
         client.deployments_delete(project_name=project_name, deployment_name=deployment_name)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Deployment was successfully deleted")
@@ -297,9 +292,10 @@ def deployments_delete(deployment_name, assume_yes, quiet):
 @options.PACKAGE_DIR
 @options.DEPLOYMENT_ARCHIVE_OUTPUT
 @options.IGNORE_FILE
+@options.PACKAGE_JOBS
 @options.ASSUME_YES
 @options.QUIET
-def deployments_package(deployment_name, version_name, directory, output_path, ignore_file, assume_yes, quiet):
+def deployments_package(deployment_name, version_name, directory, output_path, ignore_file, jobs, assume_yes, quiet):
     """
     Package code to archive file which is ready to be deployed.
 
@@ -318,8 +314,13 @@ def deployments_package(deployment_name, version_name, directory, output_path, i
 
     ignore_file = DEFAULT_IGNORE_FILE if ignore_file is None else ignore_file
     prefix = f"{deployment_name}_{version_name}" if deployment_name and version_name else deployment_name
-    archive_path, _ = zip_dir(
-        directory=directory, output_path=output_path, ignore_filename=ignore_file, prefix=prefix, force=assume_yes
+    archive_path, _, _ = zip_dir(
+        directory=directory,
+        output_path=output_path,
+        ignore_filename=ignore_file,
+        prefix=prefix,
+        force=assume_yes,
+        jobs=jobs,
     )
     if not quiet:
         click.echo(f"Created archive: {archive_path}")
@@ -355,12 +356,10 @@ def deployments_upload(deployment_name, version_name, archive_path, overwrite, p
             file=archive_path,
             _progress_bar=False if not archive_path else progress_bar,
         )
-        client.api_client.close()
 
         if not quiet:
             click.echo("Deployment was successfully uploaded")
     else:
-        client.api_client.close()
         raise UbiOpsException("A deployment package already exists for this deployment version")
 
 
@@ -399,7 +398,6 @@ def deployments_download(deployment_name, version_name, output_path, quiet):
         prefix = f"{deployment_name}_{version_name}" if deployment_name and version_name else deployment_name
         filename = default_zip_name(prefix=prefix)
         output_path = write_blob(response.read(), output_path, filename)
-    client.api_client.close()
 
     if not quiet:
         click.echo(f"Archive stored in: {output_path}")
@@ -412,6 +410,7 @@ def deployments_download(deployment_name, version_name, output_path, quiet):
 @options.PACKAGE_DIR
 @options.DEPLOYMENT_FILE
 @options.IGNORE_FILE
+@options.PACKAGE_JOBS
 @options.DEPLOYMENT_ARCHIVE_OUTPUT
 @options.VERSION_YAML_FILE
 @options.ENVIRONMENT
@@ -434,6 +433,7 @@ def deployments_download(deployment_name, version_name, output_path, quiet):
 @options.VERSION_LABELS
 @options.VERSION_DESCRIPTION
 @options.OVERWRITE
+@options.PACKAGE_FORCE
 @options.ASSUME_YES
 @options.PROGRESS_BAR
 @options.QUIET
@@ -443,7 +443,9 @@ def deployments_deploy(
     directory,
     output_path,
     yaml_file,
+    jobs,
     overwrite,
+    force,
     assume_yes,
     progress_bar,
     quiet,
@@ -464,6 +466,10 @@ def deployments_deploy(
     directory, the archive will be saved as `[deployment_name]_[deployment_version]_[datetime.now()].zip`. Use
     the `<assume_yes>` option to overwrite without confirmation if file specified in `<output_path>` already exists.
 
+    When overwriting an existing version, the upload is skipped if the content of the package didn't change since it
+    was uploaded from this machine as the latest revision of the version, such that no new revision and build are
+    created. Use the `<force>` option to upload the package anyway.
+
     \b
     It is possible to define the parameters using a yaml file.
     For example:
@@ -540,7 +546,7 @@ def deployments_deploy(
         ]
 
     client = init_client()
-    deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
+    deployment = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name)
 
     existing_version = None
     if overwrite:
@@ -559,13 +565,15 @@ def deployments_deploy(
 
     archive_path = None
     implicit_environment = False
+    content_hash = None
     if deployment.supports_request_format and directory:
-        archive_path, implicit_environment = zip_dir(
+        archive_path, implicit_environment, content_hash = zip_dir(
             directory=directory,
             output_path=output_path,
             ignore_filename=kwargs["ignore_file"],
             prefix=prefix,
             force=assume_yes,
+            jobs=jobs,
         )
 
     try:
@@ -625,19 +633,37 @@ def deployments_deploy(
             click.echo(f"Waiting for changes to take effect... This takes {UPDATE_TIME} seconds.")
             sleep(UPDATE_TIME)
 
-        if deployment.supports_request_format:
-            client.revisions_file_upload(
+        target = f"deployments/{deployment_name}/versions/{version_name}"
+        if (
+            deployment.supports_request_format
+            and not force
+            and existing_version
+            and is_package_uploaded(
+                project_name=project_name,
+                target=target,
+                latest_revision=existing_version.latest_revision,
+                content_hash=content_hash,
+            )
+        ):
+            if not quiet:
+                click.echo(
+                    f"The deployment package didn't change since revision {existing_version.latest_revision}, skipping"
+                    " the upload. Use --force to upload it anyway."
+                )
+        elif deployment.supports_request_format:
+            revision = client.revisions_file_upload(
                 project_name=project_name,
                 deployment_name=deployment_name,
                 version=version_name,
                 file=archive_path,
                 _progress_bar=False if not archive_path else progress_bar,
             )
-        client.api_client.close()
+            store_package_upload(
+                project_name=project_name, target=target, revision=revision.revision, content_hash=content_hash
+            )
     except Exception as e:
         if archive_path and os.path.isfile(archive_path) and not store_archive:
             os.remove(archive_path)
-        client.api_client.close()
         raise e
 
     if archive_path and os.path.isfile(archive_path):
@@ -697,7 +723,7 @@ def requests_create(deployment_name, version_name, batch, data, json_file, timeo
     project_name = get_current_project(error=True)
 
     client = init_client()
-    deployment = client.deployments_get(project_name=project_name, deployment_name=deployment_name)
+    deployment = get_deployment(client=client, project_name=project_name, deployment_name=deployment_name)
 
     if json_file and data:
         raise UbiOpsException("Specify data either using the <data> or <json_file> option, not both")
@@ -747,8 +773,6 @@ def requests_create(deployment_name, version_name, batch, data, json_file, timeo
                     # Keep the final result to display in the correct format
                     response.append(streaming_update)
 
-    client.api_client.close()
-
     if format_ == "reference":
         click.echo(format_requests_reference(response))
     elif format_ == "oneline":
@@ -789,7 +813,6 @@ def requests_get(deployment_name, version_name, request_id, format_):
         response = client.deployment_requests_batch_get(
             project_name=project_name, deployment_name=deployment_name, data=request_ids
         )
-    client.api_client.close()
 
     if format_ == "reference":
         click.echo(format_requests_reference(response))
@@ -847,7 +870,6 @@ def requests_list(deployment_name, version_name, limit, format_, **kwargs):
         response = client.deployment_requests_list(
             project_name=project_name, deployment_name=deployment_name, limit=limit, **kwargs
         )
-    client.api_client.close()
 
     print_list(response, REQUEST_LIST_ITEMS, fmt=format_, json_skip=["success"])
     if len(response) == limit:
@@ -32,7 +32,6 @@ def builds_list(environment_name, revision_id, format_):
     response = client.environment_builds_list(
         project_name=project_name, environment_name=environment_name, revision_id=revision_id
     )
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, sorting_col=0, fmt=format_)
 
@@ -53,6 +52,5 @@ def builds_get(environment_name, revision_id, build_id, format_):
     build = client.environment_builds_get(
         project_name=project_name, environment_name=environment_name, revision_id=revision_id, build_id=build_id
     )
-    client.api_client.close()
 
     print_item(build, row_attrs=LIST_ITEMS, fmt=format_)
@@ -30,7 +30,6 @@ def revisions_list(environment_name, format_):
 
     client = init_client()
     response = client.environment_revisions_list(project_name=project_name, environment_name=environment_name)
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, sorting_col=0, fmt=format_)
 
@@ -50,7 +49,6 @@ def revisions_get(environment_name, revision_id, format_):
     revision = client.environment_revisions_get(
         project_name=project_name, environment_name=environment_name, revision_id=revision_id
     )
-    client.api_client.close()
 
     print_item(revision, row_attrs=GET_ITEMS, fmt=format_)
 
@@ -80,7 +78,6 @@ def revisions_download(environment_name, revision_id, output_path, quiet):
     ) as response:
         filename = default_zip_name(prefix=environment_name)
         output_path = write_blob(response.read(), output_path, filename)
-    client.api_client.close()
 
     if not quiet:
         click.echo(f"Zip stored in: {output_path}")
@@ -104,6 +101,5 @@ def revisions_upload(environment_name, archive_path, progress_bar, format_):
     revision = client.environment_revisions_file_upload(
         project_name=project_name, environment_name=environment_name, file=archive_path, _progress_bar=progress_bar
     )
-    client.api_client.close()
 
     print_item(revision, row_attrs=["revision", "build"], fmt=format_)
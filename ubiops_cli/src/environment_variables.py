@@ -73,7 +73,6 @@ def create_env_var(
     else:
         item = getattr(client, f"{level}_environment_variables_create")(**params, data=data)
 
-    client.api_client.close()
     return item
 
 
@@ -107,7 +106,6 @@ def env_vars_list(deployment_name, version_name, format_):
 
     client = init_client()
     response = getattr(client, f"{level}_environment_variables_list")(**params)
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, sorting_col=1, fmt=format_)
 
@@ -223,7 +221,6 @@ def env_vars_get(env_var_id, deployment_name, version_name, format_):
             click.echo(f"{click.style(text='Warning:', fg='yellow')} {WARNING_MSG}")
         raise e
 
-    client.api_client.close()
     print_item(item, LIST_ITEMS, fmt=format_)
 
 
@@ -262,8 +259,6 @@ def env_vars_copy(from_deployment, from_version, to_deployment, to_version, assu
 
         getattr(client, f"{to_level}_environment_variables_copy")(**to_params, data=data)
 
-    client.api_client.close()
-
 
 # pylint: disable=too-many-arguments
 @commands.command(name="update", short_help="Update an environment variable")
@@ -305,8 +300,6 @@ def env_vars_update(env_var_id, new_name, env_var_value, secret, deployment_name
             click.echo(f"{click.style(text='Warning:', fg='yellow')} {WARNING_MSG}")
         raise e
 
-    client.api_client.close()
-
     if not quiet:
         click.echo("Environment variable was successfully updated")
 
@@ -360,7 +353,5 @@ def env_vars_delete(env_var_id, deployment_name, version_name, assume_yes, quiet
             click.echo(f"{click.style('Warning:', fg='yellow')} {WARNING_MSG}")
         raise e
 
-    client.api_client.close()
-
     if not quiet:
         click.echo("Environment variable was successfully deleted")
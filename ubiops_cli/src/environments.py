@@ -4,6 +4,7 @@ import click
 import ubiops as api
 
 from ubiops_cli.constants import DEFAULT_IGNORE_FILE
+from ubiops_cli.file_index import hash_file
 from ubiops_cli.src.helpers.environment_helpers import (
     define_environment,
     ENVIRONMENT_CREATE_FIELDS,
@@ -12,7 +13,7 @@ from ubiops_cli.src.helpers.environment_helpers import (
     ENVIRONMENT_UPDATE_FIELDS,
 )
 from ubiops_cli.src.helpers.formatting import print_list, print_item, format_yaml
-from ubiops_cli.src.helpers.helpers import get_label_filter
+from ubiops_cli.src.helpers.helpers import get_label_filter, is_package_uploaded, store_package_upload
 from ubiops_cli.src.helpers.wait_for import wait_for
 from ubiops_cli.src.helpers import options
 from ubiops_cli.utils import get_current_project, init_client, read_yaml, set_dict_default, write_yaml, zip_dir
@@ -47,7 +48,6 @@ def environments_list(labels, environment_type, format_):
     environments = client.environments_list(
         project_name=project_name, environment_type=environment_type, labels=label_filter
     )
-    client.api_client.close()
 
     print_list(items=environments, attrs=LIST_ITEMS, rename_cols=ENVIRONMENT_FIELDS_RENAMED, sorting_col=1, fmt=format_)
 
@@ -84,7 +84,6 @@ def environments_get(environment_name, output_path, quiet, format_):
     # Show environment details
     client = init_client()
     environment = client.environments_get(project_name=project_name, environment_name=environment_name)
-    client.api_client.close()
 
     if output_path is not None:
         # Store only reusable settings
@@ -159,7 +158,6 @@ def environments_create(yaml_file, format_, **kwargs):
 
     client = init_client()
     environment_response = client.environments_create(project_name=project_name, data=environment)
-    client.api_client.close()
 
     print_item(
         item=environment_response,
@@ -213,7 +211,6 @@ def environments_update(environment_name, new_name, yaml_file, quiet, **kwargs):
     )
 
     client.environments_update(project_name=project_name, environment_name=environment_name, data=environment)
-    client.api_client.close()
 
     if not quiet:
         click.echo("Environment was successfully updated")
@@ -235,7 +232,6 @@ def environments_delete(environment_name, assume_yes, quiet):
     ):
         client = init_client()
         client.environments_delete(project_name=project_name, environment_name=environment_name)
-        client.api_client.close()
         if not quiet:
             click.echo("Environment was successfully deleted")
 
@@ -262,7 +258,6 @@ def environments_wait(environment_name, timeout, stream_logs, quiet):
         quiet=quiet,
         stream_logs=stream_logs,
     )
-    client.api_client.close()
 
 
 # pylint: disable=too-many-arguments
@@ -271,9 +266,10 @@ def environments_wait(environment_name, timeout, stream_logs, quiet):
 @options.ENVIRONMENT_PACKAGE_DIR
 @options.ENVIRONMENT_ARCHIVE_OUTPUT
 @options.IGNORE_FILE
+@options.PACKAGE_JOBS
 @options.ASSUME_YES
 @options.QUIET
-def environments_package(environment_name, directory, output_path, ignore_file, assume_yes, quiet):
+def environments_package(environment_name, directory, output_path, ignore_file, jobs, assume_yes, quiet):
     """
     Package code to archive file which is ready to be deployed.
 
@@ -291,13 +287,14 @@ def environments_package(environment_name, directory, output_path, ignore_file,
         output_path = "."
 
     ignore_file = DEFAULT_IGNORE_FILE if ignore_file is None else ignore_file
-    archive_path, _ = zip_dir(
+    archive_path, _, _ = zip_dir(
         directory=directory,
         output_path=output_path,
         ignore_filename=ignore_file,
         prefix=environment_name,
         force=assume_yes,
         package_directory="environment_package",
+        jobs=jobs,
     )
     if not quiet:
         click.echo(f"Created archive: {archive_path}")
@@ -309,6 +306,7 @@ def environments_package(environment_name, directory, output_path, ignore_file,
 @options.ENVIRONMENT_PACKAGE_DIR_OPTIONAL
 @options.ENVIRONMENT_ARCHIVE_INPUT_OPTIONAL
 @options.IGNORE_FILE
+@options.PACKAGE_JOBS
 @options.ENVIRONMENT_ARCHIVE_OUTPUT
 @options.ENVIRONMENT_YAML_FILE
 @options.BASE_ENVIRONMENT
@@ -317,6 +315,7 @@ def environments_package(environment_name, directory, output_path, ignore_file,
 @options.ENVIRONMENT_DESCRIPTION
 @options.ENVIRONMENT_LABELS
 @options.OVERWRITE
+@options.PACKAGE_FORCE
 @options.ASSUME_YES
 @options.PROGRESS_BAR
 @options.QUIET
@@ -326,7 +325,9 @@ def environments_deploy(
     archive_path,
     output_path,
     yaml_file,
+    jobs,
     overwrite,
+    force,
     assume_yes,
     progress_bar,
     quiet,
@@ -347,6 +348,10 @@ def environments_deploy(
 
     It's not possible to update the base environment of an existing environment.
 
+    When overwriting an existing environment, the upload is skipped if the content of the package didn't change since
+    it was uploaded from this machine as the latest revision of the environment, such that no new revision and build
+    are created. Use the `<force>` option to upload the package anyway.
+
     \b
     It is possible to define the parameters using a yaml file.
     For example:
@@ -402,14 +407,18 @@ def environments_deploy(
     kwargs["ignore_file"] = DEFAULT_IGNORE_FILE if kwargs["ignore_file"] is None else kwargs["ignore_file"]
 
     if directory:
-        archive_path, _ = zip_dir(
+        archive_path, _, content_hash = zip_dir(
             directory=directory,
             output_path=output_path,
             ignore_filename=kwargs["ignore_file"],
             prefix=environment_name,
             force=assume_yes,
             package_directory="environment_package",
+            jobs=jobs,
         )
+    else:
+        # The upload fails later on for files that don't exist
+        content_hash = hash_file(archive_path) if os.path.isfile(archive_path) else None
 
     try:
         if not (overwrite and existing_environment):
@@ -422,14 +431,35 @@ def environments_deploy(
             )
             client.environments_update(project_name=project_name, environment_name=environment_name, data=environment)
 
-        client.environment_revisions_file_upload(
-            project_name=project_name, environment_name=environment_name, file=archive_path, _progress_bar=progress_bar
-        )
-        client.api_client.close()
+        target = f"environments/{environment_name}"
+        if (
+            not force
+            and existing_environment
+            and is_package_uploaded(
+                project_name=project_name,
+                target=target,
+                latest_revision=existing_environment.latest_revision,
+                content_hash=content_hash,
+            )
+        ):
+            if not quiet:
+                click.echo(
+                    f"The environment package didn't change since revision {existing_environment.latest_revision},"
+                    " skipping the upload. Use --force to upload it anyway."
+                )
+        else:
+            revision = client.environment_revisions_file_upload(
+                project_name=project_name,
+                environment_name=environment_name,
+                file=archive_path,
+                _progress_bar=progress_bar,
+            )
+            store_package_upload(
+                project_name=project_name, target=target, revision=revision.revision, content_hash=content_hash
+            )
     except Exception as e:
         if directory and os.path.isfile(archive_path) and not store_archive:
             os.remove(archive_path)
-        client.api_client.close()
         raise e
 
     if directory and os.path.isfile(archive_path):
@@ -34,7 +34,6 @@ def exports_list(status, format_):
     if project_name:
         client = init_client()
         exports = client.exports_list(project_name=project_name, status=status)
-        client.api_client.close()
         print_list(items=exports, attrs=LIST_ITEMS, sorting_col=1, sorting_reverse=True, fmt=format_)
 
 
@@ -57,7 +56,6 @@ def exports_get(export_id, output_path, quiet, format_):
 
     client = init_client()
     export = client.exports_get(project_name=project_name, export_id=export_id)
-    client.api_client.close()
 
     if output_path is not None:
         dictionary = format_yaml(
@@ -140,7 +138,6 @@ def exports_create(yaml_file, format_):
 
     export = api.ExportCreate(deployments=deployments, pipelines=pipelines, environment_variables=environment_variables)
     response = client.exports_create(project_name=project_name, data=export)
-    client.api_client.close()
 
     print_item(item=response, row_attrs=LIST_ITEMS, fmt=format_)
 
@@ -161,7 +158,6 @@ def exports_delete(export_id, assume_yes, quiet):
     ):
         client = init_client()
         client.exports_delete(project_name=project_name, export_id=export_id)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Export was successfully deleted")
@@ -186,7 +182,6 @@ def exports_download(export_id, output_path, quiet):
     with client.exports_download(project_name=project_name, export_id=export_id) as response:
         filename = default_zip_name(prefix=f"export_{export_id}")
         output_path = write_blob(response.read(), output_path, filename)
-    client.api_client.close()
 
     if not quiet:
         click.echo(f"Export file stored in: {output_path}")
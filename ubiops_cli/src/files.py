@@ -1,11 +1,31 @@
+import time
+
 from os import path
 
 import click
 
-from ubiops.utils.file_operations import upload_file, download_file
+from ubiops.utils.file_operations import UbiOpsFile
 
+from ubiops_cli.constants import DEFAULT_IGNORE_FILE
 from ubiops_cli.utils import get_current_project, init_client
-from ubiops_cli.src.helpers.formatting import print_list, print_item
+from ubiops_cli.src.helpers.file_helpers import (
+    TransferProgress,
+    check_failed_transfers,
+    delete_files,
+    download_directory,
+    download_file_segmented,
+    download_stream,
+    filter_files,
+    get_download_cache,
+    iter_files,
+    print_signed_urls,
+    read_manifest,
+    upload_directory,
+    upload_file,
+    upload_stream,
+)
+from ubiops_cli.src.helpers.formatting import print_list, print_item, print_stream
+from ubiops_cli.src.helpers.sync_helpers import sync_files
 from ubiops_cli.src.helpers import options
 
 
@@ -21,6 +41,15 @@ def commands():
     return
 
 
+@commands.group(name="cache", short_help="Manage the local download cache")
+def cache_commands():
+    """
+    Manage the local cache of downloaded files.
+    """
+
+    return
+
+
 @commands.group(name="signedurl", short_help="Manage signedurls for your files")
 def signedurl_commands():
     """
@@ -37,20 +66,52 @@ def signedurl_commands():
 @options.FILE_DELIMITER
 @options.FILE_LIMIT
 @options.FILE_CONTINUATION_TOKEN
-@options.LIST_FORMATS
-def files_list(bucket_name, prefix, delimiter, limit, continuation_token, format_):
+@options.FILE_LIST_ALL
+@options.FILE_GLOB
+@options.FILE_MIN_SIZE
+@options.FILE_NEWER_THAN
+@options.FILE_LIST_FORMATS
+def files_list(bucket_name, prefix, delimiter, limit, continuation_token, all_, glob, min_size, newer_than, format_):
     """
     List files in a bucket.
 
     If formatted as table it will only show the file name, size and time_created.
 
     If formatted as json the response will show the continuation_token and prefixes as well.
+
+    Use `--all` to list all files instead of one page, by following the continuation tokens. Formatted as ndjson,
+    csv or json, the files are printed as each page arrives, such that buckets with millions of files can be listed.
+    Formatted as ndjson, each file is printed as a JSON object on its own line.
+
+    Use `--glob`, `--min_size` and `--newer_than` to only show the files whose name matches a glob pattern, of at
+    least a size, or created after a date or within an age.
     """
 
     project_name = get_current_project(error=True)
 
     client = init_client()
 
+    if all_:
+        assert delimiter is None, "The --delimiter option can't be used together with --all"
+
+        files = filter_files(
+            iter_files(
+                client=client,
+                project_name=project_name,
+                bucket_name=bucket_name,
+                prefix=prefix,
+                continuation_token=continuation_token,
+            ),
+            glob=glob,
+            min_size=min_size,
+            newer_than=newer_than,
+        )
+        if format_ == "table":
+            print_list(items=list(files), attrs=LIST_ITEMS, sorting_col=0, fmt=format_)
+        else:
+            print_stream(items=files, attrs=LIST_ITEMS, fmt=format_)
+        return
+
     file_detail = client.files_list(
         project_name=project_name,
         bucket_name=bucket_name,
@@ -59,7 +120,11 @@ def files_list(bucket_name, prefix, delimiter, limit, continuation_token, format
         limit=limit,
         continuation_token=continuation_token,
     )
-    client.api_client.close()
+    file_detail.files = list(filter_files(file_detail.files, glob=glob, min_size=min_size, newer_than=newer_than))
+
+    if format_ in ["ndjson", "csv"]:
+        print_stream(items=file_detail.files, attrs=LIST_ITEMS, fmt=format_)
+        return
 
     items = file_detail
     if format_ == "table":
@@ -87,134 +152,511 @@ def files_get(bucket_name, file_name, format_):
 
     client = init_client()
     file = client.files_get(project_name=project_name, bucket_name=bucket_name, file=file_name)
-    client.api_client.close()
 
     print_item(file, row_attrs=LIST_ITEMS, required_front=["file", "size", "time_created"], fmt=format_)
 
 
-@signedurl_commands.command(name="create", short_help="Generate signed url to upload a file")
+# pylint: disable=too-many-arguments
+@signedurl_commands.command(name="create", short_help="Generate signed urls to upload files")
 @options.BUCKET_NAME_OPTION
-@options.FILE_NAME_ARGUMENT
-@options.GET_FORMATS
-def files_signedurl_create(bucket_name, file_name, format_):
+@options.FILE_NAMES_ARGUMENT
+@options.FILE_SIGNED_URL_MANIFEST
+@options.FILE_SIGNED_URL_CONCURRENCY
+@options.FILE_SIGNED_URL_FORMATS
+def files_signedurl_create(bucket_name, file_names, manifest, concurrency, format_):
     """
     Generate a signed url to upload a file.
+
+    Provide multiple file names, or use `--from_file` to generate signed urls for all files listed in a file.
+    `<concurrency>` urls are generated at the same time, and printed as they are generated as a manifest with the
+    bucket, file, url, provider and expiry time of each url, formatted as csv, ndjson or json. When generating any of
+    the urls failed, the failed files are listed and the command exits with a non-zero exit code.
     """
 
     project_name = get_current_project(error=True)
 
-    client = init_client()
-    file_url = client.files_upload(project_name=project_name, bucket_name=bucket_name, file=file_name, data={})
-    client.api_client.close()
-
-    print_item(file_url, row_attrs=["url", "provider"], fmt=format_)
+    client = init_client(min_pool_size=concurrency)
+    print_signed_urls(
+        client=client,
+        project_name=project_name,
+        bucket_name=bucket_name,
+        file_names=file_names,
+        prefix=None,
+        manifest=manifest,
+        upload=True,
+        concurrency=concurrency,
+        format_=format_,
+    )
 
 
-@signedurl_commands.command(name="get", short_help="Generate signed url to download a file")
+# pylint: disable=too-many-arguments
+@signedurl_commands.command(name="get", short_help="Generate signed urls to download files")
 @options.BUCKET_NAME_OPTION
-@options.FILE_NAME_ARGUMENT
-@options.GET_FORMATS
-def files_signedurl_get(bucket_name, file_name, format_):
+@options.FILE_NAMES_ARGUMENT
+@options.FILE_SIGNED_URL_PREFIX
+@options.FILE_SIGNED_URL_MANIFEST
+@options.FILE_SIGNED_URL_CONCURRENCY
+@options.FILE_SIGNED_URL_FORMATS
+def files_signedurl_get(bucket_name, file_names, prefix, manifest, concurrency, format_):
     """
     Generate a signed url to download a file.
+
+    Provide multiple file names, use `--prefix` to generate signed urls for all files whose name starts with
+    `<prefix>`, or `--from_file` to generate signed urls for all files listed in a file. `<concurrency>` urls are
+    generated at the same time, and printed as they are generated as a manifest with the bucket, file, url, provider
+    and expiry time of each url, formatted as csv, ndjson or json. When generating any of the urls failed, the failed
+    files are listed and the command exits with a non-zero exit code.
     """
 
     project_name = get_current_project(error=True)
 
-    client = init_client()
-    file_url = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_name)
-    client.api_client.close()
-
-    print_item(file_url, row_attrs=["url", "provider"], fmt=format_)
+    client = init_client(min_pool_size=concurrency)
+    print_signed_urls(
+        client=client,
+        project_name=project_name,
+        bucket_name=bucket_name,
+        file_names=file_names,
+        prefix=prefix,
+        manifest=manifest,
+        upload=False,
+        concurrency=concurrency,
+        format_=format_,
+    )
 
 
-@commands.command(name="delete", short_help="Delete a file")
+# pylint: disable=too-many-arguments
+@commands.command(name="delete", short_help="Delete files")
 @options.BUCKET_NAME_OPTION
-@options.FILE_NAME_ARGUMENT
+@options.FILE_NAME_OVERRULE
+@options.FILE_DELETE_PREFIX
+@options.FILE_DELETE_MANIFEST
+@options.FILE_CONCURRENCY
+@options.FILE_DELETE_RATE_LIMIT
 @options.ASSUME_YES
 @options.QUIET
-def files_delete(bucket_name, file_name, assume_yes, quiet):
+def files_delete(bucket_name, file_name, prefix, manifest, concurrency, rate_limit, assume_yes, quiet):
     """
     Delete a file from a bucket.
+
+    Use `--prefix` to delete all files whose name starts with `<prefix>`, or `--from_file` to delete all files listed
+    in a file. The number of files to delete, and their total size when deleting by prefix, is shown in a single
+    confirmation. Files are deleted `<concurrency>` at the same time, optionally at most `<rate_limit>` files per
+    second. When deleting any of the files failed, the failed files are listed and the command exits with a non-zero
+    exit code.
     """
 
     project_name = get_current_project(error=True)
 
-    if assume_yes or click.confirm(
-        text=f"Are you sure you want to delete file <{file_name}> from bucket <{bucket_name}>"
-        f" of project <{project_name}>?"
-    ):
-        client = init_client()
-        client.files_delete(project_name=project_name, bucket_name=bucket_name, file=file_name)
-        client.api_client.close()
+    assert (
+        sum(option is not None for option in [file_name, prefix, manifest]) == 1
+    ), "Please, specify either the file_name, the prefix or the file with files to delete"
+
+    if file_name is not None:
+        if assume_yes or click.confirm(
+            text=f"Are you sure you want to delete file <{file_name}> from bucket <{bucket_name}>"
+            f" of project <{project_name}>?"
+        ):
+            client = init_client()
+            client.files_delete(project_name=project_name, bucket_name=bucket_name, file=file_name)
+
+            if not quiet:
+                click.echo("File was successfully deleted")
+        return
+
+    client = init_client(min_pool_size=concurrency)
+
+    if prefix is not None:
+        files, total_size = [], 0
+        for file in iter_files(client=client, project_name=project_name, bucket_name=bucket_name, prefix=prefix):
+            files.append((bucket_name, file.file))
+            total_size += file.size or 0
+        description = (
+            f"{len(files)} files ({TransferProgress.format_size(total_size)}) with prefix <{prefix}> from bucket"
+            f" <{bucket_name}>"
+        )
+    else:
+        files = read_manifest(manifest=manifest, bucket_name=bucket_name)
+        description = f"{len(files)} files listed in <{manifest.name}>"
+
+    if not files:
+        if not quiet:
+            click.echo("No files to delete")
+        return
+
+    if assume_yes or click.confirm(text=f"Are you sure you want to delete {description} of project <{project_name}>?"):
+        start = time.perf_counter()
+        failed = delete_files(
+            client=client,
+            project_name=project_name,
+            files=files,
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            progress_bar=not quiet,
+        )
 
         if not quiet:
-            click.echo("File was successfully deleted")
+            click.echo(f"Deleted {len(files) - len(failed)} files in {time.perf_counter() - start:.1f}s")
+        check_failed_transfers(failed=failed, action="delete", total=len(files))
 
 
-@commands.command(name="upload", short_help="Upload a file")
+# pylint: disable=too-many-arguments,too-many-locals
+@commands.command(name="upload", short_help="Upload a file or directory")
 @options.FILE_SOURCE_PATH_OPTION
+@options.FILE_SOURCE_DIRECTORY_OPTION
 @options.BUCKET_NAME_OPTION
 @options.FILE_NAME_OVERRULE
+@options.FILE_UPLOAD_PREFIX
+@options.IGNORE_FILE
+@options.FILE_CONCURRENCY
+@options.FILE_MULTIPART_THRESHOLD
+@options.FILE_PART_SIZE
+@options.FILE_UPLOAD_RESUME
 @options.PROGRESS_BAR
 @options.QUIET
-def files_upload(source_file, bucket_name, file_name, progress_bar, quiet):
+def files_upload(
+    source_file,
+    source_directory,
+    bucket_name,
+    file_name,
+    prefix,
+    ignore_file,
+    concurrency,
+    multipart_threshold,
+    part_size,
+    resume,
+    progress_bar,
+    quiet,
+):
     """
-    Upload a file to a bucket.
+    Upload a file or directory to a bucket.
+
+    Use `--source_file` to upload a single file, optionally under the given `<file_name>`.
+
+    Use `--recursive` to upload all files in a directory and its subdirectories, `<concurrency>` files at the same
+    time. The name of each file in the bucket is its path relative to the directory, preceded by `<prefix>`. Files
+    that match the ignore file in the root of the directory are not uploaded. When uploading any of the files failed,
+    the failed files are listed and the command exits with a non-zero exit code.
+
+    Files of at least `<multipart_threshold>` are uploaded in parts of `<part_size>`. The parts of a single file are
+    uploaded `<concurrency>` at the same time. Every uploaded part is recorded in a journal in the cache directory of
+    the CLI. When an upload was interrupted, run the same command again with `--resume` to only upload the remaining
+    parts.
+
+    Use `--source_file -` to upload the data read from stdin, e.g. `pg_dump | gzip | ubiops files upload -f - -b
+    default dump.sql.gz`; the `<file_name>` is required. The data is uploaded in parts of `<part_size>` while it's
+    read, without storing it on disk, and at most `<concurrency>` parts are held in memory. Such uploads can't be
+    resumed.
     """
 
     project_name = get_current_project(error=True)
 
-    client = init_client()
+    assert bool(source_file) != bool(source_directory), "Please, specify either the source_file or the directory"
 
-    file_uri = upload_file(
-        client=client.api_client,
-        project_name=project_name,
-        bucket_name=bucket_name,
-        file_path=source_file,
-        file_name=file_name,
-        _progress_bar=progress_bar,
-    )
+    client = init_client(min_pool_size=concurrency)
+
+    if source_directory:
+        assert file_name is None, "A file_name can't be given when uploading a directory, use --prefix instead"
+
+        progress, failed = upload_directory(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            directory=source_directory,
+            prefix=prefix,
+            ignore_filename=DEFAULT_IGNORE_FILE if ignore_file is None else ignore_file,
+            concurrency=concurrency,
+            progress_bar=progress_bar and not quiet,
+            multipart_threshold=multipart_threshold,
+            part_size=part_size,
+            resume=resume,
+        )
 
-    client.api_client.close()
+        if not quiet:
+            click.echo(progress.summary(action="Uploaded"))
+        check_failed_transfers(failed=failed, action="upload", total=progress.files_done)
+        return
+
+    if source_file == "-":
+        assert file_name, "Please, specify the file_name when uploading from stdin"
+        assert not resume, "Uploads from stdin can't be resumed"
+
+        file_name = f"{prefix or ''}{file_name}"
+        with TransferProgress(
+            total_bytes=None,
+            total_files=None,
+            description=f"Uploading {file_name}",
+            enabled=progress_bar and not quiet,
+        ) as progress:
+            file_uri = upload_stream(
+                client=client,
+                project_name=project_name,
+                bucket_name=bucket_name,
+                stream=click.get_binary_stream("stdin"),
+                file_name=file_name,
+                part_size=part_size,
+                concurrency=concurrency,
+                callback=progress.update,
+            )
+
+        if not quiet:
+            click.echo(file_uri)
+        return
+
+    assert path.isfile(source_file), f"File not found: {source_file}"
+    file_name = f"{prefix or ''}{file_name or path.basename(source_file)}"
+
+    with TransferProgress(
+        total_bytes=path.getsize(source_file),
+        total_files=None,
+        description=f"Uploading {file_name}",
+        enabled=progress_bar and not quiet,
+    ) as progress:
+        file_uri = upload_file(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            file_path=source_file,
+            file_name=file_name,
+            callback=progress.update,
+            multipart_threshold=multipart_threshold,
+            part_size=part_size,
+            concurrency=concurrency,
+            resume=resume,
+        )
 
     if not quiet:
         click.echo(file_uri)
 
 
-@commands.command(name="download", short_help="Download a file")
+# pylint: disable=too-many-arguments,too-many-locals
+@commands.command(name="download", short_help="Download a file or all files with a prefix")
 @options.BUCKET_NAME_OPTION
 @options.FILE_NAME_OVERRULE
 @options.FILE_URI_OPTION
+@options.FILE_DOWNLOAD_PREFIX
+@options.FILE_INCLUDE
+@options.FILE_EXCLUDE
+@options.FILE_CONCURRENCY
+@options.FILE_SEGMENT_SIZE
+@options.FILE_DOWNLOAD_RESUME
+@options.FILE_DOWNLOAD_CACHE
 @options.FILE_DESTINATION_PATH_OPTION
 @options.QUIET
-def files_download(bucket_name, file_name, file_uri, output_path, quiet):
+def files_download(
+    bucket_name,
+    file_name,
+    file_uri,
+    prefix,
+    include,
+    exclude,
+    concurrency,
+    segment_size,
+    resume,
+    use_cache,
+    output_path,
+    quiet,
+):
     """
     Download a file from a bucket. Provide either file_name or file_uri (e.g. 'ubiops-file://default/my-file.jpg').
+
+    A file larger than `<segment_size>` is downloaded in segments of `<segment_size>`, `<concurrency>` segments at
+    the same time. Every downloaded segment is recorded in a journal next to the output file, named like the output
+    file with the suffix '.ubiops-download'. When a download was interrupted, run the same command again with
+    `--resume` to only download the remaining segments. Smaller files, and files of storage providers that don't
+    support downloading parts of a file, are downloaded with a single request. Once downloaded, the size of the file
+    is verified, and its MD5 hash if the storage provider makes it available.
+
+    Use `--prefix` to download all files whose name starts with `<prefix>` into the `<output_path>` directory,
+    `<concurrency>` files at the same time. Each file is stored at its path relative to the last '/' of the prefix,
+    e.g., with prefix 'outputs/' the file 'outputs/2024/result.csv' is stored at '2024/result.csv'. Use `--include`
+    and `--exclude` to only download the files whose relative path matches, or doesn't match, a glob pattern like
+    '*.csv'. When downloading any of the files failed, the failed files are listed and the command exits with a
+    non-zero exit code.
+
+    Use `--cache` to take files from the local download cache when the same version of the file, i.e., with the same
+    creation time and size, was downloaded before. Cached files are hard linked to the output path when it's on the
+    same file system as the cache, and copied otherwise. Don't modify linked files in place, as that modifies the
+    other links as well; cached files that were modified are discarded. Downloaded files are added to the cache, and
+    the least recently used files are removed when the cache grows beyond its maximum size. The cache is stored in the
+    directory configured with `files.cache_dir`, by default in the cache directory of the CLI, and its maximum size is
+    configured with `files.cache_max_size`, by default '10GB'.
+
+    Use `--output_path -` to write the file to stdout, e.g. `ubiops files download -b default dump.sql.gz -o - |
+    gunzip`. The file is written in blocks as it's received, without storing it on disk.
     """
 
     project_name = get_current_project(error=True)
 
-    assert file_name or file_uri, "Please, specify the file_name or file_uri to download"
+    client = init_client(min_pool_size=concurrency)
+    cache = get_download_cache() if use_cache else None
+
+    if prefix is not None:
+        assert not file_name and not file_uri, "Please, specify either the prefix or the file_name/file_uri"
+
+        assert output_path != "-", "A prefix download can't be written to stdout"
+        output_path = "." if output_path is None else output_path
+        assert not path.isfile(output_path), "The output path of a prefix download must be a directory"
+
+        progress, failed = download_directory(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            output_path=output_path,
+            include=list(include),
+            exclude=list(exclude),
+            concurrency=concurrency,
+            progress_bar=not quiet,
+            cache=cache,
+        )
 
-    client = init_client()
+        if not quiet:
+            click.echo(progress.summary(action="Downloaded"))
+        check_failed_transfers(failed=failed, action="download", total=progress.files_done)
+        return
+
+    assert file_name or file_uri, "Please, specify the file_name or file_uri to download"
+    assert not include and not exclude, "The --include and --exclude options can only be used with --prefix"
+
+    if file_uri:
+        ubiops_file = UbiOpsFile.from_uri(file_uri=file_uri)
+        bucket_name, file_name = ubiops_file.bucket, ubiops_file.file
+
+    if output_path == "-":
+        assert not resume and not use_cache, "The --resume and --cache options can't be used when writing to stdout"
+
+        with TransferProgress(
+            total_bytes=None, total_files=None, description=f"Downloading {file_name}", enabled=not quiet
+        ) as progress:
+            download_stream(
+                client=client,
+                project_name=project_name,
+                bucket_name=bucket_name,
+                file_name=file_name,
+                stream=click.get_binary_stream("stdout"),
+                callback=progress.update,
+            )
+        return
 
     if output_path is None:
-        if file_name:
-            output_path = path.basename(file_name)
-        else:
-            output_path = path.basename(file_uri)
+        output_path = path.basename(file_name)
+    elif path.isdir(output_path):
+        output_path = path.join(output_path, path.basename(file_name))
+
+    file, key = None, None
+    if cache is not None:
+        file = client.files_get(project_name=project_name, bucket_name=bucket_name, file=file_name)
+        key = cache.get_key(client.api_client.configuration.host, project_name, bucket_name, file)
+        if cache.fetch(key, output_path):
+            if not quiet:
+                click.echo(f"File stored in: {output_path} (from cache)")
+            return
+
+    with TransferProgress(
+        total_bytes=None, total_files=None, description=f"Downloading {file_name}", enabled=not quiet
+    ) as progress:
+        download_file_segmented(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            file_name=file_name,
+            output_path=output_path,
+            segment_size=segment_size,
+            concurrency=concurrency,
+            resume=resume,
+            callback=progress.update,
+            size_callback=progress.set_total_bytes,
+            file=file,
+        )
+    if cache is not None:
+        cache.store(key, output_path)
+
+    if not quiet:
+        click.echo(f"File stored in: {output_path}")
+
+
+# pylint: disable=too-many-arguments
+@commands.command(name="sync", short_help="Synchronize a directory with a bucket")
+@options.FILE_SYNC_SOURCE
+@options.FILE_SYNC_DESTINATION
+@options.IGNORE_FILE
+@options.FILE_SYNC_DELETE
+@options.FILE_CONCURRENCY
+@options.QUIET
+def files_sync(source, destination, ignore_file, delete, concurrency, quiet):
+    """
+    Synchronize a local directory with a bucket prefix, or a bucket prefix with a local directory.
 
-    download_file(
-        client=client.api_client,
+    One of the locations is a local directory, the other a bucket location like 'ubiops-file://my-bucket/my-prefix'.
+    Files are copied from the `<source>` to the `<destination>` when they don't exist in the destination, or changed
+    since they were last synchronized. Local files are compared by their size, modification time and content hash,
+    remote files by their size and creation time. The hashes are stored in an index in the cache directory of the CLI,
+    such that only new and changed local files are hashed again. Use `--delete` to delete the files in the destination
+    that don't exist in the source.
+
+    Files that match the ignore file in the root of the local directory are neither copied nor deleted. When copying
+    or deleting any of the files failed, the failed files are listed and the command exits with a non-zero exit code.
+    """
+
+    project_name = get_current_project(error=True)
+
+    client = init_client(min_pool_size=concurrency)
+    progress, up_to_date, deleted, failed = sync_files(
+        client=client,
         project_name=project_name,
-        bucket_name=bucket_name,
-        file_name=file_name,
-        file_uri=file_uri,
-        output_path=output_path,
+        source=source,
+        destination=destination,
+        ignore_filename=DEFAULT_IGNORE_FILE if ignore_file is None else ignore_file,
+        delete=delete,
+        concurrency=concurrency,
+        progress_bar=not quiet,
     )
 
-    client.api_client.close()
+    if not quiet:
+        action = "Downloaded" if source.startswith("ubiops-file://") else "Uploaded"
+        click.echo(f"{progress.summary(action=action)}, {up_to_date} files up to date, {deleted} files deleted")
+    check_failed_transfers(failed=failed, action="synchronize", total=progress.files_done + deleted)
+
+
+@cache_commands.command(name="stats", short_help="Show statistics of the download cache")
+def files_cache_stats():
+    """
+    Show statistics of the local download cache: the number and total size of the cached files, how often a download
+    could be taken from the cache, and how many bytes are removed when the cache is pruned to its maximum size.
+    """
 
+    cache = get_download_cache()
+    stats = cache.get_stats()
+    format_size = TransferProgress.format_size
+
+    downloads = stats["hits"] + stats["misses"]
+    hit_rate = f"{100 * stats['hits'] / downloads:.1f}%" if downloads else "-"
+    click.echo(f"Location: {cache.directory}")
+    click.echo(f"Files: {stats['files']}")
+    click.echo(f"Size: {format_size(stats['size'])} (maximum {format_size(cache.max_size)})")
+    click.echo(f"Hit rate: {hit_rate} ({stats['hits']} of {downloads} downloads)")
+    click.echo(f"Bytes not downloaded: {format_size(stats['hit_bytes'])}")
+    click.echo(f"Reclaimable: {format_size(stats['reclaimable'])}")
+
+
+@cache_commands.command(name="prune", short_help="Remove files from the download cache")
+@options.FILE_CACHE_MAX_SIZE
+@options.FILE_CACHE_PRUNE_ALL
+@options.QUIET
+def files_cache_prune(max_size, all_, quiet):
+    """
+    Remove the least recently used files from the local download cache, until the cache is at most `<max_size>`, by
+    default the maximum size configured with `files.cache_max_size`. Use `--all` to remove all files from the cache.
+    """
+
+    assert not (all_ and max_size is not None), "Please, specify either --max_size or --all"
+
+    cache = get_download_cache()
+    if all_:
+        max_size = 0
+    elif max_size is None:
+        max_size = cache.max_size
+
+    removed, size = cache.prune(max_size=max_size)
     if not quiet:
-        click.echo(f"File stored in: {output_path}")
+        click.echo(f"Removed {removed} files ({TransferProgress.format_size(size)}) from the cache")
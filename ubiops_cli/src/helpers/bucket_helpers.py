@@ -1,3 +1,14 @@
+import datetime
+import hashlib
+import os
+
+import tqdm
+import ubiops as api
+
+from ubiops_cli.bucket_index import BucketIndex
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.utils import Config, file_lock, get_cache_dir
+from ubiops_cli.src.helpers.file_helpers import LIST_PAGE_SIZE, iter_files, run_parallel
 from ubiops_cli.src.helpers.helpers import strings_to_dict, json_to_dict
 
 BUCKET_INPUT_FIELDS = ["name", "description", "labels", "provider", "credentials", "configuration", "ttl"]
@@ -24,6 +35,9 @@ BUCKET_OUTPUT_FIELDS = [
 ]
 BUCKET_FIELDS_RENAMED = {"name": "bucket_name", "description": "bucket_description", "labels": "bucket_labels"}
 
+# Number of directory levels that are listed separately when indexing a bucket, such that they're listed in parallel
+INDEX_SPLIT_DEPTH = 3
+
 
 def define_bucket(fields, yaml_content, update=False):
     """
@@ -85,3 +99,209 @@ def is_defined(fields, field_name):
         return bool(fields[field_name])
 
     return False
+
+
+class DirectoryUsage:
+    """
+    Usage of a directory in a bucket, with the attributes of a model of the client library such that it can be
+    formatted like one
+    """
+
+    def __init__(self, directory, files, size, newest):
+        """
+        :param str directory: the directory, ending with a '/', or empty for the bucket root
+        :param int files: the number of files in the directory and its subdirectories
+        :param int|str size: the total size of the files
+        :param datetime.datetime|None newest: the creation time of the newest file
+        """
+
+        self._directory = directory
+        self._files = files
+        self._size = size
+        self._newest = newest
+
+    directory = property(lambda self: self._directory)
+    files = property(lambda self: self._files)
+    size = property(lambda self: self._size)
+    newest = property(lambda self: self._newest, lambda self, value: setattr(self, "_newest", value))
+
+
+def to_datetime(timestamp):
+    """
+    Convert a POSIX timestamp from the inventory to a datetime in UTC
+
+    :param float|None timestamp: the timestamp
+    """
+
+    return None if timestamp is None else datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def to_file_item(file):
+    """
+    Convert a file from the inventory to a file model of the client library
+
+    :param tuple[str, int, float] file: the name, size and creation time of the file
+    :return ubiops.FileItem: the file
+    """
+
+    return api.FileItem(file=file[0], size=file[1], time_created=to_datetime(file[2]))
+
+
+def get_bucket_index():
+    """
+    Get the inventory of buckets in the cache directory of the CLI, and the API host its inventories belong to
+    """
+
+    host = (Config().get("auth.api") or Config.DEFAULT_API).rstrip("/")
+    return BucketIndex(os.path.join(get_cache_dir(), "buckets.sqlite")), host
+
+
+def get_bucket_inventory(project_name, bucket_name, prefix=""):
+    """
+    Get the inventory of a bucket, whose files with a prefix must have been indexed
+
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str prefix: the prefix of the files to query, empty for all files in the bucket
+    :return tuple[BucketIndex, int]: the inventory of buckets and the ID of the inventory of the bucket
+    """
+
+    index, host = get_bucket_index()
+    inventory = index.get_inventory(host=host, project_name=project_name, bucket_name=bucket_name)
+    if inventory is None:
+        raise UbiOpsException(
+            f"Bucket {bucket_name} is not indexed yet, use `ubiops buckets index {bucket_name}` to index it"
+        )
+    if not index.is_indexed(inventory=inventory[0], prefix=prefix):
+        if prefix:
+            raise UbiOpsException(
+                f"The files with prefix '{prefix}' in bucket {bucket_name} are not indexed yet, use `ubiops buckets "
+                f"index {bucket_name} --prefix {prefix}` to index them"
+            )
+        raise UbiOpsException(
+            f"Bucket {bucket_name} is only indexed partially, use `ubiops buckets index {bucket_name}` to index all "
+            "its files"
+        )
+    return index, inventory[0]
+
+
+def get_refresh_lock_path(host, project_name, bucket_name):
+    """
+    Get the path of the lock file that's held while refreshing the inventory of a bucket
+
+    :param str host: the API host
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    """
+
+    key = hashlib.sha256(f"{host}\n{project_name}\n{bucket_name}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_cache_dir(), f"buckets.{key}.lock")
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def index_bucket(client, project_name, bucket_name, prefix, concurrency, progress_bar):
+    """
+    Refresh the inventory of the files in a bucket whose name starts with a prefix. The directories are expanded level
+    by level, up to a few levels deep, and the files in each directory are then listed in parallel. Files are stored in
+    the inventory page by page, and once all files are listed, files that no longer exist are removed. Refreshes of the
+    same bucket, e.g., by another CLI process, wait for each other.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str prefix: the prefix of the files to index, empty for all files
+    :param int concurrency: the maximum number of directories to list at the same time
+    :param bool progress_bar: whether to show a progress bar
+    :return tuple[int, int]: the number and total size of the indexed files
+    """
+
+    index, host = get_bucket_index()
+    with file_lock(get_refresh_lock_path(host=host, project_name=project_name, bucket_name=bucket_name)):
+        return _refresh_bucket(
+            client=client,
+            index=index,
+            host=host,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            concurrency=concurrency,
+            progress_bar=progress_bar,
+        )
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def _refresh_bucket(client, index, host, project_name, bucket_name, prefix, concurrency, progress_bar):
+    """
+    Refresh the inventory of the files in a bucket whose name starts with a prefix, see :func:`index_bucket`
+
+    :param ubiops.CoreApi client: the client
+    :param BucketIndex index: the inventory of buckets
+    :param str host: the API host
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str prefix: the prefix of the files to index, empty for all files
+    :param int concurrency: the maximum number of directories to list at the same time
+    :param bool progress_bar: whether to show a progress bar
+    :return tuple[int, int]: the number and total size of the indexed files
+    """
+
+    inventory, refresh = index.start_refresh(host=host, project_name=project_name, bucket_name=bucket_name)
+    totals = [0, 0]
+
+    def store(files):
+        files = [
+            (file.file, file.size or 0, file.time_created.timestamp()) for file in files if not file.file.endswith("/")
+        ]
+        index.store_files(inventory=inventory, refresh=refresh, files=files)
+        return len(files), sum(file[1] for file in files)
+
+    def expand(directory):
+        # List the files directly in a directory, and its subdirectories
+        subdirectories, files, continuation_token = set(), [], None
+        while True:
+            file_list = client.files_list(
+                project_name=project_name,
+                bucket_name=bucket_name,
+                prefix=directory or None,
+                delimiter="/",
+                limit=LIST_PAGE_SIZE,
+                continuation_token=continuation_token,
+            )
+            files.extend(file_list.files)
+            subdirectories.update(file_list.prefixes or [])
+            continuation_token = file_list.continuation_token
+            if not continuation_token or not (file_list.files or file_list.prefixes):
+                return sorted(subdirectories), store(files)
+
+    def list_all(directory):
+        page, count, size = [], 0, 0
+        for file in iter_files(client=client, project_name=project_name, bucket_name=bucket_name, prefix=directory):
+            page.append(file)
+            if len(page) == LIST_PAGE_SIZE:
+                page_count, page_size = store(page)
+                count, size, page = count + page_count, size + page_size, []
+        page_count, page_size = store(page)
+        return [], (count + page_count, size + page_size)
+
+    with tqdm.tqdm(unit=" files", desc=f"Indexing {bucket_name}", disable=not progress_bar) as bar:
+
+        def collect(function, directories):
+            subdirectories = []
+            for _, (found, (count, size)), error in run_parallel(function, directories, concurrency):
+                if error is not None:
+                    raise error
+                subdirectories.extend(found)
+                totals[0], totals[1] = totals[0] + count, totals[1] + size
+                bar.update(count)
+            return subdirectories
+
+        # Directories are expanded while that increases the parallelism, the files in the last level are listed at once
+        directories = collect(expand, [prefix])
+        for _ in range(INDEX_SPLIT_DEPTH - 1):
+            if not directories or len(directories) >= concurrency * 4:
+                break
+            directories = collect(expand, directories)
+        collect(list_all, directories)
+
+    index.finish_refresh(inventory=inventory, refresh=refresh, prefix=prefix)
+    return tuple(totals)
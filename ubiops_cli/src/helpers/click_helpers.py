@@ -1,3 +1,7 @@
+import datetime
+import importlib
+import re
+
 import click
 
 
@@ -7,6 +11,9 @@ class CustomGroup(click.Group):
         self.alias_to_original = {}
         self.original_to_aliases = {}
 
+        # Commands that are only imported once they are invoked, to keep the start-up time of the CLI low
+        self.lazy_commands = {}
+
     def add_command(self, *args, **_):
         if isinstance(args[0].name, list):
             original_name = args[0].name[0]
@@ -20,20 +27,99 @@ class CustomGroup(click.Group):
         else:
             self.commands[args[0].name] = args[0]
 
+    def add_lazy_command(self, import_path, name, aliases=None, short_help=None):
+        """
+        Register a command that is imported the first time it is needed
+
+        :param str import_path: the module and attribute of the command, e.g., 'ubiops_cli.src.auth:signin'
+        :param str name: the name of the command
+        :param list[str]|None aliases: the aliases of the command
+        :param str|None short_help: the help text to show in the commands overview, without importing the command
+        """
+
+        self.lazy_commands[name] = (import_path, short_help)
+
+        if aliases:
+            self.original_to_aliases[name] = aliases
+            for alias in aliases:
+                self.alias_to_original[alias] = name
+
+    def parse_args(self, ctx, args):
+        # An option with an optional value, like `--trace [<path>]`, would take the name of the command as its value.
+        # Make it use its flag value instead when it's directly followed by a command. Options with an optional value
+        # are marked with `_flag_needs_value` since click 8.0, the minimum supported version.
+        optional_value_options = {
+            name: param.flag_value
+            for param in self.params
+            if isinstance(param, click.Option) and getattr(param, "_flag_needs_value", False)
+            for name in param.opts
+        }
+        value_options = {
+            name
+            for param in self.params
+            if isinstance(param, click.Option) and not param.is_flag and not param.count
+            for name in param.opts
+            if name not in optional_value_options
+        }
+
+        args = list(args)
+        skip_value = False
+        for index, arg in enumerate(args):
+            if skip_value:
+                # The value of the previous option, like `--max_age 60`
+                skip_value = False
+                continue
+            if not arg.startswith("-"):
+                break
+            if arg in value_options:
+                skip_value = True
+            elif arg in optional_value_options and index + 1 < len(args):
+                next_arg = args[index + 1]
+                if next_arg in self.list_commands(ctx) or next_arg in self.alias_to_original:
+                    args.insert(index + 1, optional_value_options[arg])
+                    break
+
+        return super().parse_args(ctx, args)
+
+    def list_commands(self, ctx):
+        return list(self.commands) + [name for name in self.lazy_commands if name not in self.commands]
+
+    def _load_command(self, cmd_name):
+        """
+        Import a lazily registered command and add it to the loaded commands
+
+        :param str cmd_name: the name of the command
+        """
+
+        import_path, _ = self.lazy_commands[cmd_name]
+        module_name, attribute = import_path.split(":")
+        command = getattr(importlib.import_module(module_name), attribute)
+
+        self.add_command(command)
+        return command
+
     def get_command(self, ctx, cmd_name):
+        cmd_name = self.alias_to_original.get(cmd_name, cmd_name)
+
         command = click.Group.get_command(self, ctx, cmd_name)
         if command is not None:
             return command
 
-        # Handle alias
-        if cmd_name in self.alias_to_original:
-            return click.Group.get_command(self, ctx, self.alias_to_original[cmd_name])
+        if cmd_name in self.lazy_commands:
+            return self._load_command(cmd_name)
 
         return None
 
     def format_commands(self, ctx, formatter):
         commands = []
         for subcommand in self.list_commands(ctx):
+            if subcommand not in self.commands and subcommand in self.lazy_commands:
+                # Use the registered help text to avoid importing all commands to show the overview
+                short_help = self.lazy_commands[subcommand][1]
+                if short_help is not None:
+                    commands.append((subcommand, short_help))
+                    continue
+
             cmd = self.get_command(ctx, subcommand)
             # What is this, the tool lied about a command.  Ignore it
             if cmd is None:
@@ -49,7 +135,7 @@ class CustomGroup(click.Group):
 
             rows = []
             for subcommand, cmd in commands:
-                help_text = cmd.get_short_help_str(limit)
+                help_text = cmd if isinstance(cmd, str) else cmd.get_short_help_str(limit)
                 # Add (aliases) in Commands help overview
                 if subcommand in self.original_to_aliases:
                     subcommand = f"{subcommand} ({', '.join(self.original_to_aliases[subcommand])})"
@@ -58,3 +144,58 @@ class CustomGroup(click.Group):
             if rows:
                 with formatter.section("Commands"):
                     formatter.write_dl(rows)
+
+
+class ByteSize(click.ParamType):
+    """
+    A number of bytes, given as a number with an optional unit, like '512', '64KB', '100MB' or '1.5GB'. Units are
+    multiples of 1024.
+    """
+
+    name = "size"
+
+    UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(value), flags=re.IGNORECASE)
+        if match is None:
+            self.fail(f"{value!r} is not a valid size, use a number with an optional unit like '100MB'", param, ctx)
+
+        return int(float(match.group(1)) * self.UNITS[match.group(2).upper()])
+
+
+class PointInTime(click.ParamType):
+    """
+    A point in time, given as an ISO formatted date or datetime like '2024-01-31' or '2024-01-31T12:00:00Z', or as an
+    age relative to now like '30m', '12h', '7d' or '2w'. Datetimes without timezone are in UTC.
+    """
+
+    name = "datetime"
+
+    UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, datetime.datetime):
+            return value
+
+        match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*", str(value), flags=re.IGNORECASE)
+        if match is not None:
+            age = float(match.group(1)) * self.UNITS[match.group(2).lower()]
+            return datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(seconds=age)
+
+        try:
+            # pylint: disable=import-outside-toplevel
+            import dateutil.parser
+
+            point_in_time = dateutil.parser.isoparse(str(value).strip())
+        except ValueError:
+            self.fail(
+                f"{value!r} is not a valid datetime, use a date like '2024-01-31' or an age like '7d'", param, ctx
+            )
+
+        if point_in_time.tzinfo is None:
+            point_in_time = point_in_time.replace(tzinfo=datetime.timezone.utc)
+        return point_in_time
@@ -0,0 +1,1516 @@
+import base64
+import datetime
+import fnmatch
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import urllib.parse
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import click
+import requests
+import tqdm
+
+from tqdm.utils import CallbackIOWrapper
+
+from ubiops_cli.concurrency import RateLimiter
+from ubiops_cli.download_cache import DownloadCache
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.gitignorefile.gitignorefile import parse as parse_ignore
+from ubiops_cli.utils import Config, get_cache_dir
+from ubiops_cli.src.helpers.click_helpers import ByteSize
+from ubiops_cli.src.helpers.formatting import print_item, print_stream
+
+# Files of at least this size are uploaded in parts, which are uploaded in parallel and can be resumed
+DEFAULT_MULTIPART_THRESHOLD = 100 * 1024 * 1024  # 100 MB
+DEFAULT_PART_SIZE = 64 * 1024 * 1024  # 64 MB
+
+# Storage providers require parts of at least 5 MB, except for the last part, and allow at most 10000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+# The journals of multipart uploads are stored in this subdirectory of the cache directory
+UPLOAD_JOURNAL_DIR = "uploads"
+
+# Azure requires custom headers in the upload request
+AZURE_UPLOAD_HEADERS = {
+    "Content-Disposition": "multipart/form-data",
+    "x-ms-version": "2020-04-08",
+    "x-ms-blob-type": "BlockBlob",
+}
+UPLOAD_HEADERS = {"Content-Disposition": "multipart/form-data"}
+
+# Files are downloaded in segments of this size, which are downloaded in parallel and can be resumed
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024  # 64 MB
+
+# The journal of a download in segments is stored next to the downloaded file, with this suffix
+DOWNLOAD_JOURNAL_SUFFIX = ".ubiops-download"
+
+# Number of files to request per page when listing the files in a bucket
+LIST_PAGE_SIZE = 1000
+
+# Size of the blocks in which downloaded files are written to disk, which bounds the memory used per download
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Maximum total size of the download cache, unless configured with `files.cache_max_size`
+DEFAULT_CACHE_MAX_SIZE = "10GB"
+
+# Attributes of signed urls printed as manifest
+SIGNED_URL_ITEMS = ["bucket", "file", "url", "provider", "expiry"]
+
+# Connections to the storage provider, one session per thread
+_storage = threading.local()
+
+
+def get_storage_session():
+    """
+    Get the session of the current thread to send requests to signed urls, such that connections to the storage
+    provider are reused between files
+    """
+
+    session = getattr(_storage, "session", None)
+    if session is None:
+        session = _storage.session = requests.Session()
+    return session
+
+
+def get_download_cache():
+    """
+    Get the cache of downloaded files, in the directory configured with `files.cache_dir` or in the cache directory of
+    the CLI, and with the maximum size configured with `files.cache_max_size`
+    """
+
+    user_config = Config()
+    directory = os.path.expanduser(user_config.get("files.cache_dir") or get_cache_dir("files"))
+    try:
+        max_size = ByteSize().convert(user_config.get("files.cache_max_size") or DEFAULT_CACHE_MAX_SIZE, None, None)
+    except click.BadParameter:
+        raise UbiOpsException("Invalid value for files.cache_max_size, a size like '10GB' is expected")
+
+    os.makedirs(directory, exist_ok=True)
+    return DownloadCache(directory=directory, max_size=max_size)
+
+
+def describe_error(error):
+    """
+    Get a one-line description of an error that occurred while transferring a file
+
+    :param Exception error: the error
+    """
+
+    if hasattr(error, "get_body_message"):
+        message = error.get_body_message() or error.reason
+        return f"{message} ({error.status})" if error.status else str(message)
+    return str(error) or error.__class__.__name__
+
+
+def check_failed_transfers(failed, action, total):
+    """
+    List the files that failed to transfer, and raise an error if there are any
+
+    :param list[tuple[str, str]] failed: the name and error of each file that failed to transfer
+    :param str action: the transfer action, like 'upload'
+    :param int total: the total number of files
+    """
+
+    if not failed:
+        return
+
+    click.echo(f"Failed to {action} {len(failed)} files:", err=True)
+    for file_name, error in failed:
+        click.echo(f"- {file_name}: {error}", err=True)
+    raise UbiOpsException(f"Failed to {action} {len(failed)} of {total} files")
+
+
+def iter_files(client, project_name, bucket_name, prefix=None, continuation_token=None):
+    """
+    Iterate over the files in a bucket, requesting the pages of the file list as they are needed
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str|None prefix: only list the files whose name starts with this prefix
+    :param str|None continuation_token: the token of the page to start at, None to start at the first file
+    :return generator[ubiops.FileItem]: the files
+    """
+
+    while True:
+        file_list = client.files_list(
+            project_name=project_name,
+            bucket_name=bucket_name,
+            prefix=prefix,
+            limit=LIST_PAGE_SIZE,
+            continuation_token=continuation_token,
+        )
+        yield from file_list.files
+
+        continuation_token = file_list.continuation_token
+        if not continuation_token or not file_list.files:
+            return
+
+
+def matches_patterns(name, include=None, exclude=None):
+    """
+    Whether a file name matches any of the include patterns, if given, and none of the exclude patterns. Patterns are
+    shell-style globs, like '*.json' or 'outputs/*/result.csv'.
+
+    :param str name: the file name
+    :param list[str]|None include: the patterns of the files to include
+    :param list[str]|None exclude: the patterns of the files to exclude
+    """
+
+    if include and not any(fnmatch.fnmatchcase(name, pattern) for pattern in include):
+        return False
+    return not (exclude and any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude))
+
+
+def filter_files(files, glob=None, min_size=None, newer_than=None):
+    """
+    Filter files in a bucket while they are iterated
+
+    :param iterable[ubiops.FileItem] files: the files
+    :param str|None glob: only keep the files whose name matches this glob pattern, like 'outputs/*.json'
+    :param int|None min_size: only keep the files of at least this size
+    :param datetime.datetime|None newer_than: only keep the files created after this point in time
+    :return generator[ubiops.FileItem]: the files that match all filters
+    """
+
+    for file in files:
+        if glob is not None and not fnmatch.fnmatchcase(file.file, glob):
+            continue
+        if min_size is not None and (file.size or 0) < min_size:
+            continue
+        if newer_than is not None and (file.time_created is None or file.time_created <= newer_than):
+            continue
+        yield file
+
+
+def get_ignore_matcher(directory, ignore_filename=None):
+    """
+    Get the rules of the ignore file in the root of a directory, which match paths relative to the directory with
+    `match_relative` and tell with `ignores_tree_relative` whether a subdirectory is ignored with everything inside it
+
+    :param str directory: absolute path of the directory
+    :param str|None ignore_filename: the name of the ignore file
+    :return callable|None: the compiled rules, None if there's no ignore file
+    """
+
+    if ignore_filename and os.path.isfile(os.path.join(directory, ignore_filename)):
+        return parse_ignore(os.path.join(directory, ignore_filename), directory, compiled=True)
+    return None
+
+
+def list_local_files(directory, ignore_filename=None):
+    """
+    List the files in a directory and its subdirectories, leaving out the files that match the ignore file
+
+    :param str directory: the directory to list
+    :param str|None ignore_filename: the name of the ignore file in the root of the directory
+    :return list[tuple[str, str, os.stat_result]]: per file, its path, its path relative to the directory with forward
+        slashes and its status
+    """
+
+    directory = os.path.abspath(directory)
+    is_ignored = get_ignore_matcher(directory=directory, ignore_filename=ignore_filename)
+
+    files = []
+    for root, dirs, filenames in os.walk(directory):
+        # Match paths relative to the directory, with forward slashes like in the ignore file
+        relative_root = os.path.relpath(root, directory).replace(os.sep, "/")
+        rel_prefix = "" if relative_root == "." else f"{relative_root}/"
+        if is_ignored is not None:
+            # Don't walk into directories that are ignored together with everything inside them, like a virtual
+            # environment. Directories that may contain files re-included by a negation rule are still walked.
+            dirs[:] = [d for d in dirs if not is_ignored.ignores_tree_relative(f"{rel_prefix}{d}")]
+
+        for filename in filenames:
+            relative_path = f"{rel_prefix}{filename}"
+            if is_ignored is not None and is_ignored.match_relative(relative_path, is_dir=False):
+                continue
+            file_path = os.path.join(root, filename)
+            files.append((file_path, relative_path, os.stat(file_path)))
+
+    files.sort(key=lambda f: f[1])
+    return files
+
+
+def run_parallel(function, items, concurrency):
+    """
+    Call a function for each item on a bounded thread pool. Items are taken from the iterable while the pool has room
+    for them, such that not all items need to be in memory at once.
+
+    :param callable function: the function to call with each item
+    :param iterable items: the items
+    :param int concurrency: the maximum number of calls to run at the same time
+    :return generator[tuple]: per item, in the order the calls finished, the item, the result of the call and the
+        error it raised, if any
+    """
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < concurrency * 2:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(function, item)] = item
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error is not None else future.result()), error
+
+
+class TransferProgress:
+    """
+    Aggregated progress of files transferred in parallel: the number of bytes and files done, and the throughput
+    """
+
+    def __init__(self, total_bytes, total_files, description, enabled=True):
+        """
+        :param int|None total_bytes: the total number of bytes to transfer, None if unknown
+        :param int|None total_files: the total number of files to transfer, None if unknown
+        :param str description: the description shown in front of the progress bar
+        :param bool enabled: whether to show the progress bar
+        """
+
+        self.total_files = total_files
+        self.bytes_done = 0
+        self.files_done = 0
+        self.files_failed = 0
+        self.start = time.perf_counter()
+
+        self._lock = threading.Lock()
+        self._bar = tqdm.tqdm(
+            total=total_bytes,
+            unit="B",
+            unit_scale=True,
+            unit_divisor=1024,
+            desc=description,
+            disable=not enabled,
+            leave=True,
+        )
+
+    def update(self, n_bytes):
+        """
+        Report that a number of bytes was transferred. Safe to call from multiple threads.
+
+        :param int n_bytes: the number of bytes
+        """
+
+        with self._lock:
+            self.bytes_done += n_bytes
+            self._bar.update(n_bytes)
+
+    def set_total_bytes(self, total_bytes):
+        """
+        Set the total number of bytes to transfer, once it's known
+
+        :param int total_bytes: the number of bytes
+        """
+
+        with self._lock:
+            self._bar.total = total_bytes
+            self._bar.refresh()
+
+    def file_done(self, failed=False):
+        """
+        Report that a file finished transferring
+
+        :param bool failed: whether the transfer failed
+        """
+
+        with self._lock:
+            self.files_done += 1
+            self.files_failed += int(failed)
+            total = f"/{self.total_files}" if self.total_files is not None else ""
+            postfix = f"{self.files_done}{total} files"
+            if self.files_failed:
+                postfix += f", {self.files_failed} failed"
+            self._bar.set_postfix_str(postfix, refresh=False)
+
+    def summary(self, action):
+        """
+        Get a summary of the transfer, like 'Uploaded 10 files (1.00MB) in 2.0s (512kB/s)'
+
+        :param str action: the past tense of the transfer action, like 'Uploaded'
+        """
+
+        duration = time.perf_counter() - self.start
+        done = self.files_done - self.files_failed
+        size = self.format_size(self.bytes_done)
+        rate = self.format_size(self.bytes_done / duration if duration else 0, unit="B/s")
+        return f"{action} {done} files ({size}) in {duration:.1f}s ({rate})"
+
+    @staticmethod
+    def format_size(size, unit="B"):
+        """
+        Format a number of bytes human-readable, like '1.50MB'
+
+        :param float size: the number of bytes
+        :param str unit: the unit to show after the scale, like 'B' or 'B/s'
+        """
+
+        return tqdm.tqdm.format_sizeof(size, unit, 1024)
+
+    def close(self):
+        """
+        Close the progress bar
+        """
+
+        self._bar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class FilePart:
+    """
+    Readable part of a file, which is sent as the body of a request without reading the whole part into memory. The
+    SHA-256 hash of the part is computed while it's read.
+    """
+
+    def __init__(self, file_path, offset, size, callback=None):
+        """
+        :param str file_path: the path of the file
+        :param int offset: the position of the part in the file
+        :param int size: the size of the part
+        :param callable|None callback: function that is called with the number of bytes read
+        """
+
+        self.size = size
+        self.sha256 = hashlib.sha256()
+        self._remaining = size
+        self._callback = callback
+        self._file = open(file_path, "rb")  # pylint: disable=consider-using-with
+        self._file.seek(offset)
+
+    def __len__(self):
+        return self.size
+
+    def read(self, size=-1):
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        self.sha256.update(data)
+        if self._callback and data:
+            self._callback(len(data))
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def hash_file_part(file_path, offset, size):
+    """
+    Compute the SHA-256 hash of a part of a file
+
+    :param str file_path: the path of the file
+    :param int offset: the position of the part in the file
+    :param int size: the size of the part
+    """
+
+    with FilePart(file_path=file_path, offset=offset, size=size) as part:
+        while part.read(DOWNLOAD_CHUNK_SIZE):
+            pass
+        return part.sha256.hexdigest()
+
+
+class TransferJournal:
+    """
+    Journal of a file transfer in parts. It holds the details of the transfer and of every part that completed, such
+    that an interrupted transfer can be resumed. When the journal can't be written, the transfer continues without it,
+    and can't be resumed.
+    """
+
+    def __init__(self, path):
+        """
+        :param str|None path: the path of the journal, None to keep it in memory only
+        """
+
+        self.path = path
+        self.data = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Load the journal of an earlier transfer, None if there is none
+        """
+
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = None
+        return self.data
+
+    def start(self, **fields):
+        """
+        Start the journal of a new transfer
+
+        :param fields: the details of the transfer, like the upload ID
+        """
+
+        self.data = {**fields, "parts": {}}
+        self._save()
+
+    def add_part(self, part_number, **details):
+        """
+        Record a part that completed
+
+        :param int part_number: the number of the part, starting at 1
+        :param details: the details of the part, like its size
+        """
+
+        with self._lock:
+            self.data["parts"][str(part_number)] = details
+            self._save()
+
+    def update(self, **fields):
+        """
+        Update the details of the transfer
+
+        :param fields: the details to update
+        """
+
+        with self._lock:
+            self.data.update(fields)
+            self._save()
+
+    def _save(self):
+        """
+        Write the journal to disk, replacing the earlier version at once
+        """
+
+        if self.path is None:
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Continue the transfer without the journal
+            self.path = None
+
+    def remove(self):
+        """
+        Remove the journal once the transfer completed
+        """
+
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def get_upload_journal_path(file_path, stat, project_name, bucket_name, file_name):
+    """
+    Get the path of the journal of a multipart upload. Journals are stored in the cache directory, such that files can
+    be uploaded from read-only locations, and keyed by the local file and its version and the destination of the upload.
+
+    :param str file_path: the path of the file to upload
+    :param os.stat_result stat: the status of the file to upload
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_name: the name of the file in the bucket
+    :return str|None: the path of the journal, None if the cache directory can't be used
+    """
+
+    key = "\n".join(
+        [os.path.abspath(file_path), str(stat.st_size), str(stat.st_mtime_ns), project_name, bucket_name, file_name]
+    )
+    try:
+        journal_dir = get_cache_dir(UPLOAD_JOURNAL_DIR)
+    except OSError:
+        return None
+    return os.path.join(journal_dir, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json")
+
+
+def put_signed_url(url, headers, data):
+    """
+    Send data to a signed url of the storage provider
+
+    :param str url: the signed url
+    :param dict headers: the headers of the request
+    :param data: the data to send, bytes or a file-like object
+    :return requests.Response: the response
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.exceptions import ApiRequestError
+
+    response = get_storage_session().put(url=url, headers=headers, data=data)
+    if not 200 <= response.status_code <= 299:
+        raise ApiRequestError(requests_resp=response)
+    return response
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def upload_file_multipart(
+    client,
+    project_name,
+    bucket_name,
+    file_path,
+    file_name,
+    part_size=DEFAULT_PART_SIZE,
+    concurrency=1,
+    resume=False,
+    callback=None,
+):
+    """
+    Upload a file to a bucket in parts, which are uploaded in parallel. Every confirmed part is recorded in a journal
+    in the cache directory. With `resume`, an earlier upload of the same file that was interrupted is continued: the
+    parts in its journal whose content didn't change are not uploaded again.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_path: the path of the file to upload
+    :param str file_name: the name of the file in the bucket
+    :param int part_size: the size of the parts, increased if needed to stay within the limits of storage providers
+    :param int concurrency: the maximum number of parts to upload at the same time
+    :param bool resume: whether to continue an earlier upload of the file
+    :param callable|None callback: function that is called with the number of bytes uploaded, as the upload progresses
+    :return str: the UbiOps URI of the uploaded file
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.models import FileCompleteMultipartUpload
+
+    stat = os.stat(file_path)
+    upload = {"bucket_name": bucket_name, "file_name": file_name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    journal = TransferJournal(
+        get_upload_journal_path(
+            file_path=file_path, stat=stat, project_name=project_name, bucket_name=bucket_name, file_name=file_name
+        )
+    )
+    state = journal.load() if resume else None
+    if state is None or any(state.get(key) != value for key, value in upload.items()):
+        # Start a new upload when there's no earlier upload of this version of the file
+        part_size = max(part_size, MIN_PART_SIZE, math.ceil(stat.st_size / MAX_PARTS))
+        start = client.files_start_multipart_upload(project_name=project_name, bucket_name=bucket_name, file=file_name)
+        journal.start(**upload, part_size=part_size, upload_id=start.upload_id, provider=start.provider)
+        state = journal.data
+
+    part_size, upload_id = state["part_size"], state["upload_id"]
+    is_azure = state["provider"] == "azure_blob_storage"
+    parts = [
+        (part_number, (part_number - 1) * part_size, min(part_size, stat.st_size - (part_number - 1) * part_size))
+        for part_number in range(1, max(1, math.ceil(stat.st_size / part_size)) + 1)
+    ]
+
+    def is_confirmed(part):
+        part_number, offset, size = part
+        confirmed = state["parts"].get(str(part_number))
+        return (
+            confirmed is not None
+            and confirmed["size"] == size
+            and confirmed["sha256"] == hash_file_part(file_path=file_path, offset=offset, size=size)
+        )
+
+    def upload_part(part):
+        part_number, offset, size = part
+        if is_azure:
+            # Azure requires the IDs of all blocks of a file to have the same length
+            block_id = base64.b64encode(f"{file_name}_{part_number:05d}".encode()).decode()
+            signed_url = client.files_upload(
+                project_name=project_name, bucket_name=bucket_name, file=file_name, upload_id=block_id
+            )
+        else:
+            signed_url = client.files_upload(
+                project_name=project_name,
+                bucket_name=bucket_name,
+                file=file_name,
+                upload_id=upload_id,
+                part_number=str(part_number),
+            )
+
+        with FilePart(file_path=file_path, offset=offset, size=size, callback=callback) as data:
+            response = put_signed_url(
+                url=signed_url.url, headers=AZURE_UPLOAD_HEADERS if is_azure else UPLOAD_HEADERS, data=data
+            )
+            sha256 = data.sha256.hexdigest()
+
+        reference = {"BlockId": block_id} if is_azure else {"ETag": response.headers["ETag"], "PartNumber": part_number}
+        journal.add_part(part_number=part_number, size=size, sha256=sha256, part=reference)
+
+    # Verify the parts of an earlier upload, and upload the other parts
+    to_upload = []
+    for part, confirmed, error in run_parallel(is_confirmed, parts, concurrency):
+        if error is not None:
+            raise error
+        if confirmed:
+            if callback:
+                callback(part[2])
+        else:
+            to_upload.append(part)
+
+    errors = [error for _, _, error in run_parallel(upload_part, sorted(to_upload), concurrency) if error is not None]
+    if errors:
+        raise UbiOpsException(
+            f"Failed to upload {len(errors)} parts of {file_path}: {describe_error(errors[0])}. Use --resume to upload "
+            "the remaining parts."
+        )
+
+    client.files_complete_multipart_upload(
+        project_name=project_name,
+        bucket_name=bucket_name,
+        file=file_name,
+        data=FileCompleteMultipartUpload(
+            upload_id=upload_id, parts=[state["parts"][str(part_number)]["part"] for part_number, _, _ in parts]
+        ),
+    )
+    journal.remove()
+
+    return f"ubiops-file://{bucket_name}/{file_name}"
+
+
+# pylint: disable=too-many-arguments
+def upload_file(
+    client,
+    project_name,
+    bucket_name,
+    file_path,
+    file_name,
+    callback=None,
+    multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+    part_size=DEFAULT_PART_SIZE,
+    concurrency=1,
+    resume=False,
+):
+    """
+    Upload a file to a bucket via a signed url, reusing the connections of the current thread to the storage provider.
+    Files of at least the multipart threshold are uploaded in parts.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_path: the path of the file to upload
+    :param str file_name: the name of the file in the bucket
+    :param callable|None callback: function that is called with the number of bytes uploaded, as the upload progresses
+    :param int multipart_threshold: the minimum size of files to upload in parts
+    :param int part_size: the size of the parts
+    :param int concurrency: the maximum number of parts to upload at the same time
+    :param bool resume: whether to continue an earlier multipart upload of the file
+    :return str: the UbiOps URI of the uploaded file
+    """
+
+    file_size = os.path.getsize(file_path)
+
+    if file_size >= multipart_threshold:
+        return upload_file_multipart(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            file_path=file_path,
+            file_name=file_name,
+            part_size=part_size,
+            concurrency=concurrency,
+            resume=resume,
+            callback=callback,
+        )
+
+    signed_url = client.files_upload(project_name=project_name, bucket_name=bucket_name, file=file_name)
+    headers = AZURE_UPLOAD_HEADERS if signed_url.provider == "azure_blob_storage" else UPLOAD_HEADERS
+
+    with open(file_path, "rb") as f:
+        put_signed_url(
+            url=signed_url.url, headers=headers, data=CallbackIOWrapper(callback, f, "read") if callback else f
+        )
+
+    return f"ubiops-file://{bucket_name}/{file_name}"
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def upload_stream(
+    client, project_name, bucket_name, stream, file_name, part_size=DEFAULT_PART_SIZE, concurrency=1, callback=None
+):
+    """
+    Upload the data of a stream, like stdin, to a bucket without storing it on disk. The stream is read in parts of
+    the part size. When the data fits in a single part, it's uploaded in one request; otherwise, the parts are
+    uploaded in parallel as a multipart upload while the stream is read. At most `concurrency` parts are held in memory
+    at the same time.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param io.BufferedReader stream: the binary stream to read the data from
+    :param str file_name: the name of the file in the bucket
+    :param int part_size: the size of the parts
+    :param int concurrency: the maximum number of parts to upload at the same time
+    :param callable|None callback: function that is called with the number of bytes uploaded, as the upload progresses
+    :return str: the UbiOps URI of the uploaded file
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.models import FileCompleteMultipartUpload
+
+    def read_part():
+        # A read of a pipe may return less than requested, so read until the part is full or the stream ends
+        chunks, size = [], 0
+        while size < part_size:
+            chunk = stream.read(part_size - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks)
+
+    part_size = max(part_size, MIN_PART_SIZE)
+    first_part = read_part()
+
+    if len(first_part) < part_size:
+        signed_url = client.files_upload(project_name=project_name, bucket_name=bucket_name, file=file_name)
+        headers = AZURE_UPLOAD_HEADERS if signed_url.provider == "azure_blob_storage" else UPLOAD_HEADERS
+        put_signed_url(url=signed_url.url, headers=headers, data=first_part)
+        if callback:
+            callback(len(first_part))
+        return f"ubiops-file://{bucket_name}/{file_name}"
+
+    start = client.files_start_multipart_upload(project_name=project_name, bucket_name=bucket_name, file=file_name)
+    is_azure = start.provider == "azure_blob_storage"
+
+    # Released once a part is uploaded, such that the stream is only read when there's room for another part
+    slots = threading.Semaphore(concurrency)
+
+    def get_parts():
+        part_number, data = 1, first_part
+        while data:
+            if part_number > MAX_PARTS:
+                raise UbiOpsException(f"The stream exceeds {MAX_PARTS} parts, use a larger --part_size")
+            yield part_number, data
+            slots.acquire()  # pylint: disable=consider-using-with
+            part_number, data = part_number + 1, read_part()
+        slots.release()
+
+    def upload_part(part):
+        part_number, data = part
+        try:
+            if is_azure:
+                # Azure requires the IDs of all blocks of a file to have the same length
+                block_id = base64.b64encode(f"{file_name}_{part_number:05d}".encode()).decode()
+                signed_url = client.files_upload(
+                    project_name=project_name, bucket_name=bucket_name, file=file_name, upload_id=block_id
+                )
+            else:
+                signed_url = client.files_upload(
+                    project_name=project_name,
+                    bucket_name=bucket_name,
+                    file=file_name,
+                    upload_id=start.upload_id,
+                    part_number=str(part_number),
+                )
+            response = put_signed_url(
+                url=signed_url.url, headers=AZURE_UPLOAD_HEADERS if is_azure else UPLOAD_HEADERS, data=data
+            )
+        finally:
+            slots.release()
+
+        if callback:
+            callback(len(data))
+        return {"BlockId": block_id} if is_azure else {"ETag": response.headers["ETag"], "PartNumber": part_number}
+
+    slots.acquire()  # pylint: disable=consider-using-with
+    parts, errors = {}, []
+    for (part_number, _), reference, error in run_parallel(upload_part, get_parts(), concurrency):
+        if error is not None:
+            errors.append(error)
+        else:
+            parts[part_number] = reference
+
+    if errors:
+        raise UbiOpsException(f"Failed to upload {len(errors)} parts of {file_name}: {describe_error(errors[0])}")
+
+    client.files_complete_multipart_upload(
+        project_name=project_name,
+        bucket_name=bucket_name,
+        file=file_name,
+        data=FileCompleteMultipartUpload(upload_id=start.upload_id, parts=[parts[number] for number in sorted(parts)]),
+    )
+
+    return f"ubiops-file://{bucket_name}/{file_name}"
+
+
+# pylint: disable=too-many-arguments
+def upload_directory(
+    client,
+    project_name,
+    bucket_name,
+    directory,
+    prefix,
+    ignore_filename,
+    concurrency,
+    progress_bar,
+    multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+    part_size=DEFAULT_PART_SIZE,
+    resume=False,
+):
+    """
+    Upload all files in a directory and its subdirectories to a bucket, in parallel. The name of each file in the
+    bucket is its path relative to the directory, preceded by the prefix. Large files are uploaded in parts, one part
+    at a time per file.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str directory: the directory to upload
+    :param str|None prefix: the prefix of the file names in the bucket
+    :param str|None ignore_filename: the name of the ignore file in the root of the directory
+    :param int concurrency: the maximum number of files to upload at the same time
+    :param bool progress_bar: whether to show a progress bar
+    :param int multipart_threshold: the minimum size of files to upload in parts
+    :param int part_size: the size of the parts
+    :param bool resume: whether to continue earlier multipart uploads of the files
+    :return tuple[TransferProgress, list[tuple[str, str]]]: the progress of the upload, and the name and error of
+        each file that failed to upload
+    """
+
+    files = list_local_files(directory=directory, ignore_filename=ignore_filename)
+    total_bytes = sum(stat.st_size for _, _, stat in files)
+
+    def upload(file):
+        file_path, relative_path, _ = file
+        return upload_file(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            file_path=file_path,
+            file_name=f"{prefix or ''}{relative_path}",
+            callback=progress.update,
+            multipart_threshold=multipart_threshold,
+            part_size=part_size,
+            resume=resume,
+        )
+
+    failed = []
+    with TransferProgress(
+        total_bytes=total_bytes, total_files=len(files), description="Uploading", enabled=progress_bar
+    ) as progress:
+        for (_, relative_path, _), _, error in run_parallel(upload, files, concurrency):
+            if error is not None:
+                failed.append((f"{prefix or ''}{relative_path}", describe_error(error)))
+            progress.file_done(failed=error is not None)
+
+    return progress, failed
+
+
+# pylint: disable=too-many-arguments
+def download_file(client, project_name, bucket_name, file_name, output_path, callback=None):
+    """
+    Download a file from a bucket via a signed url, reusing the connections of the current thread to the storage
+    provider. The file is streamed to disk in blocks, and only moved to the output path once it's complete.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_name: the name of the file in the bucket
+    :param str output_path: the path to store the file at
+    :param callable|None callback: function that is called with the number of bytes downloaded, as the download
+        progresses
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.exceptions import ApiRequestError
+
+    signed_url = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_name)
+
+    with get_storage_session().get(url=signed_url.url, stream=True) as response:
+        if not 200 <= response.status_code <= 299:
+            raise ApiRequestError(requests_resp=response)
+
+        partial_path = f"{output_path}.part"
+        try:
+            with open(partial_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    if callback:
+                        callback(len(chunk))
+            os.replace(partial_path, output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+
+def get_expected_md5(headers):
+    """
+    Get the MD5 hash of a complete file from the headers of a response of the storage provider, if it's available.
+    Google Cloud Storage and Azure send it in a dedicated header. The ETag of Amazon S3 isn't used, as it's not the
+    MD5 hash for files that were uploaded in parts or are encrypted.
+
+    :param requests.structures.CaseInsensitiveDict headers: the response headers
+    :return str|None: the hexadecimal MD5 hash, None if not available
+    """
+
+    for item in headers.get("x-goog-hash", "").split(","):
+        algorithm, _, value = item.strip().partition("=")
+        if algorithm == "md5" and value:
+            return base64.b64decode(value).hex()
+
+    if headers.get("x-ms-blob-content-md5"):
+        return base64.b64decode(headers["x-ms-blob-content-md5"]).hex()
+
+    return None
+
+
+def copy_response(response, stream, file_name, callback=None):
+    """
+    Write the body of a response of the storage provider to a stream in blocks as it's received. Once written, the size
+    of the body is verified, and its MD5 hash if the storage provider sends it; as the data was already written, a
+    mismatch only results in an error.
+
+    :param requests.Response response: the streamed response
+    :param io.BufferedWriter stream: the binary stream to write the body to
+    :param str file_name: the name of the file in the bucket, to report a mismatch
+    :param callable|None callback: function that is called with the number of bytes received, as the download
+        progresses
+    """
+
+    expected_md5 = get_expected_md5(response.headers)
+    md5 = hashlib.md5() if expected_md5 else None
+    received = 0
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        stream.write(chunk)
+        received += len(chunk)
+        if md5 is not None:
+            md5.update(chunk)
+        if callback:
+            callback(len(chunk))
+    stream.flush()
+
+    expected_size = response.headers.get("Content-Length")
+    if expected_size is not None and received != int(expected_size):
+        raise UbiOpsException(f"Received {received} of {expected_size} bytes of {file_name}")
+    if md5 is not None and md5.hexdigest() != expected_md5:
+        raise UbiOpsException("MD5 hash of the downloaded file doesn't match the hash of the file in the bucket")
+
+
+def download_stream(client, project_name, bucket_name, file_name, stream, callback=None):
+    """
+    Download a file from a bucket to a stream, like stdout, without storing it on disk. The file is written to the
+    stream in blocks as it's received.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_name: the name of the file in the bucket
+    :param io.BufferedWriter stream: the binary stream to write the file to
+    :param callable|None callback: function that is called with the number of bytes downloaded, as the download
+        progresses
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.exceptions import ApiRequestError
+
+    signed_url = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_name)
+
+    with get_storage_session().get(url=signed_url.url, stream=True) as response:
+        if not 200 <= response.status_code <= 299:
+            raise ApiRequestError(requests_resp=response)
+        copy_response(response=response, stream=stream, file_name=file_name, callback=callback)
+
+
+def get_range_total_size(response):
+    """
+    Get the size of the complete file from the response of the storage provider to a range request
+
+    :param requests.Response response: the response
+    :return int|None: the size of the file, None if the response isn't a partial response or the size is unknown
+    """
+
+    if response.status_code != 206:
+        return None
+    total_size = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total_size) if total_size.isdigit() else None
+
+
+def plan_segments(size, segment_size):
+    """
+    Split a file into segments to download
+
+    :param int size: the size of the file
+    :param int segment_size: the size of the segments, the last segment may be smaller
+    :return list[tuple[int, int, int]]: the number, starting at 1, offset and size of every segment
+    """
+
+    return [
+        (number, (number - 1) * segment_size, min(segment_size, size - (number - 1) * segment_size))
+        for number in range(1, math.ceil(size / segment_size) + 1)
+    ]
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-statements,too-many-branches
+def download_file_segmented(
+    client,
+    project_name,
+    bucket_name,
+    file_name,
+    output_path,
+    segment_size=DEFAULT_SEGMENT_SIZE,
+    concurrency=1,
+    resume=False,
+    callback=None,
+    size_callback=None,
+    file=None,
+):
+    """
+    Download a file from a bucket. A file larger than one segment is downloaded in segments, which are downloaded in
+    parallel with HTTP range requests into a preallocated file. Every completed segment is recorded in a journal next
+    to the output file. With `resume`, an earlier download of the same version of the file that was interrupted is
+    continued. A file of at most one segment, or a file of a storage provider that doesn't support range requests, is
+    downloaded with a single request, without journal. Once downloaded, the size of the file is verified, and its MD5
+    hash if the storage provider sends it.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str file_name: the name of the file in the bucket
+    :param str output_path: the path to store the file at
+    :param int segment_size: the size of the segments
+    :param int concurrency: the maximum number of segments to download at the same time
+    :param bool resume: whether to continue an earlier download of the file
+    :param callable|None callback: function that is called with the number of bytes downloaded, as the download
+        progresses
+    :param callable|None size_callback: function that is called with the size of the file, before the download starts
+    :param ubiops.FileItem|None file: the details of the file, when they were already requested
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.exceptions import ApiRequestError
+
+    def get_details(item):
+        return {
+            "bucket_name": bucket_name,
+            "file_name": file_name,
+            "size": item.size,
+            "time_created": str(item.time_created),
+        }
+
+    partial_path = f"{output_path}.part"
+    journal = TransferJournal(f"{output_path}{DOWNLOAD_JOURNAL_SUFFIX}")
+    state = None
+    if resume and journal.load() is not None:
+        if file is None:
+            file = client.files_get(project_name=project_name, bucket_name=bucket_name, file=file_name)
+        state = journal.data
+        if any(state.get(key) != value for key, value in get_details(file).items()) or not os.path.isfile(partial_path):
+            state = None
+
+    signed_url = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_name)
+    session = get_storage_session()
+
+    first_response = None
+    if state is None:
+        # Without an earlier download to continue, start by requesting the first segment. A file of at most one segment
+        # is then received completely, just like any file when the storage provider ignores the range.
+        first_response = session.get(url=signed_url.url, headers={"Range": f"bytes=0-{segment_size - 1}"}, stream=True)
+        if first_response.status_code == 416:
+            # Empty files have no range to request
+            first_response.close()
+            first_response = session.get(url=signed_url.url, stream=True)
+        if not 200 <= first_response.status_code <= 299:
+            first_response.close()
+            raise ApiRequestError(requests_resp=first_response)
+
+        # A partial response without the size of the file is continued in segments, with the size from the API
+        total_size = get_range_total_size(first_response)
+        if first_response.status_code != 206 or (total_size is not None and total_size <= segment_size):
+            with first_response:
+                size = first_response.headers.get("Content-Length") if total_size is None else total_size
+                if size_callback and size is not None:
+                    size_callback(int(size))
+                try:
+                    with open(partial_path, "wb") as f:
+                        copy_response(response=first_response, stream=f, file_name=file_name, callback=callback)
+                    os.replace(partial_path, output_path)
+                finally:
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+            return
+
+        if file is None:
+            file = client.files_get(project_name=project_name, bucket_name=bucket_name, file=file_name)
+
+        # Preallocate the file. Truncating creates a sparse file on file systems that support it.
+        with open(partial_path, "wb") as f:
+            f.truncate(file.size)
+        journal.start(**get_details(file), segment_size=segment_size, md5=None)
+        state = journal.data
+
+    if size_callback:
+        size_callback(file.size)
+    segments = plan_segments(size=file.size, segment_size=state["segment_size"])
+
+    def write_segment(segment, response):
+        number, offset, size = segment
+
+        received = 0
+        with open(partial_path, "r+b") as f:
+            f.seek(offset)
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                received += len(chunk)
+                if callback:
+                    callback(len(chunk))
+
+        if received != size:
+            raise UbiOpsException(f"Received {received} of {size} bytes")
+
+        journal.add_part(number, size=size)
+        return response.headers
+
+    def download_segment(segment):
+        _, offset, size = segment
+
+        headers = {"Range": f"bytes={offset}-{offset + size - 1}"}
+        with session.get(url=signed_url.url, headers=headers, stream=True) as response:
+            if not 200 <= response.status_code <= 299:
+                raise ApiRequestError(requests_resp=response)
+            if response.status_code != 206:
+                raise UbiOpsException("The storage provider doesn't support downloading files in segments")
+            return write_segment(segment, response)
+
+    pending = []
+    for segment in segments:
+        if str(segment[0]) in state["parts"]:
+            if callback:
+                callback(segment[2])
+        else:
+            pending.append(segment)
+
+    # The first segment is downloaded before the others, to learn the hash of the file
+    if pending and pending[0][0] == 1:
+        if first_response is not None:
+            with first_response:
+                headers = write_segment(pending.pop(0), first_response)
+        else:
+            headers = download_segment(pending.pop(0))
+        journal.update(md5=get_expected_md5(headers))
+
+    errors = [error for _, _, error in run_parallel(download_segment, pending, concurrency) if error is not None]
+    if errors:
+        raise UbiOpsException(
+            f"Failed to download {len(errors)} segments of {file_name}: {describe_error(errors[0])}. Use --resume to "
+            "download the remaining segments."
+        )
+
+    # Verify the downloaded file
+    error = None
+    if os.path.getsize(partial_path) != file.size:
+        error = f"Downloaded file has size {os.path.getsize(partial_path)}, expected {file.size}"
+    elif state.get("md5"):
+        md5 = hashlib.md5()
+        with open(partial_path, "rb") as f:
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                md5.update(block)
+        if md5.hexdigest() != state["md5"]:
+            error = "MD5 hash of the downloaded file doesn't match the hash of the file in the bucket"
+
+    journal.remove()
+    if error is not None:
+        os.remove(partial_path)
+        raise UbiOpsException(error)
+
+    os.replace(partial_path, output_path)
+
+
+def read_manifest(manifest, bucket_name):
+    """
+    Read the files listed in a manifest: a file name or UbiOps URI like 'ubiops-file://my-bucket/my-file.jpg' per line.
+    Empty lines and lines starting with '#' are skipped.
+
+    :param iterable[str] manifest: the lines of the manifest
+    :param str bucket_name: the bucket of the file names that aren't given as URI
+    :return list[tuple[str, str]]: per file, the bucket name and file name
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops.utils.file_operations import UbiOpsFile
+
+    files = []
+    for line_number, line in enumerate(manifest, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith("ubiops-file://"):
+            try:
+                ubiops_file = UbiOpsFile.from_uri(file_uri=line)
+            except ValueError as e:
+                raise UbiOpsException(f"Invalid file URI on line {line_number}: {e}")
+            files.append((ubiops_file.bucket, ubiops_file.file))
+        else:
+            files.append((bucket_name, line))
+    return files
+
+
+class SignedUrl:
+    """
+    Signed url of a file in a bucket, with the attributes of a model of the client library such that it can be
+    formatted like one
+    """
+
+    def __init__(self, bucket, file, url, provider, expiry):
+        """
+        :param str bucket: the name of the bucket
+        :param str file: the name of the file
+        :param str url: the signed url
+        :param str provider: the storage provider of the bucket
+        :param str|None expiry: the time the url expires, in ISO format, if it can be derived from the url
+        """
+
+        self._bucket = bucket
+        self._file = file
+        self._url = url
+        self._provider = provider
+        self._expiry = expiry
+
+    bucket = property(lambda self: self._bucket)
+    file = property(lambda self: self._file)
+    url = property(lambda self: self._url)
+    provider = property(lambda self: self._provider)
+    expiry = property(lambda self: self._expiry)
+
+
+def get_signed_url_expiry(url):
+    """
+    Get the time a signed url expires from its query parameters. Signed urls of Amazon S3 and Google Cloud Storage
+    contain the time they were signed and the number of seconds they're valid, or the expiry time as POSIX timestamp.
+    Signed urls of Azure contain the expiry time in ISO format.
+
+    :param str url: the signed url
+    :return str|None: the expiry time in ISO format, None if it's not in the url
+    """
+
+    query = {key.lower(): value for key, value in urllib.parse.parse_qsl(urllib.parse.urlsplit(url).query)}
+    try:
+        for provider in ["amz", "goog"]:
+            if f"x-{provider}-date" in query and f"x-{provider}-expires" in query:
+                signed = datetime.datetime.strptime(query[f"x-{provider}-date"], "%Y%m%dT%H%M%SZ")
+                expiry = signed + datetime.timedelta(seconds=int(query[f"x-{provider}-expires"]))
+                return expiry.replace(tzinfo=datetime.timezone.utc).isoformat()
+        if "expires" in query:
+            return datetime.datetime.fromtimestamp(int(query["expires"]), tz=datetime.timezone.utc).isoformat()
+        if "se" in query:
+            return query["se"]
+    except (ValueError, OverflowError):
+        pass
+    return None
+
+
+def create_signed_urls(client, project_name, files, upload, concurrency):
+    """
+    Generate signed urls for files in parallel
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param iterable[tuple[str, str]] files: per file, the bucket name and file name
+    :param bool upload: whether to generate urls to upload the files, or to download them
+    :param int concurrency: the maximum number of urls to generate at the same time
+    :return generator[tuple[str, SignedUrl|None, Exception|None]]: per file, in the order the urls were generated, the
+        URI of the file, and its signed url or the error that occurred
+    """
+
+    def create(file):
+        bucket_name, file_name = file
+        if upload:
+            response = client.files_upload(project_name=project_name, bucket_name=bucket_name, file=file_name, data={})
+        else:
+            response = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_name)
+        return SignedUrl(
+            bucket=bucket_name,
+            file=file_name,
+            url=response.url,
+            provider=response.provider,
+            expiry=get_signed_url_expiry(response.url),
+        )
+
+    for (bucket_name, file_name), signed_url, error in run_parallel(create, files, concurrency):
+        yield f"ubiops-file://{bucket_name}/{file_name}", signed_url, error
+
+
+# pylint: disable=too-many-arguments
+def print_signed_urls(client, project_name, bucket_name, file_names, prefix, manifest, upload, concurrency, format_):
+    """
+    Generate signed urls for one or more files, and print them. A single file is printed as an item, multiple files as
+    a manifest that is printed while the urls are generated.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param tuple[str] file_names: the names of the files
+    :param str|None prefix: the prefix of the files
+    :param io.TextIOWrapper|None manifest: file that lists the files
+    :param bool upload: whether to generate urls to upload the files, or to download them
+    :param int concurrency: the maximum number of urls to generate at the same time
+    :param str|None format_: the output format
+    """
+
+    assert (
+        sum([bool(file_names), prefix is not None, manifest is not None]) == 1
+    ), "Please, specify either file names, the prefix or --from_file"
+
+    if len(file_names) == 1 and format_ in [None, "row", "yaml", "json"]:
+        if upload:
+            file_url = client.files_upload(
+                project_name=project_name, bucket_name=bucket_name, file=file_names[0], data={}
+            )
+        else:
+            file_url = client.files_download(project_name=project_name, bucket_name=bucket_name, file=file_names[0])
+        print_item(file_url, row_attrs=["url", "provider"], fmt=format_ or "yaml")
+        return
+
+    format_ = format_ or "csv"
+    assert format_ in ["json", "ndjson", "csv"], "Signed urls of multiple files can be formatted as csv, ndjson or json"
+
+    if prefix is not None:
+        files = (
+            (bucket_name, file.file)
+            for file in iter_files(client=client, project_name=project_name, bucket_name=bucket_name, prefix=prefix)
+            if not file.file.endswith("/")
+        )
+    elif manifest is not None:
+        files = read_manifest(manifest=manifest, bucket_name=bucket_name)
+    else:
+        files = [(bucket_name, file_name) for file_name in file_names]
+
+    failed, total = [], 0
+
+    def get_signed_urls():
+        nonlocal total
+        for uri, signed_url, error in create_signed_urls(
+            client=client, project_name=project_name, files=files, upload=upload, concurrency=concurrency
+        ):
+            total += 1
+            if error is not None:
+                failed.append((uri, describe_error(error)))
+            else:
+                yield signed_url
+
+    print_stream(items=get_signed_urls(), attrs=SIGNED_URL_ITEMS, fmt=format_)
+    check_failed_transfers(failed=failed, action="generate signed urls for", total=total)
+
+
+# pylint: disable=too-many-arguments
+def delete_files(client, project_name, files, concurrency, rate_limit=None, progress_bar=True):
+    """
+    Delete files from buckets in parallel. Deletes that failed because of a temporary error or rate limiting are
+    retried by the client.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param list[tuple[str, str]] files: per file, the bucket name and file name
+    :param int concurrency: the maximum number of files to delete at the same time
+    :param float|None rate_limit: the maximum number of files to delete per second, None for no limit
+    :param bool progress_bar: whether to show a progress bar
+    :return list[tuple[str, str]]: the URI and error of each file that failed to delete
+    """
+
+    limiter = RateLimiter(rate=rate_limit) if rate_limit else None
+
+    def delete(file):
+        if limiter is not None:
+            limiter.acquire()
+        client.files_delete(project_name=project_name, bucket_name=file[0], file=file[1])
+
+    failed = []
+    with tqdm.tqdm(total=len(files), unit="files", desc="Deleting", disable=not progress_bar) as bar:
+        for (bucket_name, file_name), _, error in run_parallel(delete, files, concurrency):
+            if error is not None:
+                failed.append((f"ubiops-file://{bucket_name}/{file_name}", describe_error(error)))
+                bar.set_postfix_str(f"{len(failed)} failed", refresh=False)
+            bar.update()
+
+    return failed
+
+
+# pylint: disable=too-many-arguments
+def download_directory(
+    client, project_name, bucket_name, prefix, output_path, include, exclude, concurrency, progress_bar, cache=None
+):
+    """
+    Download all files with a prefix from a bucket into a directory, in parallel. The files are stored at their path
+    relative to the last '/' of the prefix, e.g., with prefix 'outputs/2024' the file 'outputs/2024-01/result.csv' is
+    stored at '2024-01/result.csv'. The file list is requested page by page while downloading, and each download
+    holds at most one block in memory. With a cache, files that are cached are taken from the cache instead of being
+    downloaded, and downloaded files are added to it.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str bucket_name: the name of the bucket
+    :param str prefix: the prefix of the files to download
+    :param str output_path: the directory to store the files in
+    :param list[str]|None include: glob patterns of the relative paths of the files to download
+    :param list[str]|None exclude: glob patterns of the relative paths of the files to skip
+    :param int concurrency: the maximum number of files to download at the same time
+    :param bool progress_bar: whether to show a progress bar
+    :param DownloadCache|None cache: the cache of downloaded files to use
+    :return tuple[TransferProgress, list[tuple[str, str]]]: the progress of the download, and the name and error of
+        each file that failed to download
+    """
+
+    output_path = os.path.abspath(output_path)
+    base = prefix[: prefix.rfind("/") + 1]
+
+    def get_files():
+        for file in iter_files(client=client, project_name=project_name, bucket_name=bucket_name, prefix=prefix):
+            relative_path = file.file[len(base) :]
+            if relative_path and not relative_path.endswith("/") and matches_patterns(relative_path, include, exclude):
+                yield file, relative_path
+
+    def download(item):
+        file, relative_path = item
+        file_path = os.path.normpath(os.path.join(output_path, *relative_path.split("/")))
+        if os.path.commonpath([output_path, file_path]) != output_path:
+            raise UbiOpsException("File name points outside of the output directory")
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        key = None
+        if cache is not None:
+            key = cache.get_key(client.api_client.configuration.host, project_name, bucket_name, file)
+            if cache.fetch(key, file_path):
+                return
+
+        download_file(
+            client=client,
+            project_name=project_name,
+            bucket_name=bucket_name,
+            file_name=file.file,
+            output_path=file_path,
+            callback=progress.update,
+        )
+        if cache is not None:
+            cache.store(key, file_path)
+
+    failed = []
+    with TransferProgress(
+        total_bytes=None, total_files=None, description="Downloading", enabled=progress_bar
+    ) as progress:
+        for (file, _), _, error in run_parallel(download, get_files(), concurrency):
+            if error is not None:
+                failed.append((file.file, describe_error(error)))
+            progress.file_done(failed=error is not None)
+
+    return progress, failed
@@ -1,4 +1,6 @@
+import csv
 import json
+import sys
 
 from datetime import datetime, date, timezone
 
@@ -383,6 +385,35 @@ def print_list(
             click.echo(tabulate(table, headers=header))
 
 
+def print_stream(items, attrs, fmt="ndjson"):
+    """
+    Print ubiops models one by one as they are produced, such that the items don't need to be in memory at once
+
+    :param iterable[object] items: the items to print
+    :param list[str] attrs: the attributes to print for each ubiops model, used for the columns of csv
+    :param str fmt: how the items should be formatted; 'ndjson' for a JSON object per line, 'csv' for a header and
+        a row per item, or 'json' for a JSON array
+    """
+
+    if fmt == "csv":
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(attrs)
+        for item in items:
+            item = format_datetime_attrs(item, prettify=False)
+            writer.writerow([getattr(item, attr) for attr in attrs])
+
+    elif fmt == "json":
+        separator = "["
+        for item in items:
+            click.echo(f"{separator}{format_json(item)}", nl=False)
+            separator = ", "
+        click.echo("[]" if separator == "[" else "]")
+
+    else:  # fmt == 'ndjson'
+        for item in items:
+            click.echo(format_json(item))
+
+
 def print_projects_list(projects, current, attrs, fmt="simple"):
     """
     Print the projects returned from the client library
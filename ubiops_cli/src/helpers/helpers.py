@@ -1,6 +1,8 @@
 import json
+import os
 
-from ubiops_cli.utils import set_dict_default
+from ubiops_cli.package_state import PackageState
+from ubiops_cli.utils import Config, get_cache_dir, set_dict_default
 
 
 def define_object(fields, yaml_content, field_names, rename_field_names, field_types):
@@ -120,3 +122,49 @@ def json_to_dict(input_string, file_fields):
                 except FileNotFoundError as e:
                     raise FileNotFoundError(f"Failed to read file for '{file_field}': {e}")
     return return_dict
+
+
+def get_package_state():
+    """
+    Get the record of uploaded packages in the cache directory of the CLI, and the API host its uploads belong to
+    """
+
+    host = (Config().get("auth.api") or Config.DEFAULT_API).rstrip("/")
+    return PackageState(os.path.join(get_cache_dir(), "packages.sqlite")), host
+
+
+def is_package_uploaded(project_name, target, latest_revision, content_hash):
+    """
+    Whether a package with the same content hash was uploaded from this machine as the latest revision of a deployment
+    version or environment. That's not the case anymore once a revision was created in any other way.
+
+    :param str project_name: the name of the project
+    :param str target: the deployment version or environment, like 'deployments/<name>/versions/<version>'
+    :param str|None latest_revision: the ID of the latest revision of the deployment version or environment
+    :param str|None content_hash: the content hash of the package
+    """
+
+    if latest_revision is None or content_hash is None:
+        return False
+
+    state, host = get_package_state()
+    return state.get_upload(host=host, project_name=project_name, target=target) == (latest_revision, content_hash)
+
+
+def store_package_upload(project_name, target, revision, content_hash):
+    """
+    Store the revision that was created by uploading a package, together with the content hash of the package
+
+    :param str project_name: the name of the project
+    :param str target: the deployment version or environment, like 'deployments/<name>/versions/<version>'
+    :param str|None revision: the ID of the created revision
+    :param str|None content_hash: the content hash of the package
+    """
+
+    if revision is None or content_hash is None:
+        return
+
+    state, host = get_package_state()
+    state.store_upload(
+        host=host, project_name=project_name, target=target, revision=revision, content_hash=content_hash
+    )
@@ -2,8 +2,8 @@ import sys
 
 import click
 from ubiops_cli.utils import Config
-from ubiops_cli.constants import SYS_DEPLOYMENT_FILE_NAME_VALUE
-from ubiops_cli.src.helpers.pipeline_helpers import PIPELINE_REQUIRED_FIELDS
+from ubiops_cli.constants import SYS_DEPLOYMENT_FILE_NAME_VALUE, PIPELINE_REQUIRED_FIELDS
+from ubiops_cli.src.helpers.click_helpers import ByteSize, PointInTime
 from ubiops_cli.src.helpers.instance_type_group_helpers import INSTANCE_TYPE_GROUP_REQUIRED_FIELDS
 
 
@@ -35,6 +35,13 @@ QUIET = click.option(
 OVERWRITE = click.option(
     "--overwrite", required=False, default=False, is_flag=True, help="Whether you want to overwrite if exists"
 )
+PACKAGE_FORCE = click.option(
+    "--force",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="Upload the package even if it didn't change since it was uploaded as the latest revision",
+)
 OFFSET = click.option(
     "--offset",
     required=False,
@@ -112,7 +119,7 @@ TOKEN = click.option("--token", "method", flag_value="token", help="Sign in with
 API_HOST = click.option(
     "--api",
     "host",
-    default=Config().DEFAULT_API,
+    default=Config.DEFAULT_API,
     show_default=True,
     metavar="<endpoint>",
     type=click.STRING,
@@ -442,6 +449,14 @@ IGNORE_FILE = click.option(
     metavar="<filename>",
     help="File name of ubiops-ignore file located in the root of the specified directory [default = .ubiops-ignore]",
 )
+PACKAGE_JOBS = click.option(
+    "--jobs",
+    required=False,
+    default=None,
+    type=click.IntRange(min=1),
+    metavar="<int>",
+    help="The maximum number of parts of files to compress at the same time [default = number of CPUs]",
+)
 DEPLOYMENT_FILE = click.option(
     "-deployment_py",
     "--deployment_file",
@@ -665,6 +680,50 @@ BUCKET_TTL = click.option(
     metavar="<seconds>",
     help="The time to live of the file in seconds (default = None)",
 )
+BUCKET_INDEX_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default="",
+    metavar="<prefix>",
+    help="Only refresh the files whose name starts with this prefix",
+)
+BUCKET_INDEX_CONCURRENCY = click.option(
+    "--concurrency",
+    required=False,
+    default=8,
+    type=click.IntRange(1, 64),
+    metavar="[1-64]",
+    show_default=True,
+    help="The maximum number of directories to list at the same time",
+)
+BUCKET_QUERY_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default="",
+    metavar="<prefix>",
+    help="Only include the files whose name starts with this prefix",
+)
+BUCKET_DU_DEPTH = click.option(
+    "--depth",
+    required=False,
+    default=1,
+    type=click.IntRange(0, None),
+    show_default=True,
+    metavar="<levels>",
+    help="The number of levels of subdirectories to show",
+)
+BUCKET_NEWEST_LIMIT = click.option(
+    "-n",
+    "--limit",
+    required=False,
+    default=10,
+    type=click.IntRange(1, None),
+    show_default=True,
+    metavar="<number>",
+    help="The number of files to show",
+)
 
 # Files
 FILE_PREFIX = click.option(
@@ -695,8 +754,110 @@ FILE_CONTINUATION_TOKEN = click.option(
     metavar="<token>",
     help="A token that indicates the start point of the returned the files",
 )
+FILE_DELETE_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default=None,
+    metavar="<prefix>",
+    help="Delete all files whose name starts with this prefix",
+)
+FILE_DELETE_MANIFEST = click.option(
+    "--from_file",
+    "manifest",
+    required=False,
+    default=None,
+    type=click.File("r"),
+    metavar="<path>",
+    help="Delete the files listed in this file, one file name or URI like 'ubiops-file://my-bucket/my-file.jpg' "
+    "per line. Use '-' to read the list from stdin",
+)
+FILE_DELETE_RATE_LIMIT = click.option(
+    "--rate_limit",
+    required=False,
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+    metavar="<number>",
+    help="The maximum number of files to delete per second",
+)
+FILE_LIST_ALL = click.option(
+    "--all",
+    "all_",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="List all files, following the continuation tokens of the pages of the file list",
+)
+FILE_GLOB = click.option(
+    "--glob",
+    required=False,
+    default=None,
+    metavar="<pattern>",
+    help="Only list the files whose name matches this glob pattern, e.g. 'outputs/*.json'",
+)
+FILE_MIN_SIZE = click.option(
+    "--min_size",
+    required=False,
+    default=None,
+    type=ByteSize(),
+    metavar="<size>",
+    help="Only list the files of at least this size, e.g. '10MB'",
+)
+FILE_NEWER_THAN = click.option(
+    "--newer_than",
+    required=False,
+    default=None,
+    type=PointInTime(),
+    metavar="<datetime>",
+    help="Only list the files created after this date, e.g. '2024-01-31', or within this age, e.g. '7d' or '12h'",
+)
+FILE_LIST_FORMATS = click.option(
+    "-fmt",
+    "--format",
+    "format_",
+    default="table",
+    help="The output format",
+    type=click.Choice(["table", "json", "ndjson", "csv"], case_sensitive=False),
+    show_default=True,
+)
 
 FILE_NAME_ARGUMENT = click.argument("file_name", required=True, metavar="<file_name>", nargs=1)
+FILE_NAMES_ARGUMENT = click.argument("file_names", required=False, metavar="[<file_name>...]", nargs=-1)
+FILE_SIGNED_URL_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default=None,
+    metavar="<prefix>",
+    help="Generate signed urls for all files whose name starts with this prefix",
+)
+FILE_SIGNED_URL_MANIFEST = click.option(
+    "--from_file",
+    "manifest",
+    required=False,
+    default=None,
+    type=click.File("r"),
+    metavar="<path>",
+    help="Generate signed urls for the files listed in this file, one file name or URI like "
+    "'ubiops-file://my-bucket/my-file.jpg' per line. Use '-' to read the list from stdin",
+)
+FILE_SIGNED_URL_CONCURRENCY = click.option(
+    "--concurrency",
+    required=False,
+    default=8,
+    type=click.IntRange(1, 64),
+    metavar="[1-64]",
+    show_default=True,
+    help="The maximum number of signed urls to generate at the same time",
+)
+FILE_SIGNED_URL_FORMATS = click.option(
+    "-fmt",
+    "--format",
+    "format_",
+    default=None,
+    help="The output format. Defaults to 'yaml' for a single file, and 'csv' for multiple files",
+    type=click.Choice(["row", "yaml", "json", "ndjson", "csv"], case_sensitive=False),
+)
 FILE_NAME_OVERRULE = click.argument("file_name", required=False, default=None, metavar="<file_name>", nargs=1)
 FILE_URI_OPTION = click.option(
     "-u",
@@ -710,10 +871,131 @@ FILE_SOURCE_PATH_OPTION = click.option(
     "-f",
     "--source_file",
     "source_file",
-    required=True,
+    required=False,
+    default=None,
     type=click.Path(),
     metavar="<path>",
-    help="Path of file to upload",
+    help="Path of file to upload. Use '-' to read the file from stdin",
+)
+FILE_SOURCE_DIRECTORY_OPTION = click.option(
+    "-r",
+    "--recursive",
+    "source_directory",
+    required=False,
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    metavar="<directory>",
+    help="Path of a directory to upload, including all its subdirectories",
+)
+FILE_UPLOAD_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default=None,
+    metavar="<prefix>",
+    help="Prefix of the names of the uploaded files in the bucket, e.g. 'images/'",
+)
+FILE_MULTIPART_THRESHOLD = click.option(
+    "--multipart_threshold",
+    required=False,
+    default="100MB",
+    type=ByteSize(),
+    metavar="<size>",
+    show_default=True,
+    help="Files of at least this size are uploaded in parts, e.g. '1GB'",
+)
+FILE_PART_SIZE = click.option(
+    "--part_size",
+    required=False,
+    default="64MB",
+    type=ByteSize(),
+    metavar="<size>",
+    show_default=True,
+    help="The size of the parts of files that are uploaded in parts",
+)
+FILE_UPLOAD_RESUME = click.option(
+    "--resume",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="Continue an interrupted upload of a file that is uploaded in parts",
+)
+FILE_SEGMENT_SIZE = click.option(
+    "--segment_size",
+    required=False,
+    default="64MB",
+    type=ByteSize(),
+    metavar="<size>",
+    show_default=True,
+    help="The size of the segments in which a file is downloaded in parallel",
+)
+FILE_DOWNLOAD_RESUME = click.option(
+    "--resume",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="Continue an interrupted download of a file",
+)
+FILE_DOWNLOAD_CACHE = click.option(
+    "--cache",
+    "use_cache",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="Take files from the local download cache when they didn't change, and add downloaded files to it",
+)
+FILE_CACHE_MAX_SIZE = click.option(
+    "--max_size",
+    required=False,
+    default=None,
+    type=ByteSize(),
+    metavar="<size>",
+    help="Remove the least recently used files until the cache is at most this size, e.g. '5GB'. Defaults to the "
+    "configured maximum size of the cache",
+)
+FILE_CACHE_PRUNE_ALL = click.option(
+    "--all", "all_", required=False, default=False, is_flag=True, help="Remove all files from the cache"
+)
+FILE_DOWNLOAD_PREFIX = click.option(
+    "-p",
+    "--prefix",
+    required=False,
+    default=None,
+    metavar="<prefix>",
+    help="Download all files whose name starts with this prefix, e.g. 'outputs/'",
+)
+FILE_INCLUDE = click.option(
+    "--include",
+    required=False,
+    multiple=True,
+    metavar="<pattern>",
+    help="Only download the files whose path relative to the prefix matches this glob pattern, e.g. '*.csv'. "
+    "Can be given multiple times",
+)
+FILE_EXCLUDE = click.option(
+    "--exclude",
+    required=False,
+    multiple=True,
+    metavar="<pattern>",
+    help="Skip the files whose path relative to the prefix matches this glob pattern. Can be given multiple times",
+)
+FILE_SYNC_SOURCE = click.argument("source", required=True, metavar="<source>", nargs=1)
+FILE_SYNC_DESTINATION = click.argument("destination", required=True, metavar="<destination>", nargs=1)
+FILE_SYNC_DELETE = click.option(
+    "--delete",
+    required=False,
+    default=False,
+    is_flag=True,
+    help="Delete the files in the destination that don't exist in the source",
+)
+FILE_CONCURRENCY = click.option(
+    "--concurrency",
+    required=False,
+    default=8,
+    type=click.IntRange(1, 64),
+    metavar="[1-64]",
+    show_default=True,
+    help="The maximum number of files, or parts of a file, to transfer at the same time",
 )
 FILE_DESTINATION_PATH_OPTION = click.option(
     "-o",
@@ -723,7 +1005,7 @@ FILE_DESTINATION_PATH_OPTION = click.option(
     type=click.Path(),
     default=None,
     metavar="<path>",
-    help="Path to file or directory to store downloaded file",
+    help="Path to file or directory to store downloaded file. Use '-' to write the file to stdout",
 )
 
 # Pipelines
@@ -1318,3 +1600,31 @@ INSTANCE_ID_ARGUMENT = click.argument("instance_id", required=True, metavar="<in
 SHELL = click.argument(
     "shell", nargs=1, required=True, type=click.Choice(["bash", "zsh", "fish"], case_sensitive=False)
 )
+
+# Batch
+BATCH_COMMANDS_FILE = click.option(
+    "-f",
+    "--commands_file",
+    required=True,
+    type=click.File("r"),
+    metavar="<path>",
+    help="Path to a file with one CLI command per line, or '-' to read the commands from stdin",
+)
+BATCH_CONCURRENCY = click.option(
+    "-c",
+    "--concurrency",
+    required=False,
+    default=4,
+    type=click.IntRange(1, 64),
+    metavar="[1-64]",
+    show_default=True,
+    help="The maximum number of commands to run at the same time",
+)
+BATCH_REPORT_OUTPUT = click.option(
+    "-o",
+    "--output_path",
+    required=False,
+    default=None,
+    metavar="<path>",
+    help="Path to a file to write the NDJSON report to, the report is written to stdout by default",
+)
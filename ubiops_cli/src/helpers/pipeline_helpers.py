@@ -1,9 +1,9 @@
 import ubiops as api
 
+from ubiops_cli.constants import PIPELINE_REQUIRED_FIELDS  # pylint: disable=unused-import
 from ubiops_cli.utils import set_dict_default, set_object_default
 from ubiops_cli.src.helpers.helpers import strings_to_dict
 
-PIPELINE_REQUIRED_FIELDS = ["input_type"]
 PIPELINE_FIELDS = ["description", "labels", "input_type", "input_fields", "output_type", "output_fields"]
 PIPELINE_FIELDS_RENAMED = {"description": "pipeline_description", "labels": "pipeline_labels"}
 
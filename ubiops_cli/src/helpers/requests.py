@@ -1,11 +1,13 @@
 import json
+import time
 import requests
 
 import ubiops as api
 
+from ubiops_cli import tracing
 from ubiops_cli.exceptions import UbiOpsException
 from ubiops_cli.version import VERSION
-from ubiops_cli.utils import Config
+from ubiops_cli.utils import Config, cache_auth, invalidate_auth_cache
 
 
 def do_call(method, host, path, data=None, headers=None):
@@ -27,12 +29,31 @@ def do_call(method, host, path, data=None, headers=None):
     else:
         headers = {**default_headers, **headers}
 
-    if method == "post":
-        response = requests.post(url, data=json.dumps(data), headers=headers, timeout=10)
-    elif method == "get":
-        response = requests.get(url, headers=headers, timeout=10)
-    else:
-        raise NotImplementedError(f"Unknown request method {str(method)}")
+    start = time.perf_counter()
+    try:
+        if method == "post":
+            response = requests.post(url, data=json.dumps(data), headers=headers, timeout=10)
+        elif method == "get":
+            response = requests.get(url, headers=headers, timeout=10)
+        else:
+            raise NotImplementedError(f"Unknown request method {str(method)}")
+    except requests.exceptions.RequestException as e:
+        tracer = tracing.get_tracer()
+        if tracer is not None:
+            tracer.record(method=method.upper(), path=path, start=start, error=f"{type(e).__name__}: {e}")
+        raise
+
+    tracer = tracing.get_tracer()
+    if tracer is not None:
+        tracer.record(
+            method=method.upper(),
+            path=path,
+            start=start,
+            status=response.status_code,
+            ttfb=response.elapsed.total_seconds(),
+            bytes_out=len(response.request.body or ""),
+            bytes_in=len(response.content),
+        )
 
     try:
         response = json.loads(response.text)
@@ -171,6 +192,7 @@ def raise_for_status(host, token):
     user_config.set(key="auth.service_token", value=token)
     user_config.delete_option(key="auth.tmp_access_token")
     user_config.write()
+    cache_auth(host=host, token=token)
 
 
 def user(host, token):
@@ -201,3 +223,4 @@ def sign_out():
     user_config.delete_option("auth.tmp_access_token")
     user_config.delete_option("auth.service_token")
     user_config.write()
+    invalidate_auth_cache()
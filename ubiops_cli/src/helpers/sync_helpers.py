@@ -0,0 +1,267 @@
+import hashlib
+import os
+
+from ubiops_cli.exceptions import UbiOpsException
+from ubiops_cli.file_index import FileIndex, hash_file
+from ubiops_cli.utils import get_cache_dir
+from ubiops_cli.src.helpers.file_helpers import (
+    TransferProgress,
+    describe_error,
+    download_file,
+    get_ignore_matcher,
+    iter_files,
+    list_local_files,
+    run_parallel,
+    upload_file,
+)
+
+FILE_URI_PREFIX = "ubiops-file://"
+
+# Number of transferred files after which their state is written to the index
+INDEX_BATCH_SIZE = 500
+
+
+def parse_sync_location(location):
+    """
+    Parse a location to synchronize, either a local directory or a bucket prefix like 'ubiops-file://bucket/prefix'
+
+    :param str location: the location
+    :return tuple[str, str]|None: the bucket name and prefix, or None if the location is a local directory. A
+        non-empty prefix always ends with a '/'.
+    """
+
+    if not location.startswith(FILE_URI_PREFIX):
+        return None
+
+    bucket_name, _, prefix = location[len(FILE_URI_PREFIX) :].partition("/")
+    if not bucket_name:
+        raise UbiOpsException(f"Invalid bucket location: {location}")
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    return bucket_name, prefix
+
+
+def scan_local_files(index, directory, ignore_filename, concurrency):
+    """
+    List the files in a directory with their size, modification time and hash. Hashes are taken from the index when
+    the size and modification time of the file didn't change, other files are hashed in parallel.
+
+    :param FileIndex index: the file index
+    :param str directory: absolute path of the directory
+    :param str|None ignore_filename: the name of the ignore file in the root of the directory
+    :param int concurrency: the maximum number of files to hash at the same time
+    :return dict[str, tuple[str, int, int, str]]: per relative path, the path, size, modification time and hash
+    """
+
+    indexed = index.get_hashes(directory)
+
+    files, to_hash = {}, []
+    for file_path, relative_path, stat in list_local_files(directory=directory, ignore_filename=ignore_filename):
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        indexed_file = indexed.get(file_path)
+        if indexed_file is not None and indexed_file[:2] == (size, mtime_ns):
+            files[relative_path] = (file_path, size, mtime_ns, indexed_file[2])
+        else:
+            to_hash.append((file_path, relative_path, size, mtime_ns))
+
+    hashes = []
+    for (file_path, relative_path, size, mtime_ns), sha256, error in run_parallel(
+        lambda file: hash_file(file[0]), to_hash, concurrency
+    ):
+        if error is not None:
+            raise error
+        files[relative_path] = (file_path, size, mtime_ns, sha256)
+        hashes.append((file_path, size, mtime_ns, sha256))
+    index.store_hashes(hashes)
+
+    return files
+
+
+def is_in_sync(local, remote, synced, upload):
+    """
+    Whether a local and remote file have the same content. That's the case when neither of them changed since they
+    were last transferred. For files that weren't transferred before, it's assumed when their sizes are equal and the
+    destination is newer than the source.
+
+    :param tuple[str, int, int, str] local: the path, size, modification time and hash of the local file
+    :param ubiops.FileItem remote: the remote file
+    :param tuple[int, float|None, str]|None synced: the size, creation time of the remote file and hash when the file
+        was last transferred
+    :param bool upload: whether the local file is the source
+    """
+
+    _, size, mtime_ns, sha256 = local
+    time_created = remote.time_created.timestamp()
+
+    if synced is not None:
+        synced_size, synced_time_created, synced_sha256 = synced
+        return (
+            synced_sha256 == sha256
+            and synced_size == remote.size
+            and (synced_time_created is None or synced_time_created == time_created)
+        )
+
+    if size != remote.size:
+        return False
+    return time_created >= mtime_ns / 1e9 if upload else mtime_ns / 1e9 >= time_created
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+def sync_files(client, project_name, source, destination, ignore_filename, delete, concurrency, progress_bar):
+    """
+    Synchronize a local directory with a bucket prefix, in either direction. Only files that are new or changed are
+    transferred, and with `delete` the files that don't exist in the source are removed from the destination. Files
+    that match the ignore file are neither transferred nor deleted.
+
+    :param ubiops.CoreApi client: the client
+    :param str project_name: the name of the project
+    :param str source: the local directory or bucket prefix to synchronize from
+    :param str destination: the local directory or bucket prefix to synchronize to
+    :param str|None ignore_filename: the name of the ignore file in the root of the local directory
+    :param bool delete: whether to delete files in the destination that don't exist in the source
+    :param int concurrency: the maximum number of files to hash and transfer at the same time
+    :param bool progress_bar: whether to show a progress bar
+    :return tuple[TransferProgress, int, int, list[tuple[str, str]]]: the progress of the transfers, the number of files
+        that were up to date, the number of deleted files, and the name and error of each file that failed
+    """
+
+    source_bucket, destination_bucket = parse_sync_location(source), parse_sync_location(destination)
+    if (source_bucket is None) == (destination_bucket is None):
+        raise UbiOpsException(
+            "Please, specify a local directory and a bucket location like 'ubiops-file://bucket/prefix'"
+        )
+
+    upload = source_bucket is None
+    directory = os.path.abspath(source if upload else destination)
+    bucket_name, prefix = source_bucket or destination_bucket
+
+    if upload:
+        assert os.path.isdir(directory), f"Directory not found: {directory}"
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+    pair = hashlib.sha256(
+        f"{client.api_client.configuration.host}\n{project_name}\n{bucket_name}\n{prefix}\n{directory}".encode()
+    ).hexdigest()
+
+    index = FileIndex(os.path.join(get_cache_dir(), "files.sqlite"))
+    try:
+        local_files = scan_local_files(
+            index=index, directory=directory, ignore_filename=ignore_filename, concurrency=concurrency
+        )
+        remote_files = {
+            file.file[len(prefix) :]: file
+            for file in iter_files(client=client, project_name=project_name, bucket_name=bucket_name, prefix=prefix)
+            if not file.file.endswith("/")
+        }
+        synced = index.get_synced(pair)
+
+        transfers, up_to_date, in_sync = [], 0, []
+        for relative_path in sorted(local_files if upload else remote_files):
+            local, remote = local_files.get(relative_path), remote_files.get(relative_path)
+            if (
+                local is not None
+                and remote is not None
+                and is_in_sync(local, remote, synced.get(relative_path), upload)
+            ):
+                up_to_date += 1
+                # Remember the state of files that are in sync, to recognize changes from now on
+                state = (remote.size, remote.time_created.timestamp(), local[3])
+                if synced.get(relative_path) != state:
+                    in_sync.append((relative_path, *state))
+            else:
+                transfers.append((relative_path, local[1] if upload else remote.size))
+        index.store_synced(pair, in_sync)
+
+        deletions = []
+        if delete:
+            if upload:
+                is_ignored = get_ignore_matcher(directory=directory, ignore_filename=ignore_filename)
+                deletions = [
+                    path
+                    for path in remote_files
+                    if path not in local_files
+                    and (is_ignored is None or not is_ignored.match_relative(path, is_dir=False))
+                ]
+            else:
+                deletions = [path for path in local_files if path not in remote_files]
+
+        def transfer(file):
+            relative_path, _ = file
+            if upload:
+                local = local_files[relative_path]
+                upload_file(
+                    client=client,
+                    project_name=project_name,
+                    bucket_name=bucket_name,
+                    file_path=local[0],
+                    file_name=f"{prefix}{relative_path}",
+                    callback=progress.update,
+                )
+                # The creation time of the remote file is stored once it's listed by the next synchronization
+                return [(relative_path, local[1], None, local[3])], []
+
+            remote = remote_files[relative_path]
+            file_path = os.path.normpath(os.path.join(directory, *relative_path.split("/")))
+            if os.path.commonpath([directory, file_path]) != directory:
+                raise UbiOpsException("File name points outside of the output directory")
+
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            download_file(
+                client=client,
+                project_name=project_name,
+                bucket_name=bucket_name,
+                file_name=remote.file,
+                output_path=file_path,
+                callback=progress.update,
+            )
+            stat = os.stat(file_path)
+            sha256 = hash_file(file_path)
+            return (
+                [(relative_path, remote.size, remote.time_created.timestamp(), sha256)],
+                [(file_path, stat.st_size, stat.st_mtime_ns, sha256)],
+            )
+
+        def remove(relative_path):
+            if upload:
+                client.files_delete(project_name=project_name, bucket_name=bucket_name, file=f"{prefix}{relative_path}")
+            else:
+                os.remove(local_files[relative_path][0])
+
+        failed, transferred, hashes = [], [], []
+        with TransferProgress(
+            total_bytes=sum(size for _, size in transfers),
+            total_files=len(transfers),
+            description="Uploading" if upload else "Downloading",
+            enabled=progress_bar,
+        ) as progress:
+            try:
+                for (relative_path, _), result, error in run_parallel(transfer, transfers, concurrency):
+                    if error is not None:
+                        failed.append((relative_path, describe_error(error)))
+                    else:
+                        transferred.extend(result[0])
+                        hashes.extend(result[1])
+                    progress.file_done(failed=error is not None)
+
+                    # Store the state of transferred files regularly, such that an interrupted sync can be continued
+                    if len(transferred) >= INDEX_BATCH_SIZE:
+                        index.store_synced(pair, transferred)
+                        index.store_hashes(hashes)
+                        transferred, hashes = [], []
+            finally:
+                index.store_synced(pair, transferred)
+                index.store_hashes(hashes)
+
+        deleted = []
+        for relative_path, _, error in run_parallel(remove, deletions, concurrency):
+            if error is not None:
+                failed.append((relative_path, describe_error(error)))
+            else:
+                deleted.append(relative_path)
+        index.remove_synced(pair, deleted)
+
+    finally:
+        index.close()
+
+    return progress, up_to_date, len(deleted), failed
@@ -9,14 +9,16 @@ def wait_for(func, **kwargs):
     Executes a wait_for client library function and prints the result
 
     :param callable func: the wait_for function to execute
-    :param dict kwargs: the keyword arguments to pass to the specified wait_for function
+    :param dict kwargs: the keyword arguments to pass to the specified wait_for function, including the client
     """
 
     success = True
     error_message = ""
     time_started = datetime.now()
     try:
-        func(**kwargs)
+        # Poll the status from the API, cached responses would never change
+        with kwargs["client"].rest_client.bypass_cache():
+            func(**kwargs)
     except Exception as e:
         success = False
         error_message = str(e)
@@ -34,7 +34,6 @@ def imports_list(status, format_):
     if project_name:
         client = init_client()
         imports = client.imports_list(project_name=project_name, status=status)
-        client.api_client.close()
         print_list(items=imports, attrs=LIST_ITEMS, sorting_col=1, sorting_reverse=True, fmt=format_)
 
 
@@ -57,7 +56,6 @@ def imports_get(import_id, output_path, quiet, format_):
 
     client = init_client()
     _import = client.imports_get(project_name=project_name, import_id=import_id)
-    client.api_client.close()
 
     if output_path is not None:
         dictionary = format_yaml(
@@ -88,7 +86,6 @@ def imports_create(zip_path, skip_confirmation, progress_bar, format_):
     _import = client.imports_create(
         project_name=project_name, file=zip_path, skip_confirmation=skip_confirmation, _progress_bar=progress_bar
     )
-    client.api_client.close()
 
     print_item(_import, row_attrs=LIST_ITEMS, fmt=format_)
 
@@ -221,7 +218,6 @@ def imports_confirm(import_id, yaml_file, format_):
         deployments=deployments, pipelines=pipelines, environment_variables=environment_variables
     )
     response = client.imports_update(project_name=project_name, import_id=import_id, data=import_update_data)
-    client.api_client.close()
 
     print_item(item=response, row_attrs=GET_ITEMS, fmt=format_)
 
@@ -242,7 +238,6 @@ def imports_delete(import_id, assume_yes, quiet):
     ):
         client = init_client()
         client.imports_delete(project_name=project_name, import_id=import_id)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Import was successfully deleted")
@@ -267,7 +262,6 @@ def imports_download(import_id, output_path, quiet):
     with client.imports_download(project_name=project_name, import_id=import_id) as response:
         filename = default_zip_name(prefix=f"import_{import_id}")
         output_path = write_blob(response.read(), output_path, filename)
-    client.api_client.close()
 
     if not quiet:
         click.echo(f"Import file stored in: {output_path}")
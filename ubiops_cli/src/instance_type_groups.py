@@ -32,7 +32,6 @@ def instance_type_groups_list(limit, format_):
 
     client = init_client()
     response = client.instance_type_groups_list(project_name=project_name, limit=limit)
-    client.api_client.close()
 
     print_list(items=response.results, attrs=INSTANCE_TYPE_GROUP_LIST_FIELDS, sorting_col=0, fmt=format_)
 
@@ -74,7 +73,6 @@ def instance_type_groups_get(instance_type_group_id, output_path, quiet, format_
 
     client = init_client()
     group = client.instance_type_groups_get(project_name=project_name, instance_type_group_id=instance_type_group_id)
-    client.api_client.close()
 
     if output_path is not None:
         # Store only reusable settings
@@ -132,7 +130,6 @@ def instance_type_groups_create(name, yaml_file, format_):
 
     group = api.InstanceTypeGroupCreate(name=name, instance_types=yaml_content["instance_types"])
     response = client.instance_type_groups_create(project_name=project_name, data=group)
-    client.api_client.close()
 
     print_item(
         item=response,
@@ -180,7 +177,6 @@ def instance_type_groups_update(instance_type_group_id, new_name, yaml_file, qui
     client.instance_type_groups_update(
         project_name=project_name, instance_type_group_id=instance_type_group_id, data=group
     )
-    client.api_client.close()
 
     if not quiet:
         click.echo("Instance type group was successfully updated")
@@ -202,7 +198,6 @@ def instance_type_groups_delete(instance_type_group_id, assume_yes, quiet):
     ):
         client = init_client()
         client.instance_type_groups_delete(project_name=project_name, instance_type_group_id=instance_type_group_id)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Instance type group was successfully deleted")
@@ -40,7 +40,6 @@ def instance_types_list(limit, format_):
 
     client = init_client()
     response = client.instance_types_list(project_name=project_name, limit=limit)
-    client.api_client.close()
 
     print_list(
         items=response.results,
@@ -36,7 +36,6 @@ def instances_list(deployment_name, version_name, limit, format_):
     response = client.instances_list(
         project_name=project_name, deployment_name=deployment_name, version=version_name, limit=limit
     )
-    client.api_client.close()
 
     attrs = INSTANCE_LIST_FIELDS_TABLE if format_ == "table" else INSTANCE_LIST_FIELDS_JSON
     print_list(items=response.results, attrs=attrs, sorting_col=0, fmt=format_)
@@ -58,7 +57,6 @@ def instances_get(deployment_name, version_name, instance_id, format_):
     response = client.instances_get(
         project_name=project_name, deployment_name=deployment_name, version=version_name, instance_id=instance_id
     )
-    client.api_client.close()
 
     attrs = INSTANCE_LIST_FIELDS_TABLE if format_ == "row" else INSTANCE_LIST_FIELDS_JSON
     print_item(
@@ -91,6 +89,5 @@ def instances_events(deployment_name, version_name, instance_id, limit, format_)
         instance_id=instance_id,
         limit=limit,
     )
-    client.api_client.close()
 
     print_list(items=response.results, attrs=INSTANCE_EVENT_LIST_FIELDS, sorting_col=0, fmt=format_)
@@ -108,7 +108,6 @@ def commands(ctx, start, end, query, limit, no_pager, format_):
     client = init_client()
 
     logs = client.logs_list(project_name=project_name, start=start, end=end, query=query, limit=limit)
-    client.api_client.close()
 
     if format_ == "json":
         click.echo(format_json(logs))
@@ -190,7 +189,6 @@ def logs_list_deprecated(
 
     log_filters = api.LogsCreate(filters=filters, date=start_date, id=start_log, date_range=date_range, limit=limit)
     logs = client.projects_log_list(project_name=project_name, data=log_filters)
-    client.api_client.close()
 
     if format_ == "json":
         click.echo(format_json(logs))
@@ -251,7 +249,6 @@ def logs_get(log_id, format_):
     log_filters = api.LogsCreate(filters={}, id=log_id, limit=1)
     log = client.projects_log_list(project_name=project_name, data=log_filters)[0]
     log.log = log.log.strip()
-    client.api_client.close()
 
     print_item(
         log,
@@ -301,6 +298,5 @@ def audit_list(deployment_name, pipeline_name, format_, **kwargs):
         events = client.pipeline_audit_events_list(project_name=project_name, pipeline_name=pipeline_name, **kwargs)
     else:
         events = client.project_audit_events_list(project_name=project_name, **kwargs)
-    client.api_client.close()
 
     print_list(items=events, attrs=["date", "action", "user", "event"], fmt=format_, pager=len(events) > 10)
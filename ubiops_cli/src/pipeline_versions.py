@@ -1,7 +1,7 @@
 import click
 import ubiops as api
 
-from ubiops_cli.utils import init_client, read_yaml, write_yaml, get_current_project, set_dict_default
+from ubiops_cli.utils import init_client, read_yaml, write_yaml, get_current_project, set_dict_default, get_pipeline
 from ubiops_cli.src.helpers.pipeline_helpers import (
     rename_pipeline_object_reference_version,
     set_pipeline_version_defaults,
@@ -43,11 +43,10 @@ def pipeline_versions_list(pipeline_name, labels, format_):
     project_name = get_current_project(error=True)
 
     client = init_client()
-    default = client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name).default_version
+    default = get_pipeline(client=client, project_name=project_name, pipeline_name=pipeline_name).default_version
     response = client.pipeline_versions_list(
         project_name=project_name, pipeline_name=pipeline_name, labels=label_filter
     )
-    client.api_client.close()
 
     if format_ == "table":
         # Add [DEFAULT] to default version
@@ -118,8 +117,7 @@ def pipeline_versions_get(pipeline_name, version_name, output_path, quiet, forma
     # Get pipeline version structure - pipeline, objects and attachments details
     client = init_client()
     version = client.pipeline_versions_get(project_name=project_name, pipeline_name=pipeline_name, version=version_name)
-    pipeline = client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name)
-    client.api_client.close()
+    pipeline = get_pipeline(client=client, project_name=project_name, pipeline_name=pipeline_name)
 
     # By default these attributes are not present in the version obtained from the API, but we explicitly set them
     # to ensure that the version is reproducible with the YAML output
@@ -212,9 +210,8 @@ def pipeline_versions_create(pipeline_name, version_name, yaml_file, format_, **
     kwargs = rename_pipeline_object_reference_version(content=kwargs)
 
     version = api.PipelineVersionCreate(version=version_name, **{k: kwargs[k] for k in PIPELINE_VERSION_FIELDS})
-    pipeline = client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name)
+    pipeline = get_pipeline(client=client, project_name=project_name, pipeline_name=pipeline_name)
     response = client.pipeline_versions_create(project_name=project_name, pipeline_name=pipeline_name, data=version)
-    client.api_client.close()
 
     # By default these attributes are not present in the response obtained from the API, but we explicitly set them
     # to ensure that the pipeline version is reproducible with the YAML output
@@ -289,7 +286,6 @@ def pipeline_versions_update(pipeline_name, version_name, yaml_file, new_name, q
     client.pipeline_versions_update(
         project_name=project_name, pipeline_name=pipeline_name, version=version_name, data=version_data
     )
-    client.api_client.close()
 
     if not quiet:
         click.echo("Pipeline version was successfully updated")
@@ -313,7 +309,6 @@ def pipeline_versions_delete(pipeline_name, version_name, assume_yes, quiet):
     ):
         client = init_client()
         client.pipeline_versions_delete(project_name=project_name, pipeline_name=pipeline_name, version=version_name)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Pipeline version was successfully deleted")
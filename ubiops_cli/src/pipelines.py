@@ -20,7 +20,15 @@ from ubiops_cli.src.helpers.formatting import (
     parse_datetime,
 )
 from ubiops_cli.src.helpers import options
-from ubiops_cli.utils import get_current_project, init_client, read_json, read_yaml, write_yaml, parse_json
+from ubiops_cli.utils import (
+    get_current_project,
+    init_client,
+    read_json,
+    read_yaml,
+    write_yaml,
+    parse_json,
+    get_pipeline,
+)
 
 
 LIST_ITEMS = ["last_updated", "name", "labels"]
@@ -53,7 +61,6 @@ def pipelines_list(labels, format_):
         client = init_client()
         pipelines = client.pipelines_list(project_name=project_name, labels=label_filter)
         print_list(pipelines, LIST_ITEMS, sorting_col=1, fmt=format_)
-        client.api_client.close()
 
 
 @commands.command(name="get", short_help="Get a pipeline")
@@ -75,7 +82,6 @@ def pipelines_get(pipeline_name, output_path, quiet, format_):
 
     client = init_client()
     pipeline = client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name)
-    client.api_client.close()
 
     if output_path is not None:
         dictionary = format_yaml(
@@ -158,7 +164,6 @@ def pipelines_create(pipeline_name, yaml_file, format_):
     pipeline_fields, input_fields, output_fields = define_pipeline(yaml_content, pipeline_name)
     pipeline_data = api.PipelineCreate(**pipeline_fields, **input_fields, **output_fields)
     pipeline_response = client.pipelines_create(project_name=project_name, data=pipeline_data)
-    client.api_client.close()
 
     print_item(
         pipeline_response,
@@ -261,8 +266,6 @@ def pipelines_update(pipeline_name, new_name, yaml_file, default_version, quiet)
         if not quiet:
             click.echo("Nothing to update")
 
-    client.api_client.close()
-
 
 @commands.command(name="delete", short_help="Delete a pipeline")
 @options.PIPELINE_NAME_ARGUMENT
@@ -280,7 +283,6 @@ def pipelines_delete(pipeline_name, assume_yes, quiet):
     ):
         client = init_client()
         client.pipelines_delete(project_name=project_name, pipeline_name=pipeline_name)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Pipeline was successfully deleted")
@@ -338,7 +340,7 @@ def requests_create(pipeline_name, version_name, batch, timeout, deployment_time
     project_name = get_current_project(error=True)
 
     client = init_client()
-    pipeline = client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name)
+    pipeline = get_pipeline(client=client, project_name=project_name, pipeline_name=pipeline_name)
 
     if batch and deployment_timeout is not None:
         raise UbiOpsException("It's not possible to pass a deployment timeout for a batch pipeline request")
@@ -391,8 +393,6 @@ def requests_create(pipeline_name, version_name, batch, timeout, deployment_time
                     # Keep the final result to display in the correct format
                     response.append(streaming_update)
 
-    client.api_client.close()
-
     if format_ == "reference":
         click.echo(format_pipeline_requests_reference(response))
     elif format_ == "oneline":
@@ -435,8 +435,6 @@ def requests_get(pipeline_name, version_name, request_id, format_):
             project_name=project_name, pipeline_name=pipeline_name, data=request_ids
         )
 
-    client.api_client.close()
-
     if format_ == "reference":
         click.echo(format_pipeline_requests_reference(response))
 
@@ -498,7 +496,6 @@ def requests_list(pipeline_name, version_name, limit, format_, **kwargs):
             project_name=project_name, pipeline_name=pipeline_name, limit=limit, **kwargs
         )
 
-    client.api_client.close()
     print_list(response, REQUEST_LIST_ITEMS, fmt=format_, json_skip=["success"])
     if len(response) == limit:
         click.echo("\n(Use the <offset> and <limit> options to load more)")
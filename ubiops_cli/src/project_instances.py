@@ -32,7 +32,6 @@ def project_instances_list(limit, format_):
 
     client = init_client()
     response = client.project_instances_list(project_name=project_name, limit=limit)
-    client.api_client.close()
 
     attrs = PROJECT_INSTANCE_LIST_FIELDS_TABLE if format_ == "table" else PROJECT_INSTANCE_LIST_FIELDS_JSON
     print_list(items=response.results, attrs=attrs, sorting_col=0, fmt=format_)
@@ -50,7 +49,6 @@ def project_instances_get(instance_id, format_):
 
     client = init_client()
     response = client.project_instances_get(project_name=project_name, instance_id=instance_id)
-    client.api_client.close()
 
     attrs = PROJECT_INSTANCE_LIST_FIELDS_TABLE if format_ == "row" else PROJECT_INSTANCE_LIST_FIELDS_JSON
     print_item(
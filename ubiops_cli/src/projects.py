@@ -30,7 +30,6 @@ def projects_list(organization_name, format_):
     if organization_name:
         projects = [i for i in projects if i.organization_name == organization_name]
     current = get_current_project()
-    client.api_client.close()
 
     print_projects_list(projects, current, LIST_ITEMS, fmt=format_)
 
@@ -43,7 +42,6 @@ def projects_get(project_name, format_):
 
     client = init_client()
     response = client.projects_get(project_name=project_name)
-    client.api_client.close()
 
     print_item(response, row_attrs=LIST_ITEMS, fmt=format_)
 
@@ -91,8 +89,6 @@ def projects_create(project_name, organization_name, overwrite, format_):
         project = api.ProjectCreate(name=project_name, organization_name=organization_name)
         response = client.projects_create(data=project)
 
-    client.api_client.close()
-
     # Set the created/retrieved project as current project
     user_config = Config()
     user_config.set("default.project", response.name)
@@ -111,7 +107,6 @@ def projects_delete(project_name, assume_yes, quiet):
     if assume_yes or click.confirm(f"Are you sure you want to delete project <{project_name}>?"):
         client = init_client()
         client.projects_delete(project_name=project_name)
-        client.api_client.close()
 
         default_project = Config().get("default.project")
         if default_project and default_project == project_name:
@@ -146,7 +141,6 @@ def current_project_get(format_):
 
     client = init_client()
     response = client.projects_get(project_name=current)
-    client.api_client.close()
 
     print_projects_list([response], current, LIST_ITEMS, fmt=format_)
 
@@ -159,7 +153,6 @@ def current_project_set(project_name, format_):
 
     client = init_client()
     response = client.projects_get(project_name=project_name)
-    client.api_client.close()
 
     user_config = Config()
     user_config.set(key="default.project", value=response.name)
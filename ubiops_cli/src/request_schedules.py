@@ -6,7 +6,7 @@ from ubiops_cli.constants import STRUCTURED_TYPE
 from ubiops_cli.src.helpers.formatting import print_list, print_item
 from ubiops_cli.src.helpers.helpers import get_label_filter
 from ubiops_cli.src.helpers import options
-from ubiops_cli.utils import get_current_project, init_client, parse_json
+from ubiops_cli.utils import get_current_project, init_client, parse_json, get_deployment, get_pipeline
 
 
 LIST_ITEMS = ["id", "name", "schedule", "enabled"]
@@ -24,9 +24,9 @@ def get_schedule_object(client, project_name, object_type, object_name):
     """
 
     if object_type == "deployment":
-        return client.deployments_get(project_name=project_name, deployment_name=object_name)
+        return get_deployment(client=client, project_name=project_name, deployment_name=object_name)
     if object_type == "pipeline":
-        return client.pipelines_get(project_name=project_name, pipeline_name=object_name)
+        return get_pipeline(client=client, project_name=project_name, pipeline_name=object_name)
     raise UbiOpsException("Object type must be 'deployment' or 'pipeline'")
 
 
@@ -52,7 +52,6 @@ def schedules_list(labels, format_):
 
     client = init_client()
     response = client.request_schedules_list(project_name=project_name, labels=label_filter)
-    client.api_client.close()
 
     print_list(response, LIST_ITEMS, rename_cols=RENAME_COLUMNS, sorting_col=1, fmt=format_)
 
@@ -91,7 +90,6 @@ def schedules_create(schedule_name, object_type, object_name, object_version, da
         **kwargs,
     )
     response = client.request_schedules_create(project_name=project_name, data=schedule)
-    client.api_client.close()
 
     print_item(response, LIST_ITEMS, rename=RENAME_COLUMNS, fmt=format_)
 
@@ -125,7 +123,6 @@ def schedules_update(schedule_name, new_name, data, format_, **kwargs):
     response = client.request_schedules_update(
         project_name=project_name, schedule_name=schedule_name, data=new_schedule
     )
-    client.api_client.close()
 
     print_item(response, LIST_ITEMS, rename=RENAME_COLUMNS, fmt=format_)
 
@@ -142,7 +139,6 @@ def schedules_get(schedule_name, format_):
 
     client = init_client()
     response = client.request_schedules_get(project_name=project_name, schedule_name=schedule_name)
-    client.api_client.close()
 
     print_item(response, row_attrs=LIST_ITEMS, rename=RENAME_COLUMNS, fmt=format_)
 
@@ -163,7 +159,6 @@ def schedules_delete(schedule_name, assume_yes, quiet):
     ):
         client = init_client()
         client.request_schedules_delete(project_name=project_name, schedule_name=schedule_name)
-        client.api_client.close()
 
         if not quiet:
             click.echo("Request schedule was successfully deleted")
@@ -0,0 +1,74 @@
+import os
+import shlex
+
+import click
+
+from ubiops_cli.utils import Config, SessionClientContext, get_cache_dir
+
+try:
+    import readline
+except ImportError:  # Windows
+    readline = None
+
+# Number of seconds to serve looked up deployments and pipelines from the cache
+LOOKUP_CACHE_TTL = 60
+EXIT_COMMANDS = ["exit", "quit"]
+
+
+@click.command(name="shell", short_help="Start an interactive shell")
+def commands():
+    """
+    Start an interactive shell to run multiple commands in one session.
+
+    Type commands without the `ubiops` prefix, e.g., `deployments list`. Use `exit`, `quit` or Ctrl+D to leave
+    the shell.
+
+    All commands in the session share one authenticated connection to the API. Deployments and pipelines that
+    commands look up, e.g., to get the input type or default version, are cached for 60 seconds, and the cache is
+    cleared by any command that modifies data.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from ubiops_cli.main import main
+
+    history_file = os.path.join(get_cache_dir(), "shell_history")
+    if readline is not None and os.path.isfile(history_file):
+        readline.read_history_file(history_file)
+
+    client_context = SessionClientContext(lookup_cache_ttl=LOOKUP_CACHE_TTL)
+    try:
+        while True:
+            try:
+                line = input(f"ubiops ({Config().get('default.project') or '-'})> ")
+            except EOFError:
+                click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                click.secho(message=f"Error: {e}", fg="red")
+                continue
+
+            if not args:
+                continue
+            if args[0] in EXIT_COMMANDS:
+                break
+            if args[0] == "shell":
+                click.secho(message="Error: the shell is already running", fg="red")
+                continue
+
+            try:
+                main(args=args, obj=client_context, prog_name="ubiops")
+            except SystemExit:
+                pass
+            except KeyboardInterrupt:
+                click.echo()
+
+    finally:
+        client_context.close()
+        if readline is not None:
+            readline.write_history_file(history_file)
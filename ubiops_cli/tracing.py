@@ -0,0 +1,154 @@
+import json
+import sys
+import threading
+import time
+
+# Number of calls to show in the table of slowest calls
+SLOWEST_CALLS = 10
+
+_tracer = None
+
+
+class Tracer:
+    """
+    Records every HTTP request made by the CLI, writes them as NDJSON and summarizes them once the command finished
+    """
+
+    def __init__(self, output):
+        """
+        :param str output: path to the file to write the records to, or '-' to write them to stderr
+        """
+
+        self.output = output
+        self.records = []
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = sys.stderr if output == "-" else open(output, "w", encoding="utf-8")
+
+    # pylint: disable=too-many-arguments
+    def record(
+        self, method, path, start, status=None, ttfb=None, bytes_out=0, bytes_in=0, retries=0, error=None, cache=None
+    ):
+        """
+        Record one HTTP request. Retries of the request are part of the same record.
+
+        :param str method: the request method
+        :param str path: the path template of the request, like '/projects/{project_name}/deployments'
+        :param float start: the performance counter value at which the request started
+        :param int|None status: the response status, None if no response was received
+        :param float|None ttfb: the number of seconds until the response headers were received
+        :param int bytes_out: the size of the request body
+        :param int bytes_in: the size of the response body
+        :param int retries: the number of times the request was retried
+        :param str|None error: the error that occurred, if no response was received
+        :param str|None cache: 'hit' if the response was served from the response cache, 'revalidated' if the API
+            confirmed the cached response didn't change
+        """
+
+        end = time.perf_counter()
+        record = {
+            "method": method,
+            "path": path,
+            "status": status,
+            "bytes_out": bytes_out,
+            "bytes_in": bytes_in,
+            "ttfb": round(ttfb, 4) if ttfb is not None else None,
+            "duration": round(end - start, 4),
+            "retries": retries,
+            "start": round(start - self.start, 4),
+        }
+        if error is not None:
+            record["error"] = error
+        if cache is not None:
+            record["cache"] = cache
+
+        with self._lock:
+            self.records.append((start, end, record))
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def summary(self):
+        """
+        Get a summary of the recorded requests: the slowest calls, and the wall time split into network and local time
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from tabulate import tabulate
+
+        wall_time = time.perf_counter() - self.start
+        with self._lock:
+            records = list(self.records)
+
+        # Requests may run in parallel, so the network time is the time during which at least one request was running
+        network_time = 0.0
+        current_start, current_end = None, None
+        for start, end, _ in sorted(records, key=lambda r: r[0]):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    network_time += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            network_time += current_end - current_start
+
+        lines = [
+            f"Trace summary: {len(records)} API calls, {sum(r[2]['retries'] for r in records)} retries, "
+            f"{sum(r[2]['bytes_out'] for r in records)} bytes out, {sum(r[2]['bytes_in'] for r in records)} bytes in",
+            f"Wall time: {wall_time:.3f}s (network {network_time:.3f}s, "
+            f"local {max(0.0, wall_time - network_time):.3f}s)",
+        ]
+
+        slowest = sorted((r[2] for r in records), key=lambda r: r["duration"], reverse=True)[:SLOWEST_CALLS]
+        if slowest:
+            table = [
+                [r["method"], r["path"], r["status"], r["duration"], r["ttfb"], r["retries"], r["bytes_in"]]
+                for r in slowest
+            ]
+            lines.append("")
+            lines.append(
+                tabulate(table, headers=["METHOD", "PATH", "STATUS", "DURATION", "TTFB", "RETRIES", "BYTES_IN"])
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """
+        Close the output file
+        """
+
+        if self._file is not sys.stderr:
+            self._file.close()
+
+
+def start(output):
+    """
+    Start tracing all HTTP requests
+
+    :param str output: path to the file to write the records to, or '-' to write them to stderr
+    """
+
+    global _tracer  # pylint: disable=global-statement
+    _tracer = Tracer(output)
+    return _tracer
+
+
+def stop():
+    """
+    Stop tracing, and print the summary of the traced requests to stderr
+    """
+
+    global _tracer  # pylint: disable=global-statement
+    if _tracer is None:
+        return
+
+    tracer, _tracer = _tracer, None
+    tracer.close()
+    sys.stderr.write(tracer.summary() + "\n")
+
+
+def get_tracer():
+    """
+    Get the active tracer, None if requests are not traced
+    """
+
+    return _tracer
@@ -1,32 +1,46 @@
 import configparser
+import hashlib
 import json
 import os
-import zipfile
+import threading
+import time
 
+from contextlib import contextmanager
 from datetime import datetime
 
-import yaml
 import click
 
-import ubiops as api
-
-
-from ubiops_cli.constants import IMPLICIT_ENVIRONMENT_FILES
+from ubiops_cli.constants import IMPLICIT_ENVIRONMENT_FILES, UNAUTHORIZED_MESSAGE
 from ubiops_cli.exceptions import UnAuthorizedException, UbiOpsException
 from ubiops_cli.gitignorefile.gitignorefile import parse as parse_ignore
 from ubiops_cli.version import VERSION
+from ubiops_cli.zip_writer import write_zip
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Parsed config files per path, such that the config is only parsed again when the file changed
+_CONFIG_CACHE = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
 
 
 class Config:
     REQUIRED_SECTIONS = ["auth", "default"]
     DEFAULT_API_VERSION = "v2.1"
     DEFAULT_API = f"https://api.ubiops.com/{DEFAULT_API_VERSION}/"
+    DEFAULT_AUTH_CACHE_TTL = 300  # seconds
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_MAX_RETRIES = 5
 
     def __init__(self):
         basedir = os.path.dirname(os.path.abspath(__file__))
         self.config_file = os.path.join(basedir, ".config")
 
         self.dictionary = configparser.ConfigParser()
+        self.changes = []
         self.load()
 
     def __str__(self):
@@ -41,10 +55,20 @@ class Config:
 
     def load(self):
         """
-        Load the config from a file
+        Load the config from a file. The parsed file is cached, and only parsed again when the file was modified.
         """
 
-        self.dictionary.read(self.config_file)
+        file_state = self.loaded_state = self._file_state()
+
+        with _CONFIG_CACHE_LOCK:
+            cached = _CONFIG_CACHE.get(self.config_file)
+            if cached is None or cached[0] != file_state:
+                parser = configparser.ConfigParser()
+                parser.read(self.config_file)
+                cached = (file_state, self._to_dict(parser))
+                _CONFIG_CACHE[self.config_file] = cached
+
+        self.dictionary.read_dict(cached[1])
         for section in self.REQUIRED_SECTIONS:
             self.check_section(section)
 
@@ -70,6 +94,7 @@ class Config:
                 self.delete_option("auth.service_token")
 
         self.dictionary.set(section, option, value)
+        self.changes.append((section, option, value))
 
     def get(self, key):
         """
@@ -97,6 +122,7 @@ class Config:
         if not self.dictionary.has_option(section, option):
             return False
         self.dictionary.remove_option(section, option)
+        self.changes.append((section, option, None))
         return True
 
     def write(self):
@@ -104,8 +130,51 @@ class Config:
         Write config to file
         """
 
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            self.dictionary.write(f)
+        # Lock the config, such that parallel CLI processes don't write at the same time, and replace the file
+        # atomically, such that they never read a partially written file
+        with file_lock(os.path.join(get_cache_dir(), "config.lock")):
+            if self._file_state() != self.loaded_state:
+                # Another process changed the config since it was loaded, apply the changes on top of its changes
+                changes = self.changes
+                self.dictionary = configparser.ConfigParser()
+                self.load()
+                for section, option, value in changes:
+                    self.check_section(section)
+                    if value is None:
+                        self.dictionary.remove_option(section, option)
+                    else:
+                        self.dictionary.set(section, option, value)
+
+            tmp_file = f"{self.config_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                self.dictionary.write(f)
+            os.replace(tmp_file, self.config_file)
+
+            with _CONFIG_CACHE_LOCK:
+                self.loaded_state = self._file_state()
+                _CONFIG_CACHE[self.config_file] = (self.loaded_state, self._to_dict(self.dictionary))
+            self.changes = []
+
+    def _file_state(self):
+        """
+        Get the modification time and size of the config file, or None if it doesn't exist
+        """
+
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _to_dict(parser):
+        """
+        Get the raw (not interpolated) values of a config parser per section
+
+        :param configparser.ConfigParser parser: the config parser
+        """
+
+        return {section: dict(parser.items(section, raw=True)) for section in parser.sections()}
 
     def check_section(self, section):
         """
@@ -145,15 +214,237 @@ class Config:
         return section
 
 
+class LookupCache:
+    """
+    Short-lived cache of objects that commands look up to read a single field from, like the input type or default
+    version of a deployment. The cache is cleared whenever a request that modifies data is made.
+    """
+
+    def __init__(self, ttl):
+        """
+        :param float ttl: the number of seconds to keep an object in the cache
+        """
+
+        self.ttl = ttl
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, fetch):
+        """
+        Get an object from the cache, or fetch it when it's not (or no longer) cached
+
+        :param tuple key: the key of the object
+        :param callable fetch: function without arguments that retrieves the object
+        """
+
+        with self._lock:
+            cached = self._objects.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+
+        value = fetch()
+        with self._lock:
+            self._objects[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def clear(self, *_):
+        """
+        Remove all objects from the cache
+        """
+
+        with self._lock:
+            self._objects.clear()
+
+
+class ClientContext:
+    """
+    Holds the API client that is shared by all commands and helpers of one CLI invocation. The client is created on
+    first use, and all its connections are closed once when the invocation ends.
+    """
+
+    def __init__(self, lookup_cache_ttl=None):
+        """
+        :param float|None lookup_cache_ttl: the number of seconds to cache looked up objects, None to not cache them
+        """
+
+        self._client = None
+        self._lock = threading.Lock()
+        self.lookup_cache = LookupCache(ttl=lookup_cache_ttl) if lookup_cache_ttl else None
+
+        # The minimum number of connections to keep alive, e.g., when commands make requests in parallel
+        self.min_pool_size = None
+
+        # The number of seconds to use cached responses without revalidating them, overrides the configured value
+        self.cache_max_age = None
+        self._client_cache_max_age = None
+
+    def get_client(self):
+        """
+        Get the shared client, create it if this is the first time it's requested
+        """
+
+        with self._lock:
+            if self._client is None:
+                self._client = create_client(min_pool_size=self.min_pool_size, cache_max_age=self.cache_max_age)
+                self._client_cache_max_age = self.cache_max_age
+                if self.lookup_cache is not None:
+                    self._client.api_client.rest_client.mutation_listeners.append(self.lookup_cache.clear)
+
+            elif self.cache_max_age != self._client_cache_max_age:
+                # The maximum age changed for a command that uses the client of a session, like in the shell
+                cache_max_age = self.cache_max_age
+                if cache_max_age is None:
+                    cache_max_age = get_configured_cache_max_age()
+                set_response_cache(self._client, max_age=cache_max_age)
+                self._client_cache_max_age = self.cache_max_age
+
+            return self._client
+
+    def close(self):
+        """
+        Close the shared client if it was created
+        """
+
+        with self._lock:
+            if self._client is not None:
+                self._client.api_client.close()
+                self._client = None
+
+            if self.lookup_cache is not None:
+                self.lookup_cache.clear()
+
+
+class SessionClientContext(ClientContext):
+    """
+    Holds the API client that is shared by all commands of a long-running session, like the daemon or the interactive
+    shell. The client is created again when the credentials in the config changed, e.g., after signing in with another
+    account.
+    """
+
+    def __init__(self, lookup_cache_ttl=None):
+        """
+        :param float|None lookup_cache_ttl: the number of seconds to cache looked up objects, None to not cache them
+        """
+
+        super().__init__(lookup_cache_ttl=lookup_cache_ttl)
+        self._credentials = None
+
+    def get_client(self):
+        """
+        Get the shared client, create it if it doesn't exist yet or the credentials changed
+        """
+
+        user_config = Config()
+        credentials = tuple(
+            user_config.get(key)
+            for key in ["auth.api", "auth.tmp_access_token", "auth.service_token", "client.pool_size"]
+        )
+        if credentials != self._credentials:
+            self.close()
+            self._credentials = credentials
+
+        return super().get_client()
+
+
+def init_client(min_pool_size=None):
+    """
+    Get the client of the current CLI invocation. A new client is created when called outside a CLI invocation.
+
+    :param int|None min_pool_size: the minimum number of connections to keep alive, for commands that make requests in
+        parallel. Only used when the client wasn't created yet.
+    """
+
+    ctx = click.get_current_context(silent=True)
+    client_context = ctx.find_object(ClientContext) if ctx is not None else None
+    if client_context is not None:
+        if min_pool_size is not None:
+            client_context.min_pool_size = max(min_pool_size, client_context.min_pool_size or 0)
+        return client_context.get_client()
+    return create_client(min_pool_size=min_pool_size)
+
+
+def _lookup(key, fetch):
+    """
+    Look up an object through the lookup cache of the current CLI invocation, if it has one
+
+    :param tuple key: the key of the object
+    :param callable fetch: function without arguments that retrieves the object
+    """
+
+    ctx = click.get_current_context(silent=True)
+    client_context = ctx.find_object(ClientContext) if ctx is not None else None
+    if client_context is None or client_context.lookup_cache is None:
+        return fetch()
+    return client_context.lookup_cache.get(key, fetch)
+
+
+def get_deployment(client, project_name, deployment_name):
+    """
+    Get the details of a deployment, e.g., to read its input type or default version. In the interactive shell, the
+    deployment is served from a short-lived cache.
+
+    :param ubiops.CoreApi client: the core API client to make requests to the API
+    :param str project_name: name of the project
+    :param str deployment_name: name of the deployment
+    """
+
+    return _lookup(
+        key=("deployment", project_name, deployment_name),
+        fetch=lambda: client.deployments_get(project_name=project_name, deployment_name=deployment_name),
+    )
+
+
+def get_pipeline(client, project_name, pipeline_name):
+    """
+    Get the details of a pipeline, e.g., to read its input type or default version. In the interactive shell, the
+    pipeline is served from a short-lived cache.
+
+    :param ubiops.CoreApi client: the core API client to make requests to the API
+    :param str project_name: name of the project
+    :param str pipeline_name: name of the pipeline
+    """
+
+    return _lookup(
+        key=("pipeline", project_name, pipeline_name),
+        fetch=lambda: client.pipelines_get(project_name=project_name, pipeline_name=pipeline_name),
+    )
+
+
 # pylint: disable=broad-except
-def init_client():
+def create_client(min_pool_size=None, cache_max_age=None):
     """
     Initialize the client library with the credentials in the config
+
+    :param int|None min_pool_size: the minimum number of connections to keep alive, overrides a lower configured value
+    :param float|None cache_max_age: the number of seconds to use cached responses without revalidating them,
+        overrides the configured value. Responses are only cached if either is given.
     """
 
-    config_access_token = Config().get("auth.tmp_access_token")
-    config_service_token = Config().get("auth.service_token")
-    config_api = Config().get("auth.api")
+    # The client library is slow to import, so it's only imported once a command needs a client
+    # pylint: disable=import-outside-toplevel
+    import ubiops as api
+
+    from ubiops_cli.client import ApiClient
+
+    user_config = Config()
+    config_access_token = user_config.get("auth.tmp_access_token")
+    config_service_token = user_config.get("auth.service_token")
+    config_api = user_config.get("auth.api")
+
+    try:
+        pool_size = int(user_config.get("client.pool_size") or Config.DEFAULT_POOL_SIZE)
+    except ValueError:
+        raise UbiOpsException("Invalid value for client.pool_size, an integer is expected")
+    if min_pool_size is not None:
+        pool_size = max(pool_size, min_pool_size)
+
+    try:
+        max_retries = int(user_config.get("client.max_retries") or Config.DEFAULT_MAX_RETRIES)
+    except ValueError:
+        raise UbiOpsException("Invalid value for client.max_retries, an integer is expected")
+
+    if cache_max_age is None:
+        cache_max_age = get_configured_cache_max_age()
 
     try:
         configuration = api.Configuration()
@@ -168,14 +459,230 @@ def init_client():
         else:
             raise UbiOpsException("No access or service token found.")
 
-        client = api.ApiClient(configuration)
+        client = ApiClient(configuration, pool_size=pool_size, max_retries=max_retries)
         client.user_agent = f"UbiOps/cli/{VERSION}"
 
         core_api = api.CoreApi(client)
-        assert core_api.service_status().status == "ok"
-        return core_api
     except Exception:
-        raise UnAuthorizedException("Unauthorized. Please, use 'ubiops signin' first.")
+        raise UnAuthorizedException(UNAUTHORIZED_MESSAGE)
+
+    # Skip the health check if it succeeded recently for the same API host and token
+    token = configuration.api_key["Authorization"]
+    if not is_auth_cached(host=config_api, token=token):
+        try:
+            assert core_api.service_status().status == "ok"
+        except Exception:
+            raise UnAuthorizedException(UNAUTHORIZED_MESSAGE)
+        cache_auth(host=config_api, token=token)
+
+    set_response_cache(core_api, max_age=cache_max_age)
+    return core_api
+
+
+def get_configured_cache_max_age():
+    """
+    Get the number of seconds to use cached responses without revalidating them, configurable with
+    `client.cache_max_age`
+
+    :return float|None: the number of seconds, None if responses should not be cached
+    """
+
+    max_age = Config().get("client.cache_max_age")
+    if not max_age:
+        return None
+    try:
+        return float(max_age)
+    except ValueError:
+        raise UbiOpsException("Invalid value for client.cache_max_age, a number of seconds is expected")
+
+
+def set_response_cache(client, max_age):
+    """
+    Cache the responses of a client, or stop caching them
+
+    :param ubiops.CoreApi client: the core API client
+    :param float|None max_age: the number of seconds to use cached responses without revalidating them, None to not
+        cache responses
+    """
+
+    rest_client = client.api_client.rest_client
+    if rest_client.response_cache is not None:
+        if max_age is not None:
+            rest_client.response_cache.max_age = max_age
+            return
+        rest_client.mutation_listeners.remove(rest_client.response_cache.invalidate)
+        rest_client.response_cache = None
+
+    if max_age is not None:
+        # pylint: disable=import-outside-toplevel
+        from ubiops_cli.response_cache import ResponseCache
+
+        configuration = client.api_client.configuration
+        response_cache = ResponseCache(
+            database=os.path.join(get_cache_dir(), "responses.sqlite"),
+            host=configuration.host,
+            token=configuration.api_key["Authorization"],
+            max_age=max_age,
+        )
+        rest_client.response_cache = response_cache
+        rest_client.mutation_listeners.append(response_cache.invalidate)
+
+
+def get_cache_dir(*subdirs):
+    """
+    Get the directory to store cached data of the CLI in. The directory is created if it doesn't exist yet.
+
+    :param str subdirs: optional subdirectories inside the cache directory
+    """
+
+    basedir = os.path.dirname(os.path.abspath(__file__))
+    cache_dir = os.path.join(basedir, ".cache", *subdirs)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _auth_cache_key(host, token):
+    """
+    Get the key of an API host and token in the authentication cache. The token itself is never stored, only a
+    fingerprint of it.
+
+    :param str host: the API host
+    :param str token: the access or service token
+    """
+
+    return hashlib.sha256(f"{host}\n{token}".encode()).hexdigest()
+
+
+def _read_auth_cache():
+    """
+    Read the authentication cache file, an empty cache is returned if the file can't be read
+    """
+
+    try:
+        with open(os.path.join(get_cache_dir(), "auth.json"), encoding="utf-8") as f:
+            content = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return content if isinstance(content, dict) else {}
+
+
+@contextmanager
+def file_lock(lock_file):
+    """
+    Hold an exclusive lock on a file, waiting until other processes release it
+
+    :param str lock_file: path to the file to lock, created if it doesn't exist
+    """
+
+    with open(lock_file, "a+", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_auth_cache(content):
+    """
+    Write the authentication cache file. The file is replaced atomically, such that parallel CLI processes never read a
+    partially written file.
+
+    :param dict content: the content of the cache
+    """
+
+    tmp_file = None
+    try:
+        cache_file = os.path.join(get_cache_dir(), "auth.json")
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, ValueError):
+        # The cache is an optimization only, failing to write it should not fail the command
+        if tmp_file is not None and os.path.isfile(tmp_file):
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+
+def get_auth_cache_ttl():
+    """
+    Get the number of seconds a successful health check of the API is cached, configurable with `auth.cache_ttl`
+    """
+
+    ttl = Config().get("auth.cache_ttl")
+    try:
+        return int(ttl) if ttl is not None else Config.DEFAULT_AUTH_CACHE_TTL
+    except ValueError:
+        return Config.DEFAULT_AUTH_CACHE_TTL
+
+
+def is_auth_cached(host, token):
+    """
+    Whether the health check of the API succeeded for the given host and token within the cache TTL
+
+    :param str host: the API host
+    :param str token: the access or service token
+    """
+
+    try:
+        ttl = get_auth_cache_ttl()
+        if ttl <= 0:
+            return False
+        checked_at = _read_auth_cache().get(_auth_cache_key(host=host, token=token))
+    except (OSError, ValueError):
+        # Do the health check when the cache can't be read
+        return False
+    return isinstance(checked_at, (int, float)) and 0 <= time.time() - checked_at < ttl
+
+
+def cache_auth(host, token):
+    """
+    Store a successful health check of the API for the given host and token. Expired entries are removed.
+
+    :param str host: the API host
+    :param str token: the access or service token
+    """
+
+    try:
+        ttl = get_auth_cache_ttl()
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        content = {
+            key: checked_at
+            for key, checked_at in _read_auth_cache().items()
+            if isinstance(checked_at, (int, float)) and 0 <= now - checked_at < ttl
+        }
+        content[_auth_cache_key(host=host, token=token)] = now
+        _write_auth_cache(content)
+    except (OSError, ValueError):
+        # The cache is an optimization only, failing to update it should not fail the command
+        pass
+
+
+def invalidate_auth_cache():
+    """
+    Remove all cached health checks, e.g., when the API responded with 401 Unauthorized or the user signed out
+    """
+
+    try:
+        cache_file = os.path.join(get_cache_dir(), "auth.json")
+        if os.path.isfile(cache_file):
+            os.remove(cache_file)
+    except OSError:
+        pass
 
 
 def get_current_project(error=False, check_existing=False):
@@ -193,7 +700,6 @@ def get_current_project(error=False, check_existing=False):
     if not current or check_existing:
         client = init_client()
         projects = client.projects_list()
-        client.api_client.close()
 
         if check_existing and current:
             try:
@@ -245,6 +751,8 @@ def read_yaml(yaml_file, required_fields=None):
     if yaml_file is None:
         return {}
 
+    import yaml  # pylint: disable=import-outside-toplevel
+
     with open(yaml_file, encoding="utf-8") as f:
         content = yaml.safe_load(f)
 
@@ -266,6 +774,8 @@ def write_yaml(yaml_file, dictionary, default_file_name):
     :param str default_file_name: the filename used when the output location is a directory
     """
 
+    import yaml  # pylint: disable=import-outside-toplevel
+
     yaml_file = abs_path(yaml_file)
     if os.path.isdir(yaml_file):
         yaml_file = os.path.join(yaml_file, default_file_name)
@@ -284,9 +794,11 @@ def zip_dir(
     prefix=None,
     force=False,
     package_directory="deployment_package",
+    jobs=None,
 ):
     """
-    Zip a deployment package and take care of the ignore file if given
+    Zip a deployment package and take care of the ignore file if given. The archive is reproducible: it only depends
+    on the names, content and executable permissions of the packaged files.
 
     :param str directory: the directory that should be zipped
     :param str output_path: the output location of the zip, either a file or directory
@@ -294,6 +806,10 @@ def zip_dir(
     :param str|None prefix: the prefix of the default filename, only used when output_path is a directory
     :param bool force: whether to overwrite when the file already exists
     :param str package_directory: the root directory of the zip
+    :param int|None jobs: the maximum number of parts of files to compress at the same time, the number of CPUs by
+        default
+    :return tuple[str, bool, str]: the path of the archive, whether it contains environment files, and the content
+        hash of the archive
     """
 
     path_dir = abs_path(directory)
@@ -310,33 +826,40 @@ def zip_dir(
     if not force and os.path.isfile(output_path):
         click.confirm(f"File {output_path} already exists. Do you want to overwrite it?", abort=True)
 
-    # Initialize 'is_ignored' function. It will be overwritten if a .ubiops-ignore file is present.
-    def is_ignored(_):
-        """
-        If no ignore file is present, nothing will be ignored
-        """
-        return False
-
+    # If no ignore file is present, nothing will be ignored
+    is_ignored = None
     if has_ignore_file:
         # Ignore what we found in the .ubiops-ignore file
-        is_ignored = parse_ignore(os.path.join(path_dir, ignore_filename), path_dir)
+        is_ignored = parse_ignore(os.path.join(path_dir, ignore_filename), path_dir, compiled=True)
 
     # Whether environment files are present in the deployment package
     implicit_environment = False
 
     package_path = str(os.path.join(path_dir, ""))
-    with zipfile.ZipFile(output_path, "w") as f:
-        for root, _, files in os.walk(path_dir):
-            root_subdir = os.path.join("", *root.split(package_path)[1:])
-            package_subdir = os.path.join(package_directory, root_subdir)
-            for filename in files:
-                source_file = os.path.join(root, filename)
-                if source_file != output_path and not is_ignored(source_file):
-                    if len(root_subdir.split()) == 0 and filename in IMPLICIT_ENVIRONMENT_FILES:
-                        implicit_environment = True
-                    f.write(source_file, os.path.join(package_subdir, filename))
-
-    return output_path, implicit_environment
+    members = []
+    for root, dirs, files in os.walk(path_dir):
+        root_subdir = os.path.join("", *root.split(package_path)[1:])
+        package_subdir = os.path.join(package_directory, root_subdir)
+
+        # Match paths relative to the package directory, with forward slashes like in the ignore file
+        rel_prefix = f"{root_subdir.replace(os.sep, '/')}/" if root_subdir else ""
+        if is_ignored is not None:
+            # Don't walk into directories that are ignored together with everything inside them, like a virtual
+            # environment. Directories that may contain files re-included by a negation rule are still walked.
+            dirs[:] = [d for d in dirs if not is_ignored.ignores_tree_relative(f"{rel_prefix}{d}")]
+
+        for filename in files:
+            source_file = os.path.join(root, filename)
+            if source_file != output_path and (
+                is_ignored is None or not is_ignored.match_relative(f"{rel_prefix}{filename}", is_dir=False)
+            ):
+                if len(root_subdir.split()) == 0 and filename in IMPLICIT_ENVIRONMENT_FILES:
+                    implicit_environment = True
+                members.append((source_file, os.path.join(package_subdir, filename)))
+
+    content_hash = write_zip(output_path=output_path, files=members, jobs=jobs, reproducible=True)
+
+    return output_path, implicit_environment, content_hash
 
 
 def write_blob(blob, output_path, filename=None):
@@ -0,0 +1,397 @@
+import hashlib
+import os
+import shutil
+import struct
+import time
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Size of the parts of a file that are compressed separately, such that large files are compressed in parallel too
+CHUNK_SIZE = 2 * 1024 * 1024
+
+# Sizes and offsets from this limit on are stored in zip64 extra fields, like the zipfile module does
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+ZIP_MAX_VALUE = 0xFFFFFFFF
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+LOCAL_HEADER = struct.Struct("<4sHHHHHLLLHH")
+CENTRAL_HEADER = struct.Struct("<4sHHHHHHLLLHHHHHLL")
+END_RECORD = struct.Struct("<4sHHHHLLH")
+END_RECORD_64 = struct.Struct("<4sQHHLLQQQQ")
+END_LOCATOR_64 = struct.Struct("<4sLQL")
+
+CREATE_SYSTEM = 0 if os.name == "nt" else 3
+
+# Modification time of the members of reproducible archives, the earliest that can be stored
+REPRODUCIBLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def get_default_jobs():
+    """
+    Get the default number of parts of files to compress at the same time: the number of CPUs
+    """
+
+    return os.cpu_count() or 1
+
+
+def _gf2_matrix_times(matrix, vector):
+    """
+    Multiply a 32x32 matrix over GF(2), given as its columns, with a vector
+    """
+
+    result, i = 0, 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return result
+
+
+@lru_cache(maxsize=64)
+def _crc32_zeros_operator(length):
+    """
+    Get the matrix that updates a CRC-32 checksum for a number of zero bytes, which is cached as most parts of files
+    have the same length
+    """
+
+    # Operator for one zero bit, squared three times to get the operator for one zero byte
+    operator = [0xEDB88320] + [1 << i for i in range(31)]
+    for _ in range(3):
+        operator = [_gf2_matrix_times(operator, column) for column in operator]
+
+    result = None
+    while length:
+        if length & 1:
+            result = operator if result is None else [_gf2_matrix_times(operator, column) for column in result]
+        length >>= 1
+        if length:
+            operator = [_gf2_matrix_times(operator, column) for column in operator]
+    return result
+
+
+def crc32_combine(crc1, crc2, length2):
+    """
+    Combine the CRC-32 checksums of two consecutive blocks of data, like zlib's crc32_combine
+
+    :param int crc1: the checksum of the first block
+    :param int crc2: the checksum of the second block
+    :param int length2: the length of the second block in bytes
+    :return int: the checksum of both blocks together
+    """
+
+    if length2 == 0:
+        return crc1
+    return _gf2_matrix_times(_crc32_zeros_operator(length2), crc1) ^ crc2
+
+
+def compress_chunk(chunk):
+    """
+    Read and compress part of a file. Parts are compressed independently to raw deflate data that ends at a byte
+    boundary, and only the last part of a file ends the deflate stream, such that the compressed parts of a file can be
+    concatenated. zlib releases the GIL while compressing, so parts can be compressed in threads.
+
+    :param tuple[str, int, int, bool, int] chunk: the path of the file, the offset and length of the part, whether it's
+        the last part of the file, and the compression level
+    :return tuple[int, int, bytes, bytes]: the CRC-32 checksum, length and SHA-256 hash of the part, and its compressed
+        data
+    """
+
+    file_path, offset, length, last, level = chunk
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return zlib.crc32(data), len(data), hashlib.sha256(data).digest(), compressed
+
+
+def map_ordered(function, items, jobs):
+    """
+    Call a function for each item on a thread pool, and yield the results in the order of the items. At most twice the
+    number of jobs are in flight, such that not all results need to be in memory at once.
+
+    :param callable function: the function to call with each item
+    :param iterable items: the items
+    :param int jobs: the maximum number of calls to run at the same time
+    :return generator: the result of each call
+    """
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class ZipMember:
+    """
+    A file in a zip archive
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, file_path, arcname, reproducible=False):
+        """
+        :param str file_path: the path of the file to add
+        :param str arcname: the name of the file in the archive
+        :param bool reproducible: whether to store a fixed modification time and normalized permissions, and to mark
+            the member as created on Unix, instead of taking them from the file and the current system
+        """
+
+        stat = os.stat(file_path)
+        self.file_path = file_path
+        self.name = arcname.replace(os.sep, "/").lstrip("/")
+        self.size = stat.st_size
+        if reproducible:
+            self.mode = self.normalized_mode(stat.st_mode)
+            self.date_time = REPRODUCIBLE_DATE_TIME
+            self.create_system = 3
+        else:
+            self.mode = stat.st_mode
+            self.date_time = time.localtime(stat.st_mtime)[:6]
+            self.create_system = CREATE_SYSTEM
+        self.compress_type = ZIP_DEFLATED
+        self.compress_size = 0
+        self.crc = 0
+        self.header_offset = 0
+
+    @staticmethod
+    def normalized_mode(mode):
+        """
+        Get the permissions of a regular file that only keep whether it's executable
+
+        :param int mode: the mode of the file
+        """
+
+        return 0o100755 if mode & 0o111 else 0o100644
+
+    @property
+    def chunks(self):
+        """
+        The number of parts the file is compressed in, at least one for empty files
+        """
+
+        return max(-(-self.size // CHUNK_SIZE), 1)
+
+    @property
+    def flags(self):
+        """
+        The general purpose flags, marking file names that aren't ASCII as UTF-8
+        """
+
+        return 0 if self.name.isascii() else 0x800
+
+    @property
+    def dos_date_time(self):
+        """
+        The modification time in MS-DOS format, clamped to the range it supports
+        """
+
+        date_time = min(max(self.date_time, (1980, 1, 1, 0, 0, 0)), (2107, 12, 31, 23, 59, 59))
+        year, month, day, hour, minute, second = date_time
+        return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+    @property
+    def zip64(self):
+        """
+        Whether the sizes of the member need zip64 extra fields. A member is stored uncompressed if compression doesn't
+        make it smaller, so its compressed size never exceeds its size.
+        """
+
+        return self.size >= ZIP64_LIMIT
+
+    def local_header(self):
+        """
+        The local file header of the member
+        """
+
+        name = self.name.encode("utf-8")
+        dos_time, dos_date = self.dos_date_time
+        extra, compress_size, size = b"", self.compress_size, self.size
+        if self.zip64:
+            extra = struct.pack("<HHQQ", 1, 16, size, compress_size)
+            compress_size = size = ZIP_MAX_VALUE
+
+        return (
+            LOCAL_HEADER.pack(
+                b"PK\003\004",
+                45 if self.zip64 else 20,
+                self.flags,
+                self.compress_type,
+                dos_time,
+                dos_date,
+                self.crc,
+                compress_size,
+                size,
+                len(name),
+                len(extra),
+            )
+            + name
+            + extra
+        )
+
+    def central_header(self):
+        """
+        The central directory header of the member
+        """
+
+        name = self.name.encode("utf-8")
+        dos_time, dos_date = self.dos_date_time
+        values, extra_values = [self.size, self.compress_size, self.header_offset], []
+        for i, value in enumerate(values):
+            if value >= ZIP64_LIMIT:
+                extra_values.append(value)
+                values[i] = ZIP_MAX_VALUE
+        extra = (
+            struct.pack(f"<HH{len(extra_values)}Q", 1, 8 * len(extra_values), *extra_values) if extra_values else b""
+        )
+        size, compress_size, header_offset = values
+
+        return (
+            CENTRAL_HEADER.pack(
+                b"PK\001\002",
+                (self.create_system << 8) | 20,
+                45 if extra_values else 20,
+                self.flags,
+                self.compress_type,
+                dos_time,
+                dos_date,
+                self.crc,
+                compress_size,
+                size,
+                len(name),
+                len(extra),
+                0,
+                0,
+                0,
+                (self.mode & 0xFFFF) << 16,
+                header_offset,
+            )
+            + name
+            + extra
+        )
+
+
+def iter_chunks(members, level):
+    """
+    Split the files of zip members into parts to compress
+
+    :param list[ZipMember] members: the members
+    :param int level: the compression level
+    :return generator[tuple[str, int, int, bool, int]]: the parts, in the order of the members
+    """
+
+    for member in members:
+        for i in range(member.chunks):
+            yield member.file_path, i * CHUNK_SIZE, CHUNK_SIZE, i == member.chunks - 1, level
+
+
+def write_end_records(f, members, central_offset):
+    """
+    Write the end of central directory record, preceded by the zip64 records when needed
+
+    :param file f: the archive, positioned after the central directory
+    :param list[ZipMember] members: the members
+    :param int central_offset: the offset of the central directory
+    """
+
+    end_offset = f.tell()
+    central_size = end_offset - central_offset
+    count = len(members)
+
+    if count > ZIP_FILECOUNT_LIMIT or central_offset > ZIP64_LIMIT or central_size > ZIP64_LIMIT:
+        f.write(END_RECORD_64.pack(b"PK\006\006", 44, 45, 45, 0, 0, count, count, central_size, central_offset))
+        f.write(END_LOCATOR_64.pack(b"PK\006\007", 0, end_offset, 1))
+        count, central_size, central_offset = (
+            min(count, ZIP_FILECOUNT_LIMIT),
+            min(central_size, ZIP_MAX_VALUE),
+            min(central_offset, ZIP_MAX_VALUE),
+        )
+
+    f.write(END_RECORD.pack(b"PK\005\006", 0, 0, count, count, central_size, central_offset, 0))
+
+
+# pylint: disable=too-many-locals
+def write_zip(output_path, files, jobs=None, level=zlib.Z_BEST_SPEED, reproducible=False):
+    """
+    Write a zip archive, compressing the files in parallel. Each file is split into parts that are compressed on a
+    thread pool, and the archive is assembled in the order of the given files, such that its content doesn't depend on
+    the number of jobs. Files that don't get smaller by compressing them are stored uncompressed.
+
+    Reproducible archives only depend on the names, content and executable permissions of the files: members are sorted
+    by name and get a fixed modification time and normalized permissions.
+
+    The content hash of the archive is computed from the same properties, such that it doesn't change when files are
+    only touched, and is equal for archives that are compressed differently. It's a SHA-256 hash of the name, normalized
+    permissions, size and hash of each member, in the order of the members.
+
+    :param str output_path: the path of the archive
+    :param list[tuple[str, str]] files: per file, its path and its name in the archive
+    :param int|None jobs: the maximum number of parts to compress at the same time, the number of CPUs by default
+    :param int level: the compression level
+    :param bool reproducible: whether to write a reproducible archive
+    :return str: the content hash of the archive
+    """
+
+    members = [
+        ZipMember(file_path=file_path, arcname=arcname, reproducible=reproducible) for file_path, arcname in files
+    ]
+    if reproducible:
+        members.sort(key=lambda member: member.name)
+    chunks = map_ordered(compress_chunk, iter_chunks(members, level), jobs or get_default_jobs())
+
+    content_hash = hashlib.sha256()
+    with open(output_path, "wb") as f:
+        for member in members:
+            member.header_offset = f.tell()
+            f.write(member.local_header())
+            data_offset = f.tell()
+
+            # Files are hashed per part, as parts are read in parallel
+            crc, length, member_hash = 0, 0, hashlib.sha256()
+            for _ in range(member.chunks):
+                chunk_crc, chunk_length, chunk_hash, compressed = next(chunks)
+                crc = crc32_combine(crc, chunk_crc, chunk_length)
+                length += chunk_length
+                member_hash.update(chunk_hash)
+                member.compress_size += len(compressed)
+                f.write(compressed)
+
+            assert length == member.size, f"File changed while zipping: {member.file_path}"
+            member.crc = crc
+            content_hash.update(
+                f"{member.name}\0{ZipMember.normalized_mode(member.mode):o}\0{member.size}\0"
+                f"{member_hash.hexdigest()}\n".encode("utf-8")
+            )
+
+            if member.compress_size >= member.size:
+                # Compression didn't help, so store the file as it is
+                f.seek(data_offset)
+                f.truncate()
+                with open(member.file_path, "rb") as source:
+                    shutil.copyfileobj(source, f)
+                member.compress_type = ZIP_STORED
+                member.compress_size = member.size
+
+            # Fill in the checksum and sizes in the local header, which has the same length as before
+            end_offset = f.tell()
+            f.seek(member.header_offset)
+            f.write(member.local_header())
+            f.seek(end_offset)
+
+        central_offset = f.tell()
+        for member in members:
+            f.write(member.central_header())
+        write_end_records(f=f, members=members, central_offset=central_offset)
+
+    return content_hash.hexdigest()